@@ -2,6 +2,10 @@
 
 To use these, `first run acronym/pipeline/cordis/fetch_cordis.py`.
 
+Tabular getters cache their results in memory until the files they read
+change. Use `clear_cache` to free the memory and `set_cache_budget` in
+`acronym.utils.cache` to change the maximum memory used.
+
 For getters that load data for a single framework programme, an
 abbreviation must be passed for `fp`. This can be one of:
     - fp1
@@ -13,39 +17,119 @@ abbreviation must be passed for `fp`. This can be one of:
     - fp7
     - h2020
 """
+from functools import partial
+import logging
 import os
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 import xmltodict
 
-from acronym.utils.cordis import cordis_input_path, cordis_output_path
-
-
-def projects(fp: str = "h2020") -> pd.DataFrame:
+from acronym.utils.cordis import (
+    CONFIG,
+    CORDIS_OUTPUT_DATA_DIR,
+    cordis_input_path,
+    cordis_output_path,
+    compile_xml_projects,
+    iter_parsed_xml_projects,
+    parse_project_xml,
+    xml_projects_compiled,
+    xml_projects_paths,
+)
+from acronym.utils.acronyms import TitleTerms
+from acronym.utils.cache import cached_getter, clear_cache  # noqa: F401
+from acronym.utils.embeddings import StackedEmbeddings, scales_path
+from acronym.utils.index import IVFIndex
+from acronym.utils.io import make_path_if_not_exist
+
+
+logger = logging.getLogger(__name__)
+
+
+def _read_table(
+    path: Path,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Tuple]] = None,
+) -> pd.DataFrame:
+    """Reads the typed parquet version of a CORDIS csv if it exists and is up
+    to date, otherwise the csv itself.
+
+    The parquet file is out of date if the csv has been modified since it was
+    written, e.g. by hand or by an older version of the pipeline.
+    """
+    parquet_path = path.with_suffix(".parquet")
+    if parquet_path.exists():
+        if (not path.exists()) or (
+            os.path.getmtime(path) <= os.path.getmtime(parquet_path)
+        ):
+            return pd.read_parquet(parquet_path, columns=columns, filters=filters)
+        logger.warning(f"{path} is newer than {parquet_path}, reading the csv")
+    if filters is not None:
+        raise ValueError(
+            f"Filters require an up to date {parquet_path}. "
+            "Run fetch_cordis.py to create it."
+        )
+    return pd.read_csv(path, usecols=columns)
+
+
+def _table_paths(name: str) -> Callable[[Dict], List[Path]]:
+    """Paths read by `_read_table` for a CORDIS input table."""
+    return lambda args: [
+        cordis_input_path(args["fp"]) / f"{name}.csv",
+        cordis_input_path(args["fp"]) / f"{name}.parquet",
+    ]
+
+
+@cached_getter(_table_paths("project"))
+def projects(
+    fp: str = "h2020",
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Tuple]] = None,
+) -> pd.DataFrame:
     """CORDIS projects for a framework programme.
 
     Args:
         fp: Framework programme abbreviation.
+        columns: Columns to load. Defaults to all columns.
+        filters: Row filters applied while reading, in the form accepted by
+            `pandas.read_parquet`, e.g. `[("status", "==", "SIGNED")]`.
 
     Returns:
         Dataframe of projects for the framework programme.
     """
     path = cordis_input_path(fp) / "project.csv"
-    return pd.read_csv(path)
+    return _read_table(path, columns, filters)
 
 
-def organizations(fp: str = "h2020") -> pd.DataFrame:
+@cached_getter(_table_paths("organization"))
+def organizations(
+    fp: str = "h2020",
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Tuple]] = None,
+) -> pd.DataFrame:
     """CORDIS organizations for a framework programme.
 
     Args:
         fp: Framework programme abbreviation.
+        columns: Columns to load. Defaults to all columns.
+        filters: Row filters applied while reading, in the form accepted by
+            `pandas.read_parquet`, e.g. `[("country", "in", ["FR", "DE"])]`.
 
     Returns:
         Dataframe of organizations for the framework programme.
     """
     path = cordis_input_path(fp) / "organization.csv"
-    return pd.read_csv(path)
+    return _read_table(path, columns, filters)
 
 
 def projects_records(fp: str = "h2020") -> List[Dict]:
@@ -71,6 +155,128 @@ def projects_records(fp: str = "h2020") -> List[Dict]:
     return records
 
 
+def iter_projects_records(
+    fp: str = "h2020",
+    fields: Optional[Sequence[str]] = None,
+    n_workers: int = 1,
+    chunksize: int = 64,
+    from_zip: bool = False,
+) -> Iterator[Dict]:
+    """Streams flat records of CORDIS projects from their XML files for a
+    framework programme.
+
+    Unlike `projects_records`, files are parsed one at a time and only the
+    requested fields are kept, so the whole programme is never held in memory.
+
+    Args:
+        fp: Framework programme abbreviation.
+        fields: Paths of the fields to extract. See
+            `acronym.utils.cordis.parse_project_xml`.
+        n_workers: Number of processes to parse files with.
+        chunksize: Number of files sent to a worker process at a time.
+        from_zip: If True, stream the files from the downloaded zip archive
+            instead of the extracted `xml_projects` directory.
+
+    Yields:
+        Dict record for each project with a key for every field.
+    """
+    parse = partial(parse_project_xml, fields=fields)
+    yield from iter_parsed_xml_projects(fp, parse, from_zip, n_workers, chunksize)
+
+
+def projects_xml(
+    fp: str = "h2020",
+    columns: Optional[List[str]] = None,
+    n_workers: int = 1,
+) -> pd.DataFrame:
+    """CORDIS projects for a framework programme, from the individual project
+    XML files.
+
+    The XML files are compiled to a parquet file the first time this is
+    called, and again whenever the XML files change.
+
+    Args:
+        fp: Framework programme abbreviation.
+        columns: Columns to load. Defaults to all of `xml_project_fields` in
+            the CORDIS config.
+        n_workers: Number of processes to parse the XML files with if they
+            need to be compiled.
+
+    Returns:
+        Dataframe of projects for the framework programme.
+    """
+    if not xml_projects_compiled(fp):
+        compile_xml_projects(fp, n_workers=n_workers)
+    return pd.read_parquet(xml_projects_paths(fp)["projects"], columns=columns)
+
+
+def organizations_xml(
+    fp: str = "h2020",
+    columns: Optional[List[str]] = None,
+    n_workers: int = 1,
+) -> pd.DataFrame:
+    """Organizations of CORDIS projects for a framework programme, from the
+    individual project XML files. Each row is one organization's
+    participation in a project, identified by the project `rcn`.
+
+    Args:
+        fp: Framework programme abbreviation.
+        columns: Columns to load. Defaults to `rcn` and all of
+            `xml_organization_fields` in the CORDIS config.
+        n_workers: Number of processes to parse the XML files with if they
+            need to be compiled.
+
+    Returns:
+        Dataframe of project organizations for the framework programme.
+    """
+    if not xml_projects_compiled(fp):
+        compile_xml_projects(fp, n_workers=n_workers)
+    return pd.read_parquet(xml_projects_paths(fp)["organizations"], columns=columns)
+
+
+def project_rcns(fp: str = "h2020") -> np.array:
+    """Record control numbers (`rcn`) of CORDIS projects in a framework
+    programme, in the same order as the rows of the project embeddings.
+
+    Args:
+        fp: Framework programme abbreviation.
+
+    Returns:
+        Array of project `rcn`s.
+    """
+    return projects(fp, columns=["rcn"])["rcn"].values
+
+
+@cached_getter(_table_paths("project"))
+def title_terms(fp: str = "h2020") -> TitleTerms:
+    """Terms of the titles of CORDIS projects in a framework programme, in the
+    same order as `projects`.
+
+    The titles are tokenized the first time this is called, or when they
+    have changed, and the terms are saved to `title_terms.npz` in the
+    framework programme's outputs so that later stages can reuse them.
+
+    Args:
+        fp: Framework programme abbreviation.
+
+    Returns:
+        Store of the title terms. See `acronym.utils.acronyms.TitleTerms`.
+    """
+    titles = projects(fp, columns=["title"])["title"].fillna("")
+    titles_hash = TitleTerms.titles_hash(titles)
+    path = cordis_output_path(fp) / "title_terms.npz"
+    if path.exists():
+        store, saved_hash = TitleTerms.load(path)
+        if saved_hash == titles_hash:
+            return store
+
+    store = TitleTerms.from_titles(titles.tolist())
+    make_path_if_not_exist(path.parent)
+    store.save(path, titles_hash)
+    return store
+
+
+@cached_getter(lambda args: [cordis_output_path(args["fp"]) / "acronyms.csv"])
 def acronymity(fp: str) -> pd.DataFrame:
     """Acronym matches and scores for CORDIS projects in a framework programme.
 
@@ -84,40 +290,191 @@ def acronymity(fp: str) -> pd.DataFrame:
     return pd.read_csv(path)
 
 
-def acronym_embeddings(fp: str) -> np.array:
+@cached_getter(lambda args: [cordis_output_path(args["fp"]) / "similarity.csv"])
+def similarity(fp: str) -> pd.DataFrame:
+    """Cosine similarity between the acronym embedding of each CORDIS project
+    in a framework programme and its abstract and title embeddings.
+
+    Args:
+        fp: Framework programme abbreviation.
+
+    Returns:
+        Dataframe of acronym to abstract and title similarities.
+    """
+    path = cordis_output_path(fp) / "similarity.csv"
+    return pd.read_csv(path)
+
+
+def acronym_neighbours(fp: str, field: str = "abstract") -> pd.DataFrame:
+    """Projects from any framework programme with the most similar abstract
+    or title embeddings to the acronym of each CORDIS project in a framework
+    programme.
+
+    Args:
+        fp: Framework programme abbreviation.
+        field: One of `abstract` or `title`.
+
+    Returns:
+        Dataframe of the ranked neighbours of each project's acronym.
+    """
+    path = cordis_output_path(fp) / f"acronym_{field}_neighbours.csv"
+    return pd.read_csv(path)
+
+
+def _embeddings(
+    fp: str,
+    field: str,
+    mmap_mode: Optional[str] = None,
+    dequantize: bool = True,
+) -> Union[np.array, StackedEmbeddings]:
+    """Loads the embeddings for a field. If they are quantized and
+    `dequantize` is True, they are returned as a view that converts rows to
+    float32 as they are selected, so that a full float32 copy is never made.
+    """
+    fname = cordis_output_path(fp) / f"{field}_embeddings.npy"
+    embeddings = np.load(fname, mmap_mode=mmap_mode)
+    if (not dequantize) or (embeddings.dtype == np.float32):
+        return embeddings
+    return StackedEmbeddings(
+        [embeddings],
+        [project_rcns(fp)],
+        scales=[embedding_scales(fp, field)],
+    )
+
+
+def embedding_scales(fp: str, field: str) -> Optional[np.array]:
+    """Per-vector scale factors for embeddings stored as int8.
+
+    Args:
+        fp: Framework programme abbreviation.
+        field: One of `acronym`, `abstract` or `title`.
+
+    Returns:
+        Array of scale factors, or None if the embeddings are not int8.
+    """
+    fname = scales_path(cordis_output_path(fp) / f"{field}_embeddings.npy")
+    return np.load(fname) if fname.exists() else None
+
+
+def acronym_embeddings(
+    fp: str,
+    mmap_mode: Optional[str] = None,
+    dequantize: bool = True,
+) -> Union[np.array, StackedEmbeddings]:
     """Acronym embeddings for CORDIS projects in a framework programme.
 
     Args:
         fp: Framework programme abbreviation.
+        mmap_mode: If not None, memory-map the file with this mode (see
+            `numpy.load`) instead of reading it into memory.
+        dequantize: If the embeddings are stored as float16 or int8, return
+            a view of them whose rows are converted to float32 as they are
+            selected (see `acronym.utils.embeddings.StackedEmbeddings`).
+            Otherwise they are returned as stored.
 
     Returns:
-        Array of acronym embeddings.
+        Array, or view, of acronym embeddings.
     """
-    fname = cordis_output_path(fp) / "acronym_embeddings.npy"
-    return np.load(fname)
+    return _embeddings(fp, "acronym", mmap_mode, dequantize)
 
 
-def abstract_embeddings(fp: str) -> np.array:
+def abstract_embeddings(
+    fp: str,
+    mmap_mode: Optional[str] = None,
+    dequantize: bool = True,
+) -> Union[np.array, StackedEmbeddings]:
     """Abstract embeddings for CORDIS projects in a framework programme.
 
     Args:
         fp: Framework programme abbreviation.
+        mmap_mode: If not None, memory-map the file with this mode (see
+            `numpy.load`) instead of reading it into memory.
+        dequantize: If the embeddings are stored as float16 or int8, return
+            a view of them whose rows are converted to float32 as they are
+            selected (see `acronym.utils.embeddings.StackedEmbeddings`).
+            Otherwise they are returned as stored.
 
     Returns:
-        Array of abstract embeddings.
+        Array, or view, of abstract embeddings.
     """
-    fname = cordis_output_path(fp) / "abstract_embeddings.npy"
-    return np.load(fname)
+    return _embeddings(fp, "abstract", mmap_mode, dequantize)
 
 
-def title_embeddings(fp: str) -> np.array:
+def title_embeddings(
+    fp: str,
+    mmap_mode: Optional[str] = None,
+    dequantize: bool = True,
+) -> Union[np.array, StackedEmbeddings]:
     """Title embeddings for CORDIS projects in a framework programme.
 
     Args:
         fp: Framework programme abbreviation.
+        mmap_mode: If not None, memory-map the file with this mode (see
+            `numpy.load`) instead of reading it into memory.
+        dequantize: If the embeddings are stored as float16 or int8, return
+            a view of them whose rows are converted to float32 as they are
+            selected (see `acronym.utils.embeddings.StackedEmbeddings`).
+            Otherwise they are returned as stored.
+
+    Returns:
+        Array, or view, of title embeddings.
+    """
+    return _embeddings(fp, "title", mmap_mode, dequantize)
+
+
+def embeddings(
+    field: str,
+    fps: Optional[Sequence[str]] = None,
+    mmap_mode: Optional[str] = "r",
+    dequantize: bool = True,
+) -> StackedEmbeddings:
+    """Embeddings for CORDIS projects across several framework programmes.
+
+    The embeddings for each framework programme are memory-mapped and combined
+    into a single lazy view, without being concatenated. Rows can be selected
+    by position, or by project `rcn` with `get_by_id`.
+
+    Args:
+        field: One of `acronym`, `abstract` or `title`.
+        fps: Framework programme abbreviations. Defaults to all framework
+            programmes.
+        mmap_mode: Memory-map mode for each file (see `numpy.load`).
+        dequantize: If True, rows of float16 or int8 embeddings are converted
+            to float32 as they are selected.
+
+    Returns:
+        View of the embeddings for all of the framework programmes.
+    """
+    fps = CONFIG["framework_programmes"] if fps is None else fps
+    return StackedEmbeddings(
+        [_embeddings(fp, field, mmap_mode, dequantize=False) for fp in fps],
+        [project_rcns(fp) for fp in fps],
+        scales=[embedding_scales(fp, field) for fp in fps],
+        dequantize=dequantize,
+    )
+
+
+def embedding_index_path(field: str, fp: Optional[str] = None):
+    """Path of the nearest neighbour index for a field of the CORDIS project
+    embeddings, either for a single framework programme or, if `fp` is None,
+    for all framework programmes combined.
+    """
+    out_dir = CORDIS_OUTPUT_DATA_DIR if fp is None else cordis_output_path(fp)
+    return out_dir / f"{field}_index.npz"
+
+
+def embedding_index(field: str, fp: Optional[str] = None) -> IVFIndex:
+    """Approximate nearest neighbour index of CORDIS project embeddings.
+
+    To create the indexes, first run
+    `acronym/pipeline/cordis/build_embedding_index.py`.
+
+    Args:
+        field: One of `acronym`, `abstract` or `title`.
+        fp: Framework programme abbreviation. If None, the index combining all
+            framework programmes is loaded.
 
     Returns:
-        Array of title embeddings.
+        Index that can be queried with `search` to find project `rcn`s.
     """
-    fname = cordis_output_path(fp) / "title_embeddings.npy"
-    return np.load(fname)
+    return IVFIndex.load(embedding_index_path(field, fp))
@@ -1,54 +1,172 @@
+"""Find the closest match between each CORDIS project's acronym and title and
+score the projects' acronymity.
+
+With `--workers` greater than 1, projects from all framework programmes are
+combined, scored in chunks across a pool of processes and split back out into
+one output per framework programme.
+
+Only projects whose acronym or title are new or have changed since the last
+run are scored, and their results are merged into the existing outputs. Pass
+`--full` to rescore every project.
+"""
+import click
 import logging
-from pandas import DataFrame
+import numpy as np
+import os
+import pandas as pd
+from typing import FrozenSet, List
 
 from acronym import PROJECT_DIR
 from acronym.utils.cordis import CONFIG, cordis_output_path
-from acronym.getters.cordis import projects
-from acronym.utils.acronyms import acronymity, normalise_acronym_scores
+from acronym.getters.cordis import projects, title_terms
+from acronym.utils.acronyms import (
+    TitleTerms,
+    acronymity_parallel,
+    load_title_stops,
+    normalise_acronym_scores,
+)
 from acronym.utils.io import make_path_if_not_exist
+from acronym.utils.manifest import (
+    RefreshManifest,
+    content_hashes,
+    merge_rows,
+    refresh_manifest_path,
+)
 
 
-if __name__ == "__main__":
+logger = logging.getLogger(__name__)
 
-    logger = logging.getLogger(__name__)
+STAGE = "acronym_match"
 
-    for fp in CONFIG["framework_programmes"]:
 
-        logger.info(f"Finding acronynm matches for CORDIS {fp.upper()}")
+def _score_projects(
+    projects_df: pd.DataFrame,
+    projects_title_terms: TitleTerms,
+    config: dict,
+    title_stops: FrozenSet[str],
+    workers: int,
+    chunk_size: int,
+) -> pd.DataFrame:
+    """Scores the acronymity of projects, with their `rcn` as the last column."""
+    if len(projects_df) == 0:
+        # e.g. projects were only removed
+        return pd.DataFrame()
 
-        config = CONFIG["acronym_match"]
+    acronymity_df = acronymity_parallel(
+        projects_df["acronym"].fillna("X").tolist(),
+        projects_title_terms,
+        min_term_len=config["min_term_len"],
+        min_order=config["min_order"],
+        max_order=config["max_order"],
+        stops=title_stops,
+        n_workers=workers,
+        chunk_size=chunk_size,
+    )
+    acronymity_df["rcn"] = projects_df["rcn"].to_numpy()
+    acronymity_df = acronymity_df.pipe(
+        normalise_acronym_scores,
+        min_order=config["min_order"],
+        max_order=config["max_order"],
+    )
+    return acronymity_df[[c for c in acronymity_df.columns if c != "rcn"] + ["rcn"]]
 
-        projects_fp = projects(fp)
-        acronyms = projects_fp["acronym"].fillna("X").tolist()
-        titles = projects_fp["title"].tolist()
-        with open(PROJECT_DIR / config["title_stops_path"], "r") as f:
-            title_stops = f.readlines()
 
-        acronymity_records = list(
-            map(
-                lambda a, t: acronymity(
-                    a,
-                    t,
-                    min_term_len=config["min_term_len"],
-                    min_order=config["min_order"],
-                    max_order=config["max_order"],
-                    stops=title_stops,
-                ),
-                acronyms,
-                titles,
-            ),
+def match_acronyms(
+    fps: List[str],
+    workers: int = 1,
+    chunk_size: int = 10000,
+    full: bool = False,
+):
+    """Scores the acronymity of new or changed projects in some framework
+    programmes and merges the results into their `acronyms.csv` files.
+
+    Args:
+        fps: Framework programme abbreviations.
+        workers: Number of worker processes.
+        chunk_size: Projects per worker task.
+        full: If True, rescore every project.
+    """
+    config = CONFIG["acronym_match"]
+
+    title_stops = load_title_stops(PROJECT_DIR / config["title_stops_path"])
+    params = {**config, "title_stops": sorted(title_stops)}
+
+    refresh = {}
+    projects_changed = []
+    title_terms_changed = []
+    for fp in fps:
+        projects_fp = projects(fp)[["rcn", "acronym", "title"]]
+        hashes = content_hashes(projects_fp, ["acronym", "title"])
+        manifest = RefreshManifest(refresh_manifest_path(fp))
+        out_file = cordis_output_path(fp) / "acronyms.csv"
+        if full:
+            changed = np.ones(len(hashes), dtype=bool)
+        else:
+            changed = manifest.changed(STAGE, hashes, params, [out_file])
+        if not changed.any() and manifest.is_unchanged(STAGE, hashes):
+            logger.info(f"Acronym matches for CORDIS {fp.upper()} are up to date")
+            # mark the output as current for tasks that compare modification times
+            os.utime(out_file)
+            continue
+
+        refresh[fp] = (manifest, hashes, changed)
+        projects_changed.append(projects_fp[changed].assign(fp=fp))
+        title_terms_changed.append(title_terms(fp).take(changed))
+
+    if not refresh:
+        return
+    projects_changed = pd.concat(projects_changed, ignore_index=True)
+    title_terms_changed = TitleTerms.concat(title_terms_changed)
+
+    logger.info(
+        f"Finding acronym matches for {len(projects_changed)} new or changed "
+        f"CORDIS projects with {workers} worker(s)"
+    )
+    acronymity_df = _score_projects(
+        projects_changed,
+        title_terms_changed,
+        config,
+        title_stops,
+        workers,
+        chunk_size,
+    )
+
+    for fp, (manifest, hashes, changed) in refresh.items():
+        logger.info(
+            f"Saving acronym matches for CORDIS {fp.upper()} "
+            f"({changed.sum()} of {len(changed)} projects updated)"
         )
 
         out_path = cordis_output_path(fp)
         make_path_if_not_exist(out_path)
 
-        acronymity_df = DataFrame(acronymity_records).pipe(
-            normalise_acronym_scores,
-            min_order=config["min_order"],
-            max_order=config["max_order"],
-        )
-        acronymity_df["rcn"] = projects_fp["rcn"]
-        acronymity_df.to_csv(
-            out_path / f"acronyms.csv",
+        acronymity_fp = acronymity_df[(projects_changed["fp"] == fp).to_numpy()]
+        if not changed.all():
+            # read values as they were written, so that unchanged rows, e.g.
+            # with the acronym "NA", are saved as they would be by a full run
+            acronymity_fp = merge_rows(
+                pd.read_csv(
+                    out_path / "acronyms.csv", dtype=str, keep_default_na=False
+                ),
+                manifest.previous_positions(STAGE, hashes.index),
+                acronymity_fp,
+                changed,
+            )
+        acronymity_fp.to_csv(
+            out_path / "acronyms.csv",
             index=False,
         )
+        manifest.update(STAGE, hashes, params, [out_path / "acronyms.csv"])
+
+
+@click.command()
+@click.option("--workers", default=1, help="Number of worker processes.")
+@click.option("--chunk-size", default=10000, help="Projects per worker task.")
+@click.option("--full", is_flag=True, help="Rescore every project.")
+def run(workers: int, chunk_size: int, full: bool):
+    """Runs the pipeline."""
+    match_acronyms(CONFIG["framework_programmes"], workers, chunk_size, full)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,95 @@
+"""Calculate the similarity between CORDIS project acronyms and their project
+abstracts and titles, and find the projects with the abstracts closest to each
+acronym across all framework programmes.
+"""
+import click
+import logging
+import pandas as pd
+from typing import List
+
+from acronym.getters.cordis import embeddings
+from acronym.utils.cordis import CONFIG, cordis_output_path
+from acronym.utils.similarity import paired_cosine_similarity, top_k_cosine_similarity
+
+
+logger = logging.getLogger(__name__)
+
+
+def save_similarity(fp: str, block_size: int = 4096):
+    """Calculates the similarity between each project's acronym embedding and
+    its abstract and title embeddings for a framework programme.
+    """
+    logger.info(f"Calculating acronym similarities for CORDIS {fp.upper()}")
+    acronym_embeddings_fp = embeddings("acronym", [fp])
+    similarity_fp = pd.DataFrame(
+        {
+            "rcn": acronym_embeddings_fp.ids,
+            "abstract_similarity": paired_cosine_similarity(
+                acronym_embeddings_fp, embeddings("abstract", [fp]), block_size
+            ),
+            "title_similarity": paired_cosine_similarity(
+                acronym_embeddings_fp, embeddings("title", [fp]), block_size
+            ),
+        }
+    )
+    similarity_fp.to_csv(cordis_output_path(fp) / "similarity.csv", index=False)
+
+
+def save_neighbours(
+    fps: List[str],
+    top_k: int = 10,
+    field: str = "abstract",
+    block_size: int = 4096,
+    threads: int = 1,
+):
+    """Finds the projects across several framework programmes whose `field`
+    embeddings are closest to each acronym.
+    """
+    logger.info(f"Finding the {top_k} nearest project {field}s to each acronym")
+    acronym_embeddings = embeddings("acronym", fps)
+    corpus = embeddings(field, fps)
+    ids, scores = top_k_cosine_similarity(
+        acronym_embeddings,
+        corpus,
+        k=top_k,
+        block_size=block_size,
+        n_threads=threads,
+    )
+
+    for fp, start, end in zip(
+        fps, acronym_embeddings.offsets[:-1], acronym_embeddings.offsets[1:]
+    ):
+        neighbours_fp = pd.DataFrame(
+            {
+                "rcn": acronym_embeddings.ids[start:end].repeat(ids.shape[1]),
+                "rank": list(range(1, ids.shape[1] + 1)) * int(end - start),
+                "neighbour_rcn": corpus.ids[ids[start:end].ravel()],
+                "similarity": scores[start:end].ravel(),
+            }
+        )
+        neighbours_fp.to_csv(
+            cordis_output_path(fp) / f"acronym_{field}_neighbours.csv",
+            index=False,
+        )
+
+
+@click.command()
+@click.option("--top-k", default=10, help="Number of nearest projects to find.")
+@click.option(
+    "--field",
+    default="abstract",
+    type=click.Choice(["abstract", "title"]),
+    help="Field to search for neighbours.",
+)
+@click.option("--block-size", default=4096, help="Rows per similarity block.")
+@click.option("--threads", default=1, help="Number of threads for the search.")
+def run(top_k: int, field: str, block_size: int, threads: int):
+    """Runs the pipeline."""
+    fps = CONFIG["framework_programmes"]
+    for fp in fps:
+        save_similarity(fp, block_size)
+    save_neighbours(fps, top_k, field, block_size, threads)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,110 @@
+"""Build approximate nearest neighbour indexes of CORDIS project embeddings.
+
+By default an index is built for each framework programme and field. With
+`--combined`, a single index is built per field across all framework
+programmes. Existing indexes are updated, unless `--rebuild` is passed:
+projects that are new, or whose embeddings have been recomputed since the
+index was last updated according to the refresh manifest, are (re)added and
+projects that no longer exist are removed.
+"""
+import click
+import logging
+import numpy as np
+from typing import List, Optional
+
+from acronym.getters.cordis import embedding_index_path, embeddings
+from acronym.utils.cordis import CONFIG
+from acronym.utils.index import IVFIndex
+from acronym.utils.manifest import RefreshManifest, refresh_manifest_path
+
+
+logger = logging.getLogger(__name__)
+
+EMBED_STAGE = "embed_text"
+
+
+def _index_stage(field: str, fp: Optional[str]) -> str:
+    """Name of the refresh manifest stage for an index."""
+    return f"{field}_index" if fp is not None else f"combined_{field}_index"
+
+
+def update_index(
+    field: str,
+    fps: List[str],
+    fp: Optional[str],
+    n_lists: int,
+    n_probe: int,
+    rebuild: bool,
+):
+    """Creates or updates the index for a field.
+
+    Each framework programme's refresh manifest records the content hash of
+    every project that the index was last updated with, alongside the hashes
+    recorded by the embedding stage. Projects whose embeddings have been
+    recomputed since then, or that were embedded with different parameters,
+    are removed from the index and added again.
+    """
+    path = embedding_index_path(field, fp)
+    stage = _index_stage(field, fp)
+    view = embeddings(field, fps)
+
+    refresh = []
+    changed_ids = []
+    for fp_ in fps:
+        manifest = RefreshManifest(refresh_manifest_path(fp_))
+        embed_params, hashes = manifest.recorded(EMBED_STAGE)
+        if hashes is None:
+            # the embeddings weren't made by the pipeline, so can't be tracked
+            start, end = view.offsets[fps.index(fp_) : fps.index(fp_) + 2]
+            changed_ids.append(view.ids[start:end])
+            continue
+        params = {"embed_text": embed_params}
+        changed = manifest.changed(stage, hashes, params, [path])
+        changed_ids.append(hashes.index[changed].to_numpy())
+        refresh.append((manifest, hashes, params))
+
+    if path.exists() and not rebuild:
+        index = IVFIndex.load(path)
+        changed_ids = np.concatenate(changed_ids)
+        removed = ~np.isin(index.ids, view.ids)
+        n_removed = index.remove(np.concatenate([changed_ids, index.ids[removed]]))
+        logger.info(f"Removed {n_removed} stale {field} embeddings from {path}")
+    else:
+        index = IVFIndex(n_lists=n_lists, n_probe=n_probe)
+        n_removed = 0
+    new = ~np.isin(view.ids, index.ids) if len(index) else np.ones(len(view), bool)
+
+    logger.info(f"Adding {new.sum()} {field} embeddings to {path}")
+    if new.any():
+        index.add(view[new], view.ids[new])
+    if new.any() or n_removed:
+        index.save(path)
+    for manifest, hashes, params in refresh:
+        manifest.update(stage, hashes, params, [path])
+
+
+@click.command()
+@click.option(
+    "--field",
+    "fields",
+    multiple=True,
+    default=["acronym", "abstract", "title"],
+    type=click.Choice(["acronym", "abstract", "title"]),
+)
+@click.option("--combined", is_flag=True, help="Build one index across all FPs.")
+@click.option("--n-lists", default=256, help="Number of inverted lists.")
+@click.option("--n-probe", default=8, help="Default lists searched per query.")
+@click.option("--rebuild", is_flag=True, help="Rebuild indexes from scratch.")
+def run(fields: List[str], combined: bool, n_lists: int, n_probe: int, rebuild: bool):
+    """Runs the pipeline."""
+    fps = CONFIG["framework_programmes"]
+    for field in fields:
+        if combined:
+            update_index(field, fps, None, n_lists, n_probe, rebuild)
+        else:
+            for fp in fps:
+                update_index(field, [fp], fp, n_lists, n_probe, rebuild)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,30 +1,193 @@
+import click
+from functools import lru_cache
+import hashlib
 import multiprocessing
 import numpy as np
+import os
 import pandas as pd
-from polyleven import levenshtein
+import pathlib
 import re
 import regex
 from sentence_transformers import SentenceTransformer
 import spacy
-from toolz.itertoolz import partition_all
-from typing import Optional, List, Sequence
+from typing import Dict, Optional, List, Sequence, Tuple, Union
 
 from acronym import PROJECT_DIR, get_yaml_config, logger
-from acronym.utils.text import char_jaccard
-from acronym.utils.io import convert_str_to_pathlib_path
-from acronym.getters.cordis import projects, acronymity
-
-
-N_CPU = multiprocessing.cpu_count
+from acronym.utils.embeddings import (
+    EmbeddingCache,
+    NpyChunkWriter,
+    StackedEmbeddings,
+    save_embeddings,
+)
+from acronym.utils.text import (
+    remove_close_mentions_from_tokens,
+    remove_close_mentions_parallel,
+    remove_mentions_batch,
+    remove_mentions_parallel,
+)
+from acronym.utils.cordis import cordis_output_path
+from acronym.utils.io import convert_str_to_pathlib_path, make_path_if_not_exist
+from acronym.utils.manifest import (
+    RefreshManifest,
+    content_hashes,
+    merge_rows,
+    refresh_manifest_path,
+)
+from acronym.getters.cordis import projects, acronymity, embedding_scales, title_terms
+
+
+N_CPU = multiprocessing.cpu_count()
 TEST = False
+STAGE = "embed_text"
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# increment when changes to the text preprocessing should invalidate the
+# embedding cache
+PREPROCESSING_VERSION = 1
 
 # remove a substring from a string with whitespace or punctuation on either side
 def remove_substring(string, substring):
     return re.sub(rf"\s*{re.escape(substring)}\s*", " ", string, flags=re.IGNORECASE)
 
 
+@lru_cache(maxsize=None)
+def load_encoder(model_name: str) -> SentenceTransformer:
+    """Loads a sentence transformer. Models are cached by name so that the
+    weights are only loaded once per process.
+    """
+    return SentenceTransformer(model_name)
+
+
+def estimate_n_tokens(text: str, max_len: Optional[int] = None) -> int:
+    """Estimates the number of tokens a transformer will see for a text.
+
+    Words and punctuation are counted as one token each, plus the two special
+    tokens added by the tokenizer. If `max_len` is given the estimate is
+    capped, because longer texts are truncated by the model.
+    """
+    n_tokens = len(TOKEN_PATTERN.findall(text)) + 2
+    return n_tokens if max_len is None else min(n_tokens, max_len)
+
+
+def batch_by_token_budget(
+    n_tokens: Sequence[int],
+    token_budget: int,
+) -> Tuple[List[np.array], float]:
+    """Groups texts into batches of similar length that fit a token budget.
+
+    Texts are sorted by their token counts and added to a batch until the
+    padded size of the batch (number of texts x longest text) would exceed
+    `token_budget`. A text that exceeds the budget on its own is put in a
+    batch by itself.
+
+    Args:
+        n_tokens: Estimated number of tokens in each text.
+        token_budget: Maximum number of padded tokens in a batch.
+
+    Returns:
+        batches: Arrays of indices of the texts in each batch.
+        padding_ratio: Fraction of the padded tokens across all batches that
+            are padding.
+    """
+    n_tokens = np.asarray(n_tokens)
+    order = np.argsort(n_tokens, kind="stable")
+
+    batches = []
+    start = 0
+    padded = 0
+    for end, idx in enumerate(order):
+        # texts are sorted so the current text is the longest in the batch
+        if (end > start) and ((end - start + 1) * n_tokens[idx] > token_budget):
+            batches.append(order[start:end])
+            padded += (end - start) * n_tokens[order[end - 1]]
+            start = end
+    if start < len(order):
+        batches.append(order[start:])
+        padded += (len(order) - start) * n_tokens[order[-1]]
+
+    padding_ratio = float(1 - n_tokens.sum() / padded) if padded else 0.0
+    return batches, padding_ratio
+
+
+def _batches(
+    texts: Sequence[str],
+    chunk_size: Optional[int],
+    token_budget: Optional[int],
+    max_len: Optional[int],
+    sort_by_length: bool,
+) -> List[np.array]:
+    """Splits the indices of `texts` into the batches that will be embedded."""
+    if token_budget is not None:
+        n_tokens = [estimate_n_tokens(text, max_len) for text in texts]
+        batches, padding_ratio = batch_by_token_budget(n_tokens, token_budget)
+        logger.info(
+            f"Embedding {len(texts)} texts in {len(batches)} batches "
+            f"with a padding ratio of {padding_ratio:.3f}"
+        )
+        return batches
+
+    if sort_by_length:
+        order = np.argsort([len(text) for text in texts], kind="stable")
+    else:
+        order = np.arange(len(texts))
+    if chunk_size is None:
+        return [order] if len(texts) else []
+    return [order[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+
+def _encode(
+    encoder: SentenceTransformer,
+    model_name: str,
+    texts: List[str],
+    cache: Optional[EmbeddingCache],
+    **kwargs,
+) -> Tuple[np.array, int]:
+    """Encodes texts, only encoding those that are not already in `cache`.
+    Returns the embeddings and the number of texts found in the cache.
+    """
+    if cache is None:
+        return encoder.encode(texts, **kwargs), 0
+
+    keys = cache.keys(model_name, texts)
+    found = cache.get_many(keys)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+
+    if missing:
+        missing_embeddings = encoder.encode(list(missing.values()), **kwargs)
+        cache.put_many(list(missing.keys()), missing_embeddings)
+        found.update(zip(missing.keys(), missing_embeddings))
+
+    return np.stack([found[key] for key in keys]), len(texts) - len(missing)
+
+
+def _fingerprint(
+    model_name: str,
+    texts: Sequence[str],
+    batches: Sequence[np.array],
+) -> str:
+    """Hash of a model name, texts and the rows in each batch, used to check
+    that a partially written embeddings file was created from the same inputs
+    and split into the same batches.
+    """
+    h = hashlib.sha256(model_name.encode())
+    for text in texts:
+        h.update(b"\0" + text.encode())
+    for batch in batches:
+        h.update(b"\0" + np.asarray(batch, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
 def embed(
-    model_name: str, texts: Sequence, chunk_size: Optional[int] = None
+    model_name: str,
+    texts: Sequence,
+    chunk_size: Optional[int] = None,
+    token_budget: Optional[int] = None,
+    cache: Optional[EmbeddingCache] = None,
+    out_path: Optional[Union[pathlib.Path, str]] = None,
+    sort_by_length: bool = False,
 ) -> np.array:
     """Embeds a sequence of texts using a sentence transformer.
 
@@ -33,18 +196,130 @@ def embed(
         texts: A sequence of texts.
         chunk_size: Splits the texts into chunks to be embedded sequentially.
             Useful for breaking up large sequences which might exceed memory.
+        token_budget: If given, texts are sorted by their estimated number of
+            tokens and embedded in batches of up to this many padded tokens.
+            Takes precedence over `chunk_size`.
+        cache: If given, embeddings are looked up in the cache before
+            encoding and any new embeddings are added to it.
+        out_path: If given, the embeddings are written to a memory-mapped
+            `.npy` file at this path as each batch is completed. If a previous
+            run with the same inputs was interrupted, completed batches are
+            not embedded again.
+        sort_by_length: If True, texts are sorted by length before they are
+            split into chunks. Embeddings are always returned in the original
+            order.
 
     Returns:
         np.array: Embeddings.
     """
-    encoder = SentenceTransformer(model_name)
-    if chunk_size is None:
-        return encoder.encode(texts)
+    encoder = load_encoder(model_name)
+    max_len = getattr(encoder, "max_seq_length", None)
+    batches = _batches(texts, chunk_size, token_budget, max_len, sort_by_length)
+    shape = (len(texts), encoder.get_sentence_embedding_dimension())
+
+    if out_path is not None:
+        writer = NpyChunkWriter(
+            out_path,
+            shape,
+            n_chunks=len(batches),
+            fingerprint=_fingerprint(model_name, texts, batches),
+        )
+        embeddings = writer.array
+        if writer.completed:
+            logger.info(f"Resuming from {len(writer.completed)} completed batches")
     else:
-        embeddings = []
-        for chunk in partition_all(chunk_size, texts):
-            embeddings.append(encoder.encode(chunk))
-        return np.concatenate(embeddings)
+        writer = None
+        embeddings = np.empty(shape, dtype=np.float32)
+
+    n_cached = 0
+    for batch_id, batch in enumerate(batches):
+        if (writer is not None) and writer.is_done(batch_id):
+            continue
+        # batches built to a token budget are encoded in a single pass
+        encode_kwargs = {} if token_budget is None else {"batch_size": len(batch)}
+        batch_embeddings, n_found = _encode(
+            encoder,
+            model_name,
+            [texts[i] for i in batch],
+            cache,
+            **encode_kwargs,
+        )
+        n_cached += n_found
+        if writer is not None:
+            writer.write(batch_id, batch, batch_embeddings)
+        else:
+            embeddings[batch] = batch_embeddings
+
+    if cache is not None:
+        logger.info(f"Found {n_cached} of {len(texts)} texts in cache")
+    if writer is not None:
+        writer.close()
+    return embeddings
+
+
+def embed_fields(
+    model_name: str,
+    fields: Dict[str, Sequence[str]],
+    chunk_size: Optional[int] = None,
+    token_budget: Optional[int] = None,
+    cache: Optional[EmbeddingCache] = None,
+    out_paths: Optional[Dict[str, Union[pathlib.Path, str]]] = None,
+    storage_dtype: str = "float32",
+) -> Dict[str, np.array]:
+    """Embeds several fields of text in a single stream.
+
+    The texts from all fields are sorted by length before they are embedded so
+    that texts of similar lengths are batched together. The embeddings are
+    then returned to their original order and split back out by field.
+
+    Args:
+        model_name: Name of sentence transformer.
+        fields: Mapping of field names to sequences of texts.
+        chunk_size: Splits the texts into chunks to be embedded sequentially.
+        token_budget: Maximum number of padded tokens per batch. See `embed`.
+        cache: Embedding cache. See `embed`.
+        out_paths: Mapping of field names to `.npy` paths. If given, the
+            combined embeddings are written incrementally to a resumable file
+            next to the first path and then copied out to a file per field.
+        storage_dtype: Data type of the files written to `out_paths`. One of
+            `float32`, `float16` or `int8` (with per-vector scale factors).
+
+    Returns:
+        Mapping of field names to embeddings.
+    """
+    texts = [text for field_texts in fields.values() for text in field_texts]
+
+    stream_path = None
+    if out_paths is not None:
+        first_path = pathlib.Path(next(iter(out_paths.values())))
+        stream_path = first_path.with_name(f".{'_'.join(fields)}_stream.npy")
+
+    embeddings = embed(
+        model_name,
+        texts,
+        chunk_size,
+        token_budget,
+        cache,
+        out_path=stream_path,
+        sort_by_length=True,
+    )
+
+    split_embeddings = {}
+    start = 0
+    for field, field_texts in fields.items():
+        end = start + len(field_texts)
+        if out_paths is None:
+            split_embeddings[field] = embeddings[start:end]
+        else:
+            split_embeddings[field] = save_embeddings(
+                out_paths[field], embeddings[start:end], dtype=storage_dtype
+            )
+        start = end
+
+    if stream_path is not None:
+        del embeddings
+        os.remove(stream_path)
+    return split_embeddings
 
 
 def remove_mentions(
@@ -54,6 +329,9 @@ def remove_mentions(
 ) -> List[str]:
     """Removes close and exact matches of the acronym from the abstract (ignores case).
 
+    See `acronym.utils.text.remove_mentions_parallel` to remove mentions from
+    several fields at once.
+
     Args:
         acronyms (Sequence[str]): Project acronyms.
         abstracts (Sequence[str]): Project abstracts.
@@ -61,72 +339,51 @@ def remove_mentions(
     Returns:
         List[str]: Modified abstracts.
     """
-    abstracts_mod = []
-    for i, (acronym, acronym_mod, abstract) in enumerate(
-        zip(acronyms_original, acronyms_modified, abstracts)
-    ):
-        if i % 5000 == 0:
-            logger.info(
-                f"Removing mentions from abstract {i} of {len(acronyms_original)}"
-            )
-        pattern = rf"\b{re.escape(acronym)}\b"
-        pattern_mod = rf"\b{re.escape(acronym_mod)}\b"
-        abstract = re.sub(pattern, " ", abstract, flags=re.IGNORECASE)
-        abstract = re.sub(pattern_mod, " ", abstract, flags=re.IGNORECASE)
-
-        abstracts_mod.append(abstract)
-        # r = rf"\b({re.escape(acronym)}){{s<=1,d<=1,e<=1}}\b"
-        # matches = regex.findall(r, abstract, flags=regex.IGNORECASE)
-        # print(matches)
-        # for match in matches:
-        #     if type(match) is not str:
-        #         print(match)
-        #     abstract = abstract.replace(match, " ")
-        # abstracts_mod.append(abstract)
-    return abstracts_mod
+    return remove_mentions_batch(
+        acronyms_original, acronyms_modified, {"abstract": abstracts}
+    )["abstract"]
 
 
 def remove_close_mentions(
-    acronyms: Sequence[str], abstracts: Sequence[str]
+    acronyms: Sequence[str],
+    abstracts: Sequence[str],
+    tokenizer: str = "spacy",
+    n_workers: int = 1,
 ) -> List[str]:
     """Removes any tokens from abstract which are a close match (Levenshtein
-    distance <= 2) to the corresponding project acronym,
+    distance <= 2) to the corresponding project acronym, and brackets.
+
+    See `acronym.utils.text.remove_close_mentions_from_tokens`.
 
     Args:
         acronyms (Sequence[str]): Acryonyms for projects.
         abstracts (Sequence[str]): Abstracts for projects.
+        tokenizer (str): `spacy` to use the tokenizer of the spaCy model in
+            the embedding config, or `regex` to split the abstracts with
+            `acronym.utils.text.tokenize_with_whitespace`. The regex tokenizer
+            is faster but only approximates spaCy's, e.g. it splits `e.g.`
+            and `don't` differently, so the output can differ.
+        n_workers (int): Number of worker processes.
 
     Returns:
         abstracts_mod (List[str]): Abstracts with closely matched tokens removed.
     """
+    if tokenizer == "regex":
+        return remove_close_mentions_parallel(acronyms, abstracts, n_workers=n_workers)
+
     config = get_yaml_config(f"{PROJECT_DIR}/acronym/config/embedding.yml")
     nlp = spacy.load(
         config["spacy_model"], disable=["ner", "tagger", "parser", "textcat", "tok2vec"]
     )
-
-    abstracts_mod = []
-    pipe = nlp.pipe(zip(abstracts, acronyms), as_tuples=True, n_process=N_CPU - 2)
-    for abstract_doc, acronym in pipe:
-        acronym = acronym.lower()
-        unique_tokens = set(t.lower_ for t in abstract_doc)
-        possible_matches = []
-        for token in unique_tokens:
-            if char_jaccard(acronym, token) > 0.8:
-                possible_matches.append(token)
-
-        abstract_tokens = []
-        for token in abstract_doc:
-            if token.lower_ in possible_matches:
-                lev = levenshtein(token.lower_, acronym)
-                if lev <= 2:
-                    continue
-            elif token.is_bracket:
-                continue
-            abstract_tokens.append(token)
-
-        abstracts_mod.append("".join([t.text + t.whitespace_ for t in abstract_tokens]))
-
-    return abstracts_mod
+    pipe = nlp.pipe(
+        zip(abstracts, acronyms), as_tuples=True, n_process=max(n_workers, 1)
+    )
+    return [
+        remove_close_mentions_from_tokens(
+            acronym, [(t.text, t.whitespace_) for t in abstract_doc]
+        )
+        for abstract_doc, acronym in pipe
+    ]
 
 
 def remove_exact_mentions(
@@ -149,7 +406,153 @@ def remove_exact_mentions(
     return abstracts_mod
 
 
-if __name__ == "__main__":
+def embed_fp(
+    fp: str,
+    cache: Optional[EmbeddingCache] = None,
+    full: bool = False,
+):
+    """Removes acronym mentions from the abstracts and titles of new or
+    changed projects in a framework programme, embeds them along with the
+    acronyms and merges the results into the stored embeddings.
+
+    Args:
+        fp: Framework programme abbreviation.
+        cache: Embedding cache. If None, the cache in the embedding config is
+            opened.
+        full: If True, embed every project.
+    """
+    embed_config = get_yaml_config(
+        convert_str_to_pathlib_path(f"{PROJECT_DIR}/acronym/config/embedding.yml")
+    )
+    if cache is None:
+        cache = EmbeddingCache(
+            PROJECT_DIR / embed_config["cache_path"],
+            max_bytes=embed_config["cache_max_bytes"],
+            version=PREPROCESSING_VERSION,
+        )
+    model_name = embed_config["sentence_transformer_model"]
+    params = {
+        "model_name": model_name,
+        "preprocessing_version": PREPROCESSING_VERSION,
+        "storage_dtype": embed_config["storage_dtype"],
+        "remove_close_mentions": embed_config["remove_close_mentions"],
+        "test": TEST,
+    }
+    if embed_config["remove_close_mentions"]:
+        params["close_mention_tokenizer"] = embed_config["close_mention_tokenizer"]
+    n = 50 if TEST else None
+
+    projects_fp = projects(fp).iloc[:n]
+    texts = pd.DataFrame(
+        {
+            "rcn": projects_fp["rcn"].to_numpy(),
+            "abstract": projects_fp["objective"].fillna("").to_numpy(),
+            "title": projects_fp["title"].fillna("").to_numpy(),
+            "acronym": projects_fp["acronym"].fillna("").to_numpy(),
+            "acronym_modified": acronymity(fp)["acronym"]
+            .iloc[:n]
+            .fillna("")
+            .to_numpy(),
+        }
+    )
+
+    out_path = cordis_output_path(fp)
+    make_path_if_not_exist(out_path)
+    out_paths = {
+        "abstract": out_path / "abstract_embeddings.npy",
+        "title": out_path / "title_embeddings.npy",
+        "acronym": out_path / "acronym_embeddings.npy",
+    }
+
+    # only embed projects whose texts have changed since the last run
+    hashes = content_hashes(texts, ["abstract", "title", "acronym", "acronym_modified"])
+    manifest = RefreshManifest(refresh_manifest_path(fp))
+    if full:
+        changed = np.ones(len(hashes), dtype=bool)
+    else:
+        changed = manifest.changed(STAGE, hashes, params, out_paths.values())
+    if not changed.any() and manifest.is_unchanged(STAGE, hashes):
+        logger.info(f"Embeddings for {fp} are up to date")
+        # mark the outputs as current for tasks that compare modification times
+        for path in out_paths.values():
+            os.utime(path)
+        return
+
+    logger.info(
+        f"Processing acronyms, titles and abstracts for {changed.sum()} of "
+        f"{len(changed)} projects in {fp}"
+    )
+    texts_changed = texts[changed]
+    acronyms_original_fp = texts_changed["acronym"].tolist()
+    acronyms_modified_fp = texts_changed["acronym_modified"].tolist()
+
+    logger.info(f"Removing acronym mentions from abstracts and titles")
+    texts_modified = remove_mentions_parallel(
+        acronyms_original_fp,
+        acronyms_modified_fp,
+        {"abstract": texts_changed["abstract"].tolist()},
+        n_workers=embed_config["mention_workers"],
+    )
+    # only titles whose terms could contain a mention need to be searched
+    titles = texts_changed["title"].to_numpy(dtype=object)
+    candidates = np.flatnonzero(
+        title_terms(fp)
+        .take(np.flatnonzero(changed))
+        .mention_candidates(acronyms_original_fp, acronyms_modified_fp)
+    )
+    titles[candidates] = remove_mentions_parallel(
+        [acronyms_original_fp[i] for i in candidates],
+        [acronyms_modified_fp[i] for i in candidates],
+        {"title": titles[candidates].tolist()},
+        n_workers=embed_config["mention_workers"],
+    )["title"]
+    texts_modified["title"] = titles.tolist()
+    if embed_config["remove_close_mentions"]:
+        logger.info(f"Removing close matches of acronyms from abstracts and titles")
+        for field, field_texts in texts_modified.items():
+            texts_modified[field] = remove_close_mentions(
+                acronyms_original_fp,
+                field_texts,
+                tokenizer=embed_config["close_mention_tokenizer"],
+                n_workers=embed_config["mention_workers"],
+            )
+
+    logger.info(f"Generating abstract, title and acronym embeddings")
+    fields = {**texts_modified, "acronym": acronyms_modified_fp}
+    if changed.all():
+        embed_fields(
+            model_name,
+            fields,
+            token_budget=embed_config["token_budget"],
+            cache=cache,
+            out_paths=out_paths,
+            storage_dtype=embed_config["storage_dtype"],
+        )
+    else:
+        # merge the new embeddings with those of unchanged projects
+        updates = embed_fields(
+            model_name,
+            fields,
+            token_budget=embed_config["token_budget"],
+            cache=cache,
+        )
+        positions = manifest.previous_positions(STAGE, hashes.index)
+        for field, path in out_paths.items():
+            previous = StackedEmbeddings(
+                [np.load(path, mmap_mode="r")],
+                scales=[embedding_scales(fp, field)],
+            )
+            merged = merge_rows(previous, positions, updates[field], changed)
+            del previous
+            save_embeddings(path, merged, dtype=embed_config["storage_dtype"])
+
+    manifest.update(STAGE, hashes, params, out_paths.values())
+
+
+@click.command()
+@click.option("--full", is_flag=True, help="Embed every project.")
+def run(full: bool):
+    """Runs the pipeline."""
     cordis_config = get_yaml_config(
         convert_str_to_pathlib_path(f"{PROJECT_DIR}/acronym/config/cordis.yml")
     )
@@ -157,55 +560,16 @@ if __name__ == "__main__":
         convert_str_to_pathlib_path(f"{PROJECT_DIR}/acronym/config/embedding.yml")
     )
 
+    cache = EmbeddingCache(
+        PROJECT_DIR / embed_config["cache_path"],
+        max_bytes=embed_config["cache_max_bytes"],
+        version=PREPROCESSING_VERSION,
+    )
+
     for fp in cordis_config["framework_programmes"]:
         # for fp in ["fp7", "h2020"]:
-        logger.info(f"Processing acronyms, titles and abstracts for {fp}")
-        n = 50 if TEST else None
-
-        projects_fp = projects(fp)
-        abstracts = projects_fp["objective"].iloc[:n].fillna("").tolist()
-        titles = projects_fp["title"].iloc[:n].fillna("").tolist()
-        acronyms_original_fp = projects_fp["acronym"].iloc[:n].fillna("").tolist()
-        acronyms_modified_fp = acronymity(fp)["acronym"].iloc[:n].fillna("").tolist()
-
-        logger.info(f"Removing acronym mentions from abstracts")
-        abstracts_modified = remove_mentions(
-            acronyms_original_fp, acronyms_modified_fp, abstracts
-        )
-
-        logger.info(f"Removing acronym mentions from titles")
-        titles_modified = remove_mentions(
-            acronyms_original_fp, acronyms_modified_fp, titles
-        )
-
-        if len(abstracts_modified) > 1000:
-            chunk_size = 1000
-            print(
-                f"Chunking {len(abstracts_modified)} into chunks of size {chunk_size}"
-            )
-        else:
-            chunk_size = None
+        embed_fp(fp, cache, full)
 
-        model_name = embed_config["sentence_transformer_model"]
 
-        logger.info(f"Generating abstract embeddings")
-        abstract_embeddings_fp = embed(
-            model_name, abstracts_modified, chunk_size=chunk_size
-        )
-        logger.info(f"Generating title embeddings")
-        title_embeddings_fp = embed(model_name, titles_modified, chunk_size=chunk_size)
-        logger.info(f"Generating acronym embeddings")
-        acronym_embeddings_fp = embed(model_name, acronyms_modified_fp)
-
-        np.save(
-            f"{PROJECT_DIR}/outputs/data/cordis/{fp}/abstract_embeddings",
-            abstract_embeddings_fp,
-        )
-        np.save(
-            f"{PROJECT_DIR}/outputs/data/cordis/{fp}/title_embeddings",
-            title_embeddings_fp,
-        )
-        np.save(
-            f"{PROJECT_DIR}/outputs/data/cordis/{fp}/acronym_embeddings",
-            acronym_embeddings_fp,
-        )
+if __name__ == "__main__":
+    run()
@@ -1,38 +1,143 @@
 """"Fetch CORDIS project and organization data, including individual project
 XML files (optional).
 
+Files for all framework programmes are downloaded concurrently. Partial
+downloads are resumed and files that have not changed since the last run are
+not downloaded again.
+
 Project and organization csvs are reformatted to conventional csv format, made
-pandas friendly and formatting errors are removed.
+pandas friendly and formatting errors are removed. Framework programmes whose
+downloads have not changed since every install step last completed are
+skipped, unless `--full` is passed.
 """
 
 import click
+import json
+import logging
+import os
+import pathlib
+from typing import List, Tuple
 
 from acronym.utils.cordis import (
     CONFIG,
-    fetch_projects,
-    fetch_xml_projects,
-    fetch_organizations,
+    compile_xml_projects,
+    cordis_downloads,
+    cordis_input_path,
+    install_organizations,
+    install_projects,
+    install_xml_projects,
     reformat_organization_csv,
     reformat_project_csv,
 )
+from acronym.utils.io import download_many
 
 
-@click.command()
-@click.option("--no-xml", is_flag=True)
-def run(no_xml: bool):
-    """Runs the pipeline."""
+logger = logging.getLogger(__name__)
+
+
+def _install_record_path(fp: str) -> pathlib.Path:
+    """Path of the record of the downloads that a framework programme's files
+    were last installed from.
+    """
+    return cordis_input_path(fp) / "install.json"
+
+
+def _install_record(
+    downloads: List[Tuple[str, os.PathLike]], xml: bool, xml_mode: str
+) -> dict:
+    """Modification time and size of each downloaded file, and the XML
+    settings that they are installed with.
+    """
+    files = {}
+    for _, path in downloads:
+        stat = os.stat(path)
+        files[str(path)] = [stat.st_mtime_ns, stat.st_size]
+    return {"xml": xml, "xml_mode": xml_mode if xml else None, "downloads": files}
+
+
+def _is_installed(fp: str, record: dict) -> bool:
+    """Whether every install step for a framework programme last completed
+    with the same downloads and settings.
+    """
+    path = _install_record_path(fp)
+    if not path.exists():
+        return False
+    with open(path, "r") as f:
+        return json.load(f) == record
+
+
+def fetch_fp(
+    fp: str,
+    xml: bool = True,
+    xml_mode: str = "extract",
+    workers: int = 4,
+    full: bool = False,
+    downloaded: bool = False,
+):
+    """Downloads, installs and reformats the CORDIS files for a framework
+    programme.
 
-    for fp in CONFIG["framework_programmes"]:
-        fetch_projects(fp)
+    Args:
+        fp: Framework programme abbreviation.
+        xml: Whether to include the individual project XML files.
+        xml_mode: `extract` to extract the XML files or `parse` to compile
+            them straight from the zip archive.
+        workers: Number of concurrent downloads.
+        full: If True, reinstall the files even if the downloads have not
+            changed.
+        downloaded: If True, the files have already been downloaded.
+    """
+    downloads = cordis_downloads(fp, xml=xml)
+    if not downloaded:
+        download_many(downloads, n_workers=workers)
 
-        if CONFIG["csv_organization_urls"][fp]:
-            fetch_organizations(fp)
+    record = _install_record(downloads, xml, xml_mode)
+    if not full and _is_installed(fp, record):
+        logger.info(f"CORDIS {fp.upper()} downloads have not changed")
+        return
 
-        reformat_project_csv(fp)
-        reformat_organization_csv(fp)
+    # only recorded again once every step has completed
+    record_path = _install_record_path(fp)
+    if record_path.exists():
+        os.remove(record_path)
+
+    install_projects(fp)
+
+    if CONFIG["csv_organization_urls"][fp]:
+        install_organizations(fp)
+
+    reformat_project_csv(fp, chunksize=CONFIG["csv_chunksize"])
+    reformat_organization_csv(fp, chunksize=CONFIG["csv_chunksize"])
+
+    if xml and (xml_mode == "parse"):
+        compile_xml_projects(fp, from_zip=True, n_workers=workers)
+    elif xml:
+        install_xml_projects(fp)
+
+    with open(record_path, "w") as f:
+        json.dump(record, f)
+
+
+@click.command()
+@click.option("--no-xml", is_flag=True)
+@click.option("--workers", default=4, help="Number of concurrent downloads.")
+@click.option(
+    "--xml-mode",
+    default="extract",
+    type=click.Choice(["extract", "parse"]),
+    help="Extract the XML files or parse them straight from the zip archives.",
+)
+@click.option("--full", is_flag=True, help="Reinstall unchanged downloads.")
+def run(no_xml: bool, workers: int, xml_mode: str, full: bool):
+    """Runs the pipeline."""
+    fps = CONFIG["framework_programmes"]
+    download_many(
+        [job for fp in fps for job in cordis_downloads(fp, xml=not no_xml)],
+        n_workers=workers,
+    )
 
-        if not no_xml:
-            fetch_xml_projects(fp)
+    for fp in fps:
+        fetch_fp(fp, not no_xml, xml_mode, workers, full, downloaded=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+"""Run the CORDIS pipeline stages for each framework programme as a graph of
+tasks.
+
+Each stage is split into a task per framework programme that declares the
+files it reads and writes. Tasks whose outputs are newer than their inputs
+are skipped and tasks for different framework programmes run in parallel
+across `--workers` processes, e.g. the acronyms for one framework programme
+can be matched while the files for another are still being fetched.
+
+Stages:
+    fetch: Download, install and reformat the CORDIS files (always run, but
+        unchanged downloads are not reinstalled).
+    acronym_match: Score the acronymity of projects.
+    embed_text: Embed project acronyms, titles and abstracts.
+    similarity: Calculate the similarity between each project's acronym and
+        its abstract and title.
+    neighbours: Find the nearest projects to each acronym across all
+        framework programmes.
+"""
+import click
+import logging
+import pathlib
+import sys
+from typing import List
+
+from acronym import PROJECT_DIR
+from acronym.utils.cordis import CONFIG, cordis_input_path, cordis_output_path
+from acronym.utils.tasks import Task, failed_tasks, run_tasks
+
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["fetch", "acronym_match", "embed_text", "similarity", "neighbours"]
+EMBEDDING_FIELDS = ["acronym", "abstract", "title"]
+
+
+def _embedding_paths(fp: str) -> List[pathlib.Path]:
+    """Paths of the embeddings of each field for a framework programme."""
+    return [
+        cordis_output_path(fp) / f"{field}_embeddings.npy" for field in EMBEDDING_FIELDS
+    ]
+
+
+def build_tasks(
+    fps: List[str],
+    stages: List[str] = STAGES,
+    xml: bool = True,
+    xml_mode: str = "extract",
+    download_workers: int = 4,
+    top_k: int = 10,
+    field: str = "abstract",
+    full: bool = False,
+) -> List[Task]:
+    """Declares the tasks for some stages of the pipeline.
+
+    Args:
+        fps: Framework programme abbreviations.
+        stages: Names of the stages to run.
+        xml: Whether to fetch the individual project XML files.
+        xml_mode: `extract` or `parse`. See `fetch_cordis.py`.
+        download_workers: Number of concurrent downloads per fetch task.
+        top_k: Number of nearest projects to find for each acronym.
+        field: Field to search for each acronym's nearest projects.
+        full: If True, stages reprocess every project instead of only new or
+            changed projects.
+
+    Returns:
+        Tasks for each stage and framework programme.
+    """
+    config_dir = PROJECT_DIR / "acronym/config"
+    tasks = []
+    for fp in fps:
+        projects_path = cordis_input_path(fp) / "project.csv"
+        acronyms_path = cordis_output_path(fp) / "acronyms.csv"
+
+        if "fetch" in stages:
+            tasks.append(
+                Task(
+                    "fetch",
+                    fp,
+                    "acronym.pipeline.cordis.fetch_cordis:fetch_fp",
+                    kwargs={
+                        "fp": fp,
+                        "xml": xml,
+                        "xml_mode": xml_mode,
+                        "workers": download_workers,
+                        "full": full,
+                    },
+                    outputs=[projects_path],
+                    always_run=True,
+                )
+            )
+        if "acronym_match" in stages:
+            tasks.append(
+                Task(
+                    "acronym_match",
+                    fp,
+                    "acronym.pipeline.cordis.acronym_match:match_acronyms",
+                    kwargs={"fps": [fp], "full": full},
+                    inputs=[
+                        projects_path,
+                        config_dir / "cordis.yml",
+                        PROJECT_DIR / CONFIG["acronym_match"]["title_stops_path"],
+                    ],
+                    outputs=[acronyms_path],
+                    deps=[("fetch", fp)],
+                )
+            )
+        if "embed_text" in stages:
+            tasks.append(
+                Task(
+                    "embed_text",
+                    fp,
+                    "acronym.pipeline.cordis.embed_text:embed_fp",
+                    kwargs={"fp": fp, "full": full},
+                    inputs=[projects_path, acronyms_path, config_dir / "embedding.yml"],
+                    outputs=_embedding_paths(fp),
+                    deps=[("acronym_match", fp)],
+                )
+            )
+        if "similarity" in stages:
+            tasks.append(
+                Task(
+                    "similarity",
+                    fp,
+                    "acronym.pipeline.cordis.acronym_similarity:save_similarity",
+                    kwargs={"fp": fp},
+                    inputs=_embedding_paths(fp),
+                    outputs=[cordis_output_path(fp) / "similarity.csv"],
+                    deps=[("embed_text", fp)],
+                )
+            )
+
+    if "neighbours" in stages:
+        tasks.append(
+            Task(
+                "neighbours",
+                None,
+                "acronym.pipeline.cordis.acronym_similarity:save_neighbours",
+                kwargs={"fps": fps, "top_k": top_k, "field": field},
+                inputs=[path for fp in fps for path in _embedding_paths(fp)],
+                outputs=[
+                    cordis_output_path(fp) / f"acronym_{field}_neighbours.csv"
+                    for fp in fps
+                ],
+                deps=[("embed_text", fp) for fp in fps],
+            )
+        )
+    return tasks
+
+
+@click.command()
+@click.option(
+    "--stage",
+    "stages",
+    multiple=True,
+    default=STAGES,
+    type=click.Choice(STAGES),
+    help="Stages to run. Defaults to all stages.",
+)
+@click.option(
+    "--fp",
+    "fps",
+    multiple=True,
+    type=click.Choice(CONFIG["framework_programmes"]),
+    help="Framework programmes to run. Defaults to all.",
+)
+@click.option(
+    "--workers",
+    default=4,
+    type=click.IntRange(min=1),
+    help="Number of worker processes.",
+)
+@click.option(
+    "--embed-workers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Maximum number of framework programmes embedded at once.",
+)
+@click.option(
+    "--download-workers",
+    default=4,
+    type=click.IntRange(min=1),
+    help="Concurrent downloads per FP.",
+)
+@click.option("--no-xml", is_flag=True)
+@click.option(
+    "--xml-mode",
+    default="extract",
+    type=click.Choice(["extract", "parse"]),
+    help="Extract the XML files or parse them straight from the zip archives.",
+)
+@click.option("--top-k", default=10, help="Number of nearest projects to find.")
+@click.option(
+    "--field",
+    default="abstract",
+    type=click.Choice(["abstract", "title"]),
+    help="Field to search for neighbours.",
+)
+@click.option("--force", is_flag=True, help="Run tasks even if up to date.")
+@click.option("--full", is_flag=True, help="Reprocess every project.")
+@click.option("--dry-run", is_flag=True, help="List the tasks without running.")
+def run(
+    stages: List[str],
+    fps: List[str],
+    workers: int,
+    embed_workers: int,
+    download_workers: int,
+    no_xml: bool,
+    xml_mode: str,
+    top_k: int,
+    field: str,
+    force: bool,
+    full: bool,
+    dry_run: bool,
+):
+    """Runs the pipeline."""
+    fps = list(fps) or CONFIG["framework_programmes"]
+    tasks = build_tasks(
+        fps,
+        list(stages),
+        xml=not no_xml,
+        xml_mode=xml_mode,
+        download_workers=download_workers,
+        top_k=top_k,
+        field=field,
+        full=full,
+    )
+
+    if dry_run:
+        for task in tasks:
+            status = "up to date" if task.is_up_to_date() else "stale"
+            click.echo(f"{task.stage}\t{task.fp or 'all'}\t{status}")
+        return
+
+    statuses = run_tasks(
+        tasks,
+        n_workers=workers,
+        force=force or full,
+        stage_limits={"embed_text": embed_workers},
+    )
+    failed = failed_tasks(statuses)
+    if failed:
+        logger.error(f"{len(failed)} tasks did not complete: {failed}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,9 +1,27 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import hashlib
+from itertools import compress
 from Levenshtein import distance
+import numpy as np
+import os
 import pandas as pd
+import pathlib
 import re
+import sys
 from toolz.functoolz import pipe
 
-from typing import Dict, Iterable, List, Tuple, Set, Union
+from typing import (
+    Container,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+    Set,
+    Union,
+)
 
 from acronym import PROJECT_DIR
 from acronym.utils.text import substring_in_string
@@ -11,12 +29,21 @@ from acronym.utils.text import substring_in_string
 
 OUT_DIR = PROJECT_DIR / "outputs/data/acronym_match/"
 
+# precompiled versions of the patterns used by the single record functions
+_DIGITS_RE = re.compile(r"\d+")
+_MULTI_DIGITS_RE = re.compile(r"\d\d")
+_REMOVE_CHARS_RE = re.compile(r"[,|/|\?|\(|\)|\:|\;|\.|\+|\*]")
+_SPACE_CHARS_RE = re.compile(r"[\-|_|]")
+_WHITESPACE_RE = re.compile(r"\s")
+_TITLE_SPLIT_RE = re.compile(r"[\-|_|\s|,|/|\?|\(|\)|\:|\;]")
+_TITLE_REMOVE_CHARS = ",-_.?()–;:"
+
 
 def remove_multi_digits(acronym: str) -> str:
     """Removes numbers from a string that are comprised of 2 or more continuous
     digits.
     """
-    nums = re.findall(r"\d+", acronym)
+    nums = _DIGITS_RE.findall(acronym)
     for num in nums:
         if len(num) > 1:
             acronym = acronym.replace(num, "")
@@ -25,10 +52,8 @@ def remove_multi_digits(acronym: str) -> str:
 
 def strip_punct(acronym: str) -> str:
     """Strips punctuation from acronyms."""
-    remove_chars = r"[,|/|\?|\(|\)|\:|\;|\.|\+|\*]"
-    space_chars = r"[\-|_|]"
-    stripped = re.sub(remove_chars, "", acronym)
-    return re.sub(space_chars, " ", stripped)
+    stripped = _REMOVE_CHARS_RE.sub("", acronym)
+    return _SPACE_CHARS_RE.sub(" ", stripped)
 
 
 def remove_acronym_from_title(acronym: str, title: str) -> str:
@@ -57,9 +82,7 @@ def not_in_text(
 
 def split_title(title: str) -> List[str]:
     """Splits a project title into terms without punctuation."""
-    remove_chars = ",-_.?()–;:"
-    split_chars = r"[\-|_|\s|,|/|\?|\(|\)|\:|\;]"
-    return [t for t in re.split(split_chars, title) if t not in remove_chars]
+    return [t for t in _TITLE_SPLIT_RE.split(title) if t not in _TITLE_REMOVE_CHARS]
 
 
 def extract_nth_characters(
@@ -70,10 +93,30 @@ def extract_nth_characters(
     return [t[:n] for t in title_terms]
 
 
+def normalise_stops(stops: Iterable[str]) -> FrozenSet[str]:
+    """Strips whitespace from and lowercases stop words, to match the
+    lowercased title terms, and drops any that are empty.
+    """
+    return frozenset(s for s in (s.strip().lower() for s in stops) if s)
+
+
+def load_title_stops(path: Union[pathlib.Path, str]) -> FrozenSet[str]:
+    """Loads the stop words for titles from a file with one word per line.
+
+    Args:
+        path: Path of the stop words file.
+
+    Returns:
+        Normalised stop words. See `normalise_stops`.
+    """
+    with open(path, "r") as f:
+        return normalise_stops(f)
+
+
 def remove_title_stops(
     title_terms: Iterable[str],
     min_term_len: int,
-    stops: List[str],
+    stops: Container[str],
 ) -> List[str]:
     """Returns title terms that are equal to or longer than `min_term_len` and
     that are not in `stops`.
@@ -81,6 +124,48 @@ def remove_title_stops(
     return [t for t in title_terms if (len(t) >= min_term_len) and (t not in stops)]
 
 
+def match_title_acronym(
+    acronym: str,
+    title_terms: Sequence[str],
+) -> Tuple[str, int]:
+    """Greedily matches the characters of an acronym, in order, to the
+    characters of a list of (truncated) title terms.
+
+    Each character is searched for in the rest of the term that the previous
+    character was found in and then in each following term. Only the term
+    that the last character was found in is ever partly used, so the search
+    keeps its position in that term instead of slicing the terms.
+
+    Args:
+        acronym: Normalised acronym.
+        title_terms: Terms of the title.
+
+    Returns:
+        The matched characters and a bitmask of the positions of the terms
+            that they were found in.
+    """
+    title_acronym = []
+    term_mask = 0
+    term_id = 0
+    offset = 0
+    n_terms = len(title_terms)
+
+    for char in acronym:
+        idx = title_terms[term_id].find(char, offset) if n_terms else -1
+        if idx < 0:
+            for next_term_id in range(term_id + 1, n_terms):
+                idx = title_terms[next_term_id].find(char)
+                if idx >= 0:
+                    term_id = next_term_id
+                    break
+        if idx >= 0:
+            title_acronym.append(char)
+            term_mask |= 1 << term_id
+            offset = idx + 1
+
+    return "".join(title_acronym), term_mask
+
+
 def find_title_acronym(
     acronym: str,
     title_terms: Iterable[str],
@@ -88,23 +173,9 @@ def find_title_acronym(
     """Finds the closest matching acronym-like string in a set of (truncated)
     terms from a project title.
     """
-    title_acronym = ""
-    title_term_ids = []
-    start_term = 0
-
-    title_terms = list([i, t] for i, t in enumerate(title_terms))
-
-    for char in acronym:
-        for term_id, term in title_terms[start_term:]:
-            idx = term.find(char)
-            if idx >= 0:
-                title_acronym = title_acronym + char
-                title_term_ids.append(term_id)
-                title_terms[term_id][1] = term[idx + 1 :]
-                start_term = term_id
-                break
-
-    return title_acronym, set(title_term_ids)
+    title_acronym, term_mask = match_title_acronym(acronym, list(title_terms))
+    term_ids = {i for i in range(term_mask.bit_length()) if (term_mask >> i) & 1}
+    return title_acronym, term_ids
 
 
 def acronymity(
@@ -113,7 +184,7 @@ def acronymity(
     min_term_len: int,
     min_order: int,
     max_order: int,
-    stops: List[str],
+    stops: Iterable[str],
 ) -> Dict[str, Union[str, int]]:
     """Finds characters of the acronym within the first `n` characters of the
     title tokens. This attempts to find each character in the acronym in the
@@ -128,7 +199,8 @@ def acronymity(
             to include.
         max_order: The minimum number of first characters from each title token
             to include.
-        stops: List of stop words to drop from tokenized titles.
+        stops: Stop words to drop from tokenized titles. They are normalised
+            with `normalise_stops`.
 
     Returns:
         record: A dictionary containing:
@@ -159,6 +231,8 @@ def acronymity(
     acronym = re.sub(r"\s", "", acronym)
     record["acronym_matched"] = acronym
 
+    stops = normalise_stops(stops)
+
     title_terms = pipe(
         title,
         lambda t: t.lower(),
@@ -184,6 +258,582 @@ def acronymity(
     return record
 
 
+def _normalise_acronym(acronym: str) -> str:
+    """Lowercases an acronym, removes multi digit numbers and strips
+    punctuation using the precompiled patterns.
+    """
+    acronym = acronym.lower()
+    if _MULTI_DIGITS_RE.search(acronym):
+        for num in _DIGITS_RE.findall(acronym):
+            if len(num) > 1:
+                acronym = acronym.replace(num, "")
+    return _SPACE_CHARS_RE.sub(" ", _REMOVE_CHARS_RE.sub("", acronym))
+
+
+def _title_terms(
+    acronym: str,
+    title: str,
+    min_term_len: int,
+    stops: Container[str],
+) -> List[str]:
+    """Lowercases, splits and filters a title using the precompiled patterns."""
+    title = remove_acronym_from_title(acronym, title.lower())
+    return [
+        t
+        for t in _TITLE_SPLIT_RE.split(title)
+        if (t not in _TITLE_REMOVE_CHARS)
+        and (len(t) >= min_term_len)
+        and (t not in stops)
+    ]
+
+
+class TitleTerms:
+    """Terms of many project titles, interned against a vocabulary so that
+    each title only needs to be tokenized once.
+
+    Titles are lowercased and split with the same pattern as `split_title`,
+    but all of their terms are kept so that the store doesn't depend on the
+    projects' acronyms or on the filters used by each stage. Acronyms are
+    removed from the start of titles and the terms are filtered when they are
+    used (see `acronym_terms`). This gives the same terms as `_title_terms`,
+    because normalised acronyms never contain the characters that titles are
+    split on.
+
+    Args:
+        vocab: Unique terms.
+        term_ids: Ids in `vocab` of the terms of every title, concatenated.
+        offsets: Position in `term_ids` of the first term of each title,
+            followed by the total number of terms.
+        ascii: Whether each title is ASCII.
+    """
+
+    # increment when changes to the tokenization should invalidate saved stores
+    VERSION = 1
+
+    def __init__(
+        self,
+        vocab: Sequence[str],
+        term_ids: np.array,
+        offsets: np.array,
+        ascii: np.array,
+    ):
+        self.vocab = vocab
+        self.term_ids = np.asarray(term_ids, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ascii = np.asarray(ascii, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the store."""
+        arrays = self.term_ids.nbytes + self.offsets.nbytes + self.ascii.nbytes
+        return arrays + sys.getsizeof(self.vocab) + sum(map(sys.getsizeof, self.vocab))
+
+    def read_only(self) -> "TitleTerms":
+        """View of the store that can't be used to modify it. The arrays are
+        read-only views and the vocabulary is a tuple.
+        """
+        arrays = []
+        for array in (self.term_ids, self.offsets, self.ascii):
+            view = array.view()
+            view.flags.writeable = False
+            arrays.append(view)
+        return TitleTerms(tuple(self.vocab), *arrays)
+
+    @classmethod
+    def from_titles(cls, titles: Iterable[str]) -> "TitleTerms":
+        """Tokenizes titles."""
+        vocab_ids = {}
+        term_ids = []
+        offsets = [0]
+        ascii = []
+        for title in titles:
+            ascii.append(title.isascii())
+            for term in _TITLE_SPLIT_RE.split(title.lower()):
+                term_ids.append(vocab_ids.setdefault(term, len(vocab_ids)))
+            offsets.append(len(term_ids))
+        return cls(list(vocab_ids), term_ids, offsets, ascii)
+
+    @classmethod
+    def concat(cls, stores: Sequence["TitleTerms"]) -> "TitleTerms":
+        """Combines stores into one with a shared vocabulary."""
+        vocab_ids = {}
+        term_ids = []
+        offsets = [np.zeros(1, dtype=np.int64)]
+        n_terms = 0
+        for store in stores:
+            mapping = np.array(
+                [vocab_ids.setdefault(t, len(vocab_ids)) for t in store.vocab],
+                dtype=np.int32,
+            )
+            term_ids.append(mapping[store.term_ids])
+            offsets.append(store.offsets[1:] + n_terms)
+            n_terms += store.offsets[-1]
+        return cls(
+            list(vocab_ids),
+            np.concatenate(term_ids) if term_ids else [],
+            np.concatenate(offsets),
+            np.concatenate([store.ascii for store in stores]) if stores else [],
+        )
+
+    def take(self, positions: Union[np.array, slice]) -> "TitleTerms":
+        """Selects the titles at some positions, given as a boolean mask,
+        indices or a slice. The vocabulary is reduced to the terms that they
+        use.
+        """
+        positions = np.arange(len(self))[positions]
+        starts = self.offsets[positions]
+        lengths = self.offsets[positions + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        term_positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(
+            offsets[-1]
+        )
+        used, term_ids = np.unique(self.term_ids[term_positions], return_inverse=True)
+        return TitleTerms(
+            [self.vocab[i] for i in used],
+            term_ids.reshape(-1),
+            offsets,
+            self.ascii[positions],
+        )
+
+    def terms(self, i: int) -> List[str]:
+        """All of the terms of a title."""
+        ids = self.term_ids[self.offsets[i] : self.offsets[i + 1]]
+        return [self.vocab[j] for j in ids]
+
+    def acronym_terms(
+        self,
+        acronyms: Sequence[str],
+        min_term_len: int,
+        stops: Container[str],
+    ) -> "TitleTerms":
+        """Filtered terms of each title, after removing its project's acronym
+        from the start of the title, as in `_title_terms`.
+
+        Args:
+            acronyms: Normalised acronyms without whitespace, i.e. the
+                `acronym_matched` of `acronymity`, in the same order as the
+                titles.
+            min_term_len: Drop any terms that are shorter than this.
+            stops: Terms to drop.
+
+        Returns:
+            Store of the filtered terms of each title. First terms with the
+                acronym removed are added to the end of the vocabulary.
+        """
+
+        def keep(term):
+            return (
+                (term not in _TITLE_REMOVE_CHARS)
+                and (len(term) >= min_term_len)
+                and (term not in stops)
+            )
+
+        # filter each unique term once
+        vocab = list(self.vocab)
+        kept = [keep(term) for term in vocab]
+        term_ids = self.term_ids.copy()
+        titles = np.flatnonzero(np.diff(self.offsets) > 0)
+        starts = self.offsets[titles]
+        stripped_ids = {}
+        for i, start, first_id in zip(
+            titles.tolist(), starts.tolist(), term_ids[starts].tolist()
+        ):
+            acronym = acronyms[i]
+            first = vocab[first_id]
+            if first.startswith(acronym.lower()):
+                # the title starts with the acronym
+                first = first[len(acronym) :]
+                if first not in stripped_ids:
+                    stripped_ids[first] = len(vocab)
+                    vocab.append(first)
+                    kept.append(keep(first))
+                term_ids[start] = stripped_ids[first]
+
+        is_kept = np.array(kept, dtype=bool)[term_ids]
+        n_kept = np.concatenate([[0], np.cumsum(is_kept)])
+        return TitleTerms(vocab, term_ids[is_kept], n_kept[self.offsets], self.ascii)
+
+    def mention_candidates(self, *acronyms: Sequence[str]) -> np.array:
+        """Flags titles that might contain a whole word, case insensitive
+        mention of any of their projects' acronyms (see
+        `acronym.utils.text.mention_patterns`).
+
+        A title is only ruled out if it and the acronyms are ASCII and no
+        lowercased acronym is contained in any of its terms, so a title that
+        isn't flagged is certain not to contain a mention.
+
+        Args:
+            acronyms: One or more sequences of acronyms, each in the same
+                order as the titles.
+
+        Returns:
+            Boolean array that is True for each title that might contain a
+            mention.
+        """
+        candidates = np.ones(len(self), dtype=bool)
+        vocab = self.vocab
+        term_ids = self.term_ids.tolist()
+        offsets = self.offsets.tolist()
+        for i, (is_ascii, title_acronyms) in enumerate(
+            zip(self.ascii.tolist(), zip(*acronyms))
+        ):
+            if not is_ascii:
+                continue
+            lowered = [acronym.lower() for acronym in title_acronyms]
+            if not all(
+                acronym and acronym.isascii() and not _TITLE_SPLIT_RE.search(acronym)
+                for acronym in lowered
+            ):
+                continue
+            terms = [vocab[j] for j in term_ids[offsets[i] : offsets[i + 1]]]
+            candidates[i] = any(
+                acronym in term for acronym in lowered for term in terms
+            )
+        return candidates
+
+    @classmethod
+    def titles_hash(cls, titles: pd.Series) -> str:
+        """Hash of some titles and the store version, to check whether a
+        saved store is up to date.
+        """
+        hashes = pd.util.hash_pandas_object(titles.astype(str), index=False)
+        h = hashlib.sha256(str(cls.VERSION).encode())
+        h.update(hashes.to_numpy().tobytes())
+        return h.hexdigest()
+
+    def save(self, path: Union[pathlib.Path, str], titles_hash: str):
+        """Atomically saves the store with the hash of its titles."""
+        path = pathlib.Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                # terms never contain newlines as titles are split on whitespace
+                vocab=np.frombuffer("\n".join(self.vocab).encode(), dtype=np.uint8),
+                n_vocab=len(self.vocab),
+                term_ids=self.term_ids,
+                offsets=self.offsets,
+                ascii=self.ascii,
+                titles_hash=titles_hash,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[pathlib.Path, str]) -> Tuple["TitleTerms", str]:
+        """Loads a saved store and the hash of its titles."""
+        with np.load(path) as data:
+            n_vocab = int(data["n_vocab"])
+            vocab = data["vocab"].tobytes().decode().split("\n")[:n_vocab]
+            store = cls(vocab, data["term_ids"], data["offsets"], data["ascii"])
+            return store, str(data["titles_hash"])
+
+
+# padding for character code arrays, outside the range of unicode code points
+_TERM_PAD = 0x110000
+_ACRONYM_PAD = 0x110001
+
+
+def _char_codes(strings: Sequence[str], width: int, pad: int) -> np.array:
+    """Unicode code points of the first `width` characters of each string as
+    an array of shape `(len(strings), width)`, padded with `pad`.
+    """
+    lengths = np.array([len(string) for string in strings], dtype=int)
+    if (lengths > width).any():
+        strings = [string[:width] for string in strings]
+        lengths = np.minimum(lengths, width)
+    codes = np.full((len(strings), max(width, 1)), pad, dtype=np.uint32)
+    rows = np.repeat(np.arange(len(strings)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    columns = np.arange(lengths.sum()) - np.repeat(starts, lengths)
+    codes[rows, columns] = np.frombuffer(
+        "".join(strings).encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+    )
+    return codes
+
+
+def match_title_acronyms(
+    acronyms: Sequence[str],
+    title_terms: TitleTerms,
+    orders: Iterable[int],
+) -> Dict[int, Tuple[List[str], np.array]]:
+    """Matches many acronyms to the truncated terms of their titles at once.
+
+    Gives the same matches as `match_title_acronym` for each acronym and the
+    first `order` characters of each of its title's terms. The characters of
+    each term in the vocabulary are converted to codes and a table of the
+    first position of each character in every term of every title is sorted
+    by character and then term. Each character of every acronym is then
+    matched in one vectorised step: it is searched for in the rest of the
+    current term and otherwise looked up in the table to find the next term
+    that contains it.
+
+    Args:
+        acronyms: Normalised acronyms without whitespace.
+        title_terms: Filtered terms of each title, in the same order as
+            `acronyms`. See `TitleTerms.acronym_terms`.
+        orders: Numbers of first characters of each term to match against.
+
+    Returns:
+        For each order, the matched characters of each acronym and an int
+            array of shape `(len(acronyms), max acronym length)` with the
+            position of the title term that each acronym character was found
+            in, or -1 if it wasn't found.
+    """
+    orders = list(orders)
+    if not orders:
+        return {}
+    width = max(orders)
+    starts = title_terms.offsets[:-1]
+    ends = title_terms.offsets[1:]
+    n_terms = len(title_terms.term_ids)
+
+    # number the characters of the vocabulary from 0 and mark the first
+    # position of each character in each term
+    vocab_codes = _char_codes(title_terms.vocab, width, _TERM_PAD)
+    vocab_is_first = vocab_codes != _TERM_PAD
+    for j in range(1, width):
+        earlier = vocab_codes[:, :j] == vocab_codes[:, j : j + 1]
+        vocab_is_first[:, j] &= ~earlier.any(axis=1)
+    alphabet = np.unique(vocab_codes[vocab_is_first])
+    char_dtype = np.min_scalar_type(len(alphabet))
+    vocab_chars = np.searchsorted(alphabet, vocab_codes).astype(char_dtype)
+    terms = vocab_chars[title_terms.term_ids]
+
+    # characters of the acronyms that aren't in any term can't be matched
+    acronym_lengths = np.array([len(acronym) for acronym in acronyms], dtype=int)
+    acronym_width = int(acronym_lengths.max(initial=1))
+    acronym_codes = _char_codes(acronyms, acronym_width, _ACRONYM_PAD)
+    acronym_chars = np.searchsorted(alphabet, acronym_codes)
+    in_alphabet = np.append(alphabet, _TERM_PAD)[acronym_chars] == acronym_codes
+    acronym_chars[~in_alphabet] = -1
+
+    # first positions sorted by character and then term, so that the next term
+    # containing a character is a binary search
+    term_ids, positions = np.nonzero(vocab_is_first[title_terms.term_ids])
+    chars = terms[term_ids, positions]
+    by_char = np.argsort(chars, kind="stable")
+    keys = chars[by_char].astype(np.int64) * (n_terms + 1) + term_ids[by_char]
+    positions = positions[by_char]
+
+    columns = np.arange(width)
+    matches = {}
+    for order in orders:
+        in_order = positions < order
+        # the sentinel means every search finds a key
+        order_keys = np.append(keys[in_order], np.iinfo(np.int64).max)
+        order_positions = np.append(positions[in_order], 0)
+
+        term = starts.copy()
+        offset = np.zeros(len(acronyms), dtype=int)
+        matched_terms = np.full(acronym_codes.shape, -1, dtype=int)
+        for k in range(acronym_width):
+            chars = acronym_chars[:, k]
+            active = np.flatnonzero((chars >= 0) & (term < ends))
+            if not len(active):
+                continue
+            chars = chars[active]
+            active_terms = term[active]
+
+            # search the rest of the current term
+            hits = (
+                (terms[active_terms] == chars[:, None])
+                & (columns >= offset[active][:, None])
+                & (columns < order)
+            )
+            found = hits.any(axis=1)
+            found_positions = hits.argmax(axis=1)
+
+            # otherwise check the next term, where most characters are found
+            rest = np.flatnonzero(~found)
+            next_terms = active_terms[rest] + 1
+            has_next = next_terms < ends[active[rest]]
+            rest, next_terms = rest[has_next], next_terms[has_next]
+            hits = (terms[next_terms] == chars[rest][:, None]) & (columns < order)
+            in_next = hits.any(axis=1)
+            rest_found = rest[in_next]
+            active_terms[rest_found] = next_terms[in_next]
+            found_positions[rest_found] = hits[in_next].argmax(axis=1)
+            found[rest_found] = True
+
+            # and then find the next term that contains the character
+            rest = rest[~in_next]
+            base = chars[rest] * (n_terms + 1)
+            idx = np.searchsorted(order_keys, base + active_terms[rest] + 1)
+            in_title = order_keys[idx] < base + ends[active[rest]]
+            rest, idx = rest[in_title], idx[in_title]
+            active_terms[rest] = order_keys[idx] - base[in_title]
+            found_positions[rest] = order_positions[idx]
+            found[rest] = True
+
+            matched = active[found]
+            term[matched] = active_terms[found]
+            offset[matched] = found_positions[found] + 1
+            matched_terms[matched, k] = active_terms[found]
+
+        is_matched = matched_terms >= 0
+        title_acronyms = list(acronyms)
+        for i in np.flatnonzero(is_matched.sum(axis=1) < acronym_lengths).tolist():
+            title_acronyms[i] = "".join(compress(acronyms[i], is_matched[i].tolist()))
+        matched_terms[is_matched] -= np.broadcast_to(
+            starts[:, None], matched_terms.shape
+        )[is_matched]
+        matches[order] = (title_acronyms, matched_terms)
+    return matches
+
+
+def n_terms_used(matched_terms: np.array) -> np.array:
+    """Number of distinct title terms in each row of the matched term
+    positions from `match_title_acronyms`.
+    """
+    matched_terms = np.sort(matched_terms, axis=1)
+    is_new = matched_terms >= 0
+    is_new[:, 1:] &= matched_terms[:, 1:] != matched_terms[:, :-1]
+    return is_new.sum(axis=1)
+
+
+def acronymity_batch(
+    acronyms: Sequence[str],
+    titles: Union[Sequence[str], TitleTerms],
+    min_term_len: int,
+    min_order: int,
+    max_order: int,
+    stops: Iterable[str],
+) -> pd.DataFrame:
+    """Calculates the acronymity of many projects at once.
+
+    Produces the same results as mapping `acronymity` over `acronyms` and
+    `titles`, but each title is tokenized only once and the truncated terms
+    for every order are derived from the same token list. Normalised acronyms
+    are cached so that repeated acronyms are only processed once, and the
+    acronyms are matched to the terms with `match_title_acronyms`.
+
+    Args:
+        acronyms: Project acronyms.
+        titles: Project titles, or their terms, in the same order as
+            `acronyms`.
+        min_term_len: Drop any tokens from the title that are shorter than this.
+        min_order: The minimum number of first characters from each title token
+            to include.
+        max_order: The maximum number of first characters from each title token
+            to include.
+        stops: Stop words to drop from tokenized titles. They are normalised
+            with `normalise_stops`.
+
+    Returns:
+        Dataframe with one row per project and the same columns as the
+            records returned by `acronymity`.
+    """
+    stops = normalise_stops(stops)
+    orders = range(min_order, max_order + 1)
+    if not isinstance(titles, TitleTerms):
+        titles = TitleTerms.from_titles(titles)
+
+    columns = {"acronym": [], "acronym_matched": []}
+    for order in orders:
+        columns[f"match_{order}"] = []
+        columns[f"dist_{order}"] = []
+        columns[f"n_terms_used_{order}"] = []
+    columns["n_title_terms"] = []
+
+    normalised = {}
+    for acronym in acronyms:
+        if acronym not in normalised:
+            acronym_norm = _normalise_acronym(acronym)
+            normalised[acronym] = (acronym_norm, _WHITESPACE_RE.sub("", acronym_norm))
+        acronym_norm, acronym_matched = normalised[acronym]
+        columns["acronym"].append(acronym_norm)
+        columns["acronym_matched"].append(acronym_matched)
+
+    acronyms_matched = columns["acronym_matched"]
+    title_terms = titles.acronym_terms(acronyms_matched, min_term_len, stops)
+    matches = match_title_acronyms(acronyms_matched, title_terms, orders)
+    for order in orders:
+        title_acronyms, matched_terms = matches[order]
+        columns[f"match_{order}"] = title_acronyms
+        columns[f"dist_{order}"] = [
+            distance(acronym_matched, title_acronym)
+            for acronym_matched, title_acronym in zip(acronyms_matched, title_acronyms)
+        ]
+        columns[f"n_terms_used_{order}"] = n_terms_used(matched_terms).tolist()
+    columns["n_title_terms"] = np.diff(title_terms.offsets).tolist()
+
+    return pd.DataFrame(columns)
+
+
+def _acronymity_chunk(
+    chunk: Tuple[Sequence[str], Union[Sequence[str], TitleTerms]],
+    **kwargs,
+) -> pd.DataFrame:
+    """Unpacks a chunk of acronyms and titles for `acronymity_batch`."""
+    return acronymity_batch(*chunk, **kwargs)
+
+
+def acronymity_parallel(
+    acronyms: Sequence[str],
+    titles: Union[Sequence[str], TitleTerms],
+    min_term_len: int,
+    min_order: int,
+    max_order: int,
+    stops: Iterable[str],
+    n_workers: int = 1,
+    chunk_size: int = 10000,
+) -> pd.DataFrame:
+    """Calculates the acronymity of many projects across a pool of processes.
+
+    The acronyms and titles are split into chunks of `chunk_size` which are
+    scored with `acronymity_batch` in separate worker processes. Results are
+    returned in the same order as the inputs.
+
+    Args:
+        acronyms: Project acronyms.
+        titles: Project titles, or their terms, in the same order as
+            `acronyms`.
+        min_term_len: Drop any tokens from the title that are shorter than this.
+        min_order: The minimum number of first characters from each title token
+            to include.
+        max_order: The maximum number of first characters from each title token
+            to include.
+        stops: Stop words to drop from tokenized titles. They are normalised
+            once with `normalise_stops` and shared by every chunk.
+        n_workers: Number of worker processes. If 1, the projects are scored
+            in the current process.
+        chunk_size: Number of projects sent to a worker at a time.
+
+    Returns:
+        Dataframe with one row per project and the same columns as
+            `acronymity_batch`.
+    """
+    score = partial(
+        _acronymity_chunk,
+        min_term_len=min_term_len,
+        min_order=min_order,
+        max_order=max_order,
+        stops=normalise_stops(stops),
+    )
+    if (n_workers <= 1) or (len(acronyms) <= chunk_size):
+        return score((acronyms, titles))
+
+    if isinstance(titles, TitleTerms):
+        title_chunks = [
+            titles.take(slice(i, i + chunk_size))
+            for i in range(0, len(acronyms), chunk_size)
+        ]
+    else:
+        title_chunks = [
+            titles[i : i + chunk_size] for i in range(0, len(acronyms), chunk_size)
+        ]
+    chunks = [
+        (acronyms[i : i + chunk_size], title_chunk)
+        for i, title_chunk in zip(range(0, len(acronyms), chunk_size), title_chunks)
+    ]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(score, chunks))
+    return pd.concat(results, ignore_index=True)
+
+
 def normalise_acronym_scores(
     acronyms: pd.DataFrame,
     min_order: int,
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from functools import wraps
+import inspect
+import numpy as np
+import pandas as pd
+import pathlib
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+def _copy_on_write_enabled() -> bool:
+    """Whether pandas copies data on write, so that shallow copies of a
+    dataframe cannot modify the original.
+    """
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        return pd.get_option("mode.copy_on_write") is True
+    except KeyError:
+        return False
+
+
+def _n_bytes(value: Any) -> int:
+    """Approximate memory used by a cached value.
+
+    Other objects are sized by their `nbytes` attribute, e.g.
+    `acronym.utils.acronyms.TitleTerms`, or count as 0 if they have none.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return int(getattr(value, "nbytes", 0))
+
+
+def _protect(value: Any) -> Any:
+    """Returns a view of a cached value that callers can't use to modify it.
+
+    Arrays are returned as read-only views. Dataframes are returned as shallow
+    copies if pandas copies on write, and as deep copies otherwise. Other
+    objects are returned by their `read_only` method if they have one.
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=not _copy_on_write_enabled())
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if hasattr(value, "read_only"):
+        return value.read_only()
+    return value
+
+
+class GetterCache:
+    """In-process least recently used cache for the results of getters.
+
+    Args:
+        max_bytes: Maximum memory used by cached values. The least recently
+            used values are evicted when this is exceeded. Values larger than
+            this are not cached.
+    """
+
+    def __init__(self, max_bytes: int = 2 ** 31):
+        self.max_bytes = max_bytes
+        self._values = OrderedDict()
+        self._n_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def n_bytes(self) -> int:
+        return self._n_bytes
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Looks up a key, marking it as recently used if it exists."""
+        if key not in self._values:
+            return False, None
+        self._values.move_to_end(key)
+        return True, self._values[key][0]
+
+    def put(self, key: Hashable, value: Any):
+        """Stores a value and evicts old values if the cache is too large."""
+        n_bytes = _n_bytes(value)
+        if n_bytes > self.max_bytes:
+            return
+        self.remove(key)
+        self._values[key] = (value, n_bytes)
+        self._n_bytes += n_bytes
+        self.evict()
+
+    def remove(self, key: Hashable):
+        """Removes a value if it is in the cache."""
+        if key in self._values:
+            self._n_bytes -= self._values.pop(key)[1]
+
+    def remove_stale(self, name: str, args: Hashable, key: Hashable):
+        """Removes values for the same getter call that were cached from
+        previous versions of its files.
+        """
+        stale = [k for k in self._values if k[:2] == (name, args) and k != key]
+        for k in stale:
+            self.remove(k)
+
+    def evict(self):
+        """Removes least recently used values until the cache is no larger
+        than `max_bytes`.
+        """
+        while self._n_bytes > self.max_bytes:
+            _, (_, n_bytes) = self._values.popitem(last=False)
+            self._n_bytes -= n_bytes
+
+    def clear(self):
+        """Removes all values."""
+        self._values.clear()
+        self._n_bytes = 0
+
+
+GETTER_CACHE = GetterCache()
+
+
+def clear_cache():
+    """Removes all results from the getter cache."""
+    GETTER_CACHE.clear()
+
+
+def set_cache_budget(max_bytes: int):
+    """Sets the maximum memory used by the getter cache."""
+    GETTER_CACHE.max_bytes = max_bytes
+    GETTER_CACHE.evict()
+
+
+def _file_state(path: pathlib.Path) -> Tuple[str, Optional[int], Optional[int]]:
+    """Path, modification time and size of a file, or None if it is missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return str(path), None, None
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def cached_getter(paths: Callable[[Dict[str, Any]], List[pathlib.Path]]):
+    """Caches the results of a getter in memory.
+
+    Results are keyed by the getter, its arguments and the modification time
+    and size of the files it reads, so they are reloaded when a file changes.
+    Cached values are returned in a form that can't be used to modify the
+    cached data (see `_protect`).
+
+    Args:
+        paths: Function from the getter's arguments, as a dict of parameter
+            names to values (including defaults), to the files it reads.
+    """
+
+    def decorator(getter: Callable) -> Callable:
+        signature = inspect.signature(getter)
+        name = f"{getter.__module__}.{getter.__qualname__}"
+
+        @wraps(getter)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            call_args = repr(sorted(bound.arguments.items()))
+            files = tuple(_file_state(p) for p in paths(bound.arguments))
+            key = (name, call_args, files)
+
+            found, value = GETTER_CACHE.get(key)
+            if not found:
+                GETTER_CACHE.remove_stale(name, call_args, key)
+                value = getter(*bound.args, **bound.kwargs)
+                GETTER_CACHE.put(key, value)
+            return _protect(value)
+
+        return wrapper
+
+    return decorator
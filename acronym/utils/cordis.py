@@ -1,18 +1,51 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import hashlib
+import json
+import logging
 import pandas as pd
 import pathlib
 import numpy as np
 import os
-from toolz.functoolz import pipe
-from typing import List, Tuple, Union
+from pandas.api.types import is_numeric_dtype
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import requests
+import shutil
+import tempfile
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+from xml.etree.ElementTree import iterparse
+import zipfile
 
 from acronym import PROJECT_DIR, get_yaml_config
-from acronym.utils.io import extractall, fetch
+from acronym.utils.io import download, extractall
 from acronym.utils.text import camel_to_snake
 
 
+logger = logging.getLogger(__name__)
+
 CORDIS_INPUT_DATA_DIR = PROJECT_DIR / "inputs/data/cordis/"
 CORDIS_OUTPUT_DATA_DIR = PROJECT_DIR / "outputs/data/cordis/"
 CONFIG = get_yaml_config(PROJECT_DIR / "acronym/config/cordis.yml")
+_NUMBER_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+_XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+_GEOLOCATION_PATTERN = (
+    r"^\s*\(?\s*(?P<lat>[^,()\s]+)\s*,\s*(?P<lon>[^,()\s]+)\s*\)?\s*$"
+)
 
 
 def cordis_input_path(
@@ -49,11 +82,405 @@ def cordis_output_path(
     return CORDIS_OUTPUT_DATA_DIR / f"{fp}/{sub_dir}"
 
 
-def fetch_xml_projects(fp: str = "h2020"):
-    """Downloads projects as individual XML files to `inputs/`."""
+def _strip_namespace(tag: str) -> str:
+    """Removes the `{namespace}` prefix from an XML tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _attribute_name(name: str, prefixes: Dict[str, str]) -> str:
+    """Replaces the `{namespace}` of an XML attribute name with its prefix,
+    e.g. `xsi:type`, so that it is not merged with an attribute of the same
+    name without a namespace.
+    """
+    if not name.startswith("{"):
+        return name
+    uri, local_name = name[1:].split("}", 1)
+    prefix = prefixes.get(uri)
+    return f"{prefix}:{local_name}" if prefix else local_name
+
+
+def _add_value(record: Dict[str, Any], field: str, value: Optional[str]):
+    """Adds a value to a record, collecting repeated fields into a list."""
+    if record[field] is None:
+        record[field] = value
+    elif isinstance(record[field], list):
+        record[field].append(value)
+    else:
+        record[field] = [record[field], value]
+
+
+def _iterparse_project(
+    source: Union[pathlib.Path, str, BinaryIO],
+    fields: Sequence[str],
+    child_path: Optional[str] = None,
+    child_fields: Sequence[str] = (),
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Parses the fields of a project and, optionally, of each repeated child
+    element at `child_path` from a CORDIS project XML file in one pass.
+    """
+    wanted = set(fields)
+    wanted_child = set(child_fields)
+    record = dict.fromkeys(fields)
+    children = []
+    child = None
+    child_depth = len(child_path.split("/")) + 1 if child_path else None
+
+    def add(field, value):
+        if field in wanted:
+            _add_value(record, field, value)
+        if (child is not None) and field.startswith(f"{child_path}/"):
+            child_field = field[len(child_path) + 1 :]
+            if child_field in wanted_child:
+                _add_value(child, child_field, value)
+
+    path = []
+    prefixes = {_XML_NAMESPACE: "xml"}
+    for event, elem in iterparse(source, events=("start-ns", "start", "end")):
+        if event == "start-ns":
+            ns_prefix, uri = elem
+            if ns_prefix:
+                prefixes.setdefault(uri, ns_prefix)
+        elif event == "start":
+            path.append(_strip_namespace(elem.tag))
+            if (len(path) == child_depth) and ("/".join(path[1:]) == child_path):
+                child = dict.fromkeys(child_fields)
+            if elem.attrib:
+                prefix = "".join(f"{tag}/" for tag in path[1:])
+                for name, value in elem.attrib.items():
+                    add(f"{prefix}@{_attribute_name(name, prefixes)}", value)
+        else:
+            field = "/".join(path[1:])
+            add(field, elem.text.strip() if elem.text else None)
+            if (child is not None) and (field == child_path):
+                children.append(child)
+                child = None
+            path.pop()
+            elem.clear()
+
+    return record, children
+
+
+def parse_project_xml(
+    source: Union[pathlib.Path, str, BinaryIO],
+    fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Parses a CORDIS project XML file into a flat record.
+
+    The file is parsed incrementally and only the requested fields are kept.
+    Fields are paths of element tags below the root element, separated by `/`
+    and without namespaces, e.g. `relations/associations/organization/legalName`.
+    Attributes are selected with `@`, e.g. `relations/associations/organization/@type`.
+    Namespaced attributes keep their prefix, e.g. `@xsi:type`.
+
+    Args:
+        source: Path to or file object of a project XML file.
+        fields: Paths of the fields to extract. Defaults to the fields in
+            `xml_project_fields` in the CORDIS config.
+
+    Returns:
+        record: Dict with a key for every field. Values are the text of the
+            element, None if it does not appear or a list if it appears more
+            than once.
+    """
+    fields = CONFIG["xml_project_fields"] if fields is None else fields
+    return _iterparse_project(source, fields)[0]
+
+
+def parse_project_organizations_xml(
+    source: Union[pathlib.Path, str, BinaryIO],
+    fields: Optional[Sequence[str]] = None,
+    organization_fields: Optional[Sequence[str]] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Parses a CORDIS project XML file into a flat project record and a flat
+    record for each of its organizations.
+
+    Args:
+        source: Path to or file object of a project XML file.
+        fields: Paths of the project fields to extract. Defaults to
+            `xml_project_fields` in the CORDIS config.
+        organization_fields: Paths of the organization fields to extract,
+            relative to each organization element. Defaults to
+            `xml_organization_fields` in the CORDIS config.
+
+    Returns:
+        record: Project record. See `parse_project_xml`.
+        organizations: Record for each organization.
+    """
+    fields = CONFIG["xml_project_fields"] if fields is None else fields
+    if organization_fields is None:
+        organization_fields = CONFIG["xml_organization_fields"]
+    return _iterparse_project(
+        source,
+        fields,
+        child_path=CONFIG["xml_organization_path"],
+        child_fields=organization_fields,
+    )
+
+
+def xml_project_files(fp: str) -> List[pathlib.Path]:
+    """Paths of the individual project XML files for a framework programme."""
+    xml_dir = cordis_input_path(fp, "xml_projects")
+    return sorted(xml_dir / f for f in os.listdir(xml_dir) if "project" in f)
+
+
+def xml_projects_zip_path(fp: str) -> pathlib.Path:
+    """Path of the downloaded zip of individual project XML files for a
+    framework programme.
+    """
+    return cordis_download_path(fp, CONFIG["xml_project_urls"][fp])
+
+
+def _zip_project_members(zip_path: pathlib.Path) -> List[str]:
+    """Names of the project XML files in a zip archive."""
+    with zipfile.ZipFile(zip_path) as z:
+        return sorted(
+            name
+            for name in z.namelist()
+            if ("project" in name.rsplit("/", 1)[-1]) and not name.endswith("/")
+        )
+
+
+def _parse_zip_members(
+    members: Sequence[str],
+    zip_path: pathlib.Path,
+    parse: Callable[[BinaryIO], Any],
+) -> List[Any]:
+    """Parses XML files directly from a zip archive without extracting them."""
+    with zipfile.ZipFile(zip_path) as z:
+        parsed = []
+        for member in members:
+            with z.open(member) as f:
+                parsed.append(parse(f))
+        return parsed
+
+
+def iter_parsed_xml_projects(
+    fp: str,
+    parse: Callable[[Union[pathlib.Path, BinaryIO]], Any],
+    from_zip: bool = False,
+    n_workers: int = 1,
+    chunksize: int = 64,
+) -> Iterator[Any]:
+    """Applies a parser to each individual project XML file for a framework
+    programme, in order of file name.
+
+    Args:
+        fp: Framework programme abbreviation.
+        parse: Function that parses a path or file object of a project XML
+            file. Must be picklable if `n_workers` is greater than 1.
+        from_zip: If True, files are streamed from the downloaded zip archive
+            rather than read from the extracted `xml_projects` directory.
+        n_workers: Number of processes to parse files with.
+        chunksize: Number of files sent to a worker process at a time.
+
+    Yields:
+        Output of `parse` for each file.
+    """
+    if from_zip:
+        zip_path = xml_projects_zip_path(fp)
+        members = _zip_project_members(zip_path)
+        chunks = [members[i : i + chunksize] for i in range(0, len(members), chunksize)]
+        parse_chunk = partial(_parse_zip_members, zip_path=zip_path, parse=parse)
+        if n_workers <= 1:
+            for chunk in chunks:
+                yield from parse_chunk(chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                for parsed in executor.map(parse_chunk, chunks):
+                    yield from parsed
+    else:
+        files = xml_project_files(fp)
+        if n_workers <= 1:
+            yield from map(parse, files)
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                yield from executor.map(parse, files, chunksize=chunksize)
+
+
+def _xml_sources(fp: str, from_zip: bool) -> List[pathlib.Path]:
+    """Files that the project XML records are read from."""
+    return [xml_projects_zip_path(fp)] if from_zip else xml_project_files(fp)
+
+
+def _xml_manifest_hash(
+    files: Sequence[pathlib.Path],
+    fields: Sequence[str],
+    organization_fields: Sequence[str],
+) -> str:
+    """Hash of the names, sizes and modification times of the XML files and
+    the fields extracted from them.
+    """
+    h = hashlib.sha256(json.dumps([list(fields), list(organization_fields)]).encode())
+    for file in files:
+        stat = file.stat()
+        h.update(f"{file.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def _records_to_frame(records: List[Dict[str, Any]], columns: Sequence[str]):
+    """Creates a dataframe from flat XML records. Columns where any record has
+    a repeated field are stored as lists for every record.
+    """
+    data = pd.DataFrame.from_records(records, columns=list(columns))
+    for col in data.columns:
+        values = data[col]
+        if values.map(lambda v: isinstance(v, list)).any():
+            data[col] = values.map(
+                lambda v: v if isinstance(v, list) or v is None else [v]
+            )
+    if "rcn" in data.columns:
+        data["rcn"] = pd.to_numeric(data["rcn"], errors="coerce").astype("Int64")
+    return data
+
+
+def xml_projects_paths(fp: str) -> Dict[str, pathlib.Path]:
+    """Paths of the compiled project and organization tables from the XML
+    files of a framework programme and of their manifest.
+    """
+    path = cordis_input_path(fp)
+    return {
+        "projects": path / "xml_projects.parquet",
+        "organizations": path / "xml_organizations.parquet",
+        "manifest": path / "xml_projects_manifest.json",
+    }
+
+
+def xml_projects_compiled(
+    fp: str,
+    fields: Optional[Sequence[str]] = None,
+    organization_fields: Optional[Sequence[str]] = None,
+) -> bool:
+    """Whether the compiled XML tables for a framework programme exist and
+    are up to date with the XML files and requested fields.
+    """
+    fields = CONFIG["xml_project_fields"] if fields is None else fields
+    if organization_fields is None:
+        organization_fields = CONFIG["xml_organization_fields"]
+    paths = xml_projects_paths(fp)
+    if not all(path.exists() for path in paths.values()):
+        return False
+    with open(paths["manifest"], "r") as f:
+        manifest = json.load(f)
+    try:
+        files = _xml_sources(fp, manifest.get("from_zip", False))
+        current_hash = _xml_manifest_hash(files, fields, organization_fields)
+    except FileNotFoundError:
+        return False
+    return manifest["hash"] == current_hash
+
+
+def compile_xml_projects(
+    fp: str = "h2020",
+    fields: Optional[Sequence[str]] = None,
+    organization_fields: Optional[Sequence[str]] = None,
+    n_workers: int = 1,
+    chunksize: int = 64,
+    from_zip: Optional[bool] = None,
+):
+    """Parses the individual project XML files for a framework programme into
+    a columnar project table and a child table of their organizations, keyed
+    by `rcn`. Both are saved as parquet files with a manifest that records
+    which XML files and fields they were created from.
+
+    Args:
+        fp: Framework programme abbreviation.
+        fields: Paths of the project fields to extract. Must include `rcn`.
+        organization_fields: Paths of the organization fields to extract.
+        n_workers: Number of processes to parse files with.
+        chunksize: Number of files sent to a worker process at a time.
+        from_zip: If True, parse the files directly from the downloaded zip
+            archive without extracting them. If None, the zip is only used
+            when the `xml_projects` directory does not exist.
+    """
+    fields = CONFIG["xml_project_fields"] if fields is None else fields
+    if organization_fields is None:
+        organization_fields = CONFIG["xml_organization_fields"]
+    if "rcn" not in fields:
+        raise ValueError("`fields` must include `rcn`.")
+    if from_zip is None:
+        from_zip = not cordis_input_path(fp, "xml_projects").exists()
+
+    manifest_hash = _xml_manifest_hash(
+        _xml_sources(fp, from_zip), fields, organization_fields
+    )
+    logger.info(f"Compiling XML projects for {fp.upper()}")
+
+    parse = partial(
+        parse_project_organizations_xml,
+        fields=fields,
+        organization_fields=organization_fields,
+    )
+    records = []
+    organizations = []
+    for record, record_organizations in iter_parsed_xml_projects(
+        fp, parse, from_zip, n_workers, chunksize
+    ):
+        records.append(record)
+        for organization in record_organizations:
+            organization["rcn"] = record["rcn"]
+            organizations.append(organization)
+
+    paths = xml_projects_paths(fp)
+    _records_to_frame(records, fields).to_parquet(paths["projects"], index=False)
+    _records_to_frame(organizations, ["rcn"] + list(organization_fields)).to_parquet(
+        paths["organizations"], index=False
+    )
+    with open(paths["manifest"], "w") as f:
+        json.dump(
+            {"hash": manifest_hash, "n_files": len(records), "from_zip": from_zip}, f
+        )
+
+
+def cordis_download_path(fp: str, url: str) -> pathlib.Path:
+    """Path that the raw file at `url` is downloaded to for a framework
+    programme, before it is extracted or copied into place.
+    """
+    return cordis_input_path(fp, "downloads") / url.rsplit("/", 1)[-1]
+
+
+def cordis_downloads(fp: str, xml: bool = True) -> List[Tuple[str, pathlib.Path]]:
+    """Urls and download paths of the raw CORDIS files for a framework
+    programme.
+
+    Args:
+        fp: Framework programme abbreviation.
+        xml: Whether to include the individual project XML files.
+
+    Returns:
+        Pairs of url and download path.
+    """
+    urls = [CONFIG["csv_project_urls"][fp]]
+    if CONFIG["csv_organization_urls"][fp]:
+        urls.append(CONFIG["csv_organization_urls"][fp])
+    if xml:
+        urls.append(CONFIG["xml_project_urls"][fp])
+    return [(url, cordis_download_path(fp, url)) for url in urls]
+
+
+def install_xml_projects(fp: str = "h2020"):
+    """Extracts downloaded individual project XML files to `inputs/`."""
+    url = CONFIG["xml_project_urls"][fp]
+    extractall(cordis_download_path(fp, url), cordis_input_path(fp, "xml_projects"))
+
+
+def fetch_xml_projects(
+    fp: str = "h2020",
+    session: Optional[requests.Session] = None,
+    stream_parse: bool = False,
+):
+    """Downloads projects as individual XML files to `inputs/`.
+
+    The zip archive is downloaded to disk rather than held in memory. If
+    `stream_parse` is True, the XML files are parsed straight from the archive
+    into the compiled project tables (see `compile_xml_projects`) instead of
+    being extracted.
+    """
     url = CONFIG["xml_project_urls"][fp]
-    xmls = fetch(url)
-    extractall(xmls, cordis_input_path(fp, "xml_projects"))
+    download(url, cordis_download_path(fp, url), session=session)
+    if stream_parse:
+        compile_xml_projects(fp, from_zip=True)
+    else:
+        install_xml_projects(fp)
 
 
 def _rearrange_projects(end_dir: Union[pathlib.Path, str]):
@@ -67,24 +494,37 @@ def _rearrange_projects(end_dir: Union[pathlib.Path, str]):
     os.rmdir(current_dir)
 
 
-def fetch_projects(fp: str = "h2020"):
-    """Downloads projects as a csv to `inputs/`."""
+def install_projects(fp: str = "h2020"):
+    """Copies or extracts the downloaded projects csv to `inputs/`."""
     url = CONFIG["csv_project_urls"][fp]
+    path = cordis_input_path(fp)
     if fp in ["fp7", "h2020"]:
-        data = fetch(url)
-        path = cordis_input_path(fp)
-        extractall(data, path)
+        extractall(cordis_download_path(fp, url), path)
         _rearrange_projects(path)
     else:
-        fname = cordis_input_path(fp) / "project.csv"
-        fetch(url, fname)
+        shutil.copyfile(cordis_download_path(fp, url), path / "project.csv")
+
+
+def fetch_projects(fp: str = "h2020", session: Optional[requests.Session] = None):
+    """Downloads projects as a csv to `inputs/`."""
+    url = CONFIG["csv_project_urls"][fp]
+    download(url, cordis_download_path(fp, url), session=session)
+    install_projects(fp)
+
+
+def install_organizations(fp: str = "fp6"):
+    """Copies the downloaded organizations csv to `inputs/`."""
+    url = CONFIG["csv_organization_urls"][fp]
+    shutil.copyfile(
+        cordis_download_path(fp, url), cordis_input_path(fp) / "organization.csv"
+    )
 
 
-def fetch_organizations(fp: str = "fp6"):
+def fetch_organizations(fp: str = "fp6", session: Optional[requests.Session] = None):
     """Downloads organizations as a csv to `inputs/`."""
     url = CONFIG["csv_organization_urls"][fp]
-    fname = cordis_input_path(fp) / "organization.csv"
-    fetch(url, fname)
+    download(url, cordis_download_path(fp, url), session=session)
+    install_organizations(fp)
 
 
 def parse_cordis_projects(
@@ -93,9 +533,13 @@ def parse_cordis_projects(
     list_sep: str = ";",
     drop_cols: List[str] = [],
 ) -> pd.DataFrame:
-    """Parse and clearn raw CORDIS data."""
+    """Parse and clearn raw CORDIS data.
+
+    List columns are cast to objects before they are split, as a column
+    with no values, e.g. in a chunk of a csv, is read as floats.
+    """
     for col in list_cols:
-        data[col] = data[col].str.split(list_sep)
+        data[col] = data[col].astype(object).str.split(list_sep)
 
     data = data.drop(drop_cols, axis=1)
     data.columns = [camel_to_snake(col) for col in data.columns]
@@ -107,19 +551,183 @@ def _parse_fp6_projects(data):
     FP6 funding data.
     """
     error_cols = ["ec_max_contribution", "total_cost"]
-    for c in error_cols:
-        data[c] = data[c].str.replace(",", ".").str.replace(" ", "").astype(float)
+    text_cols = [col for col in error_cols if not is_numeric_dtype(data[col])]
+    if text_cols:
+        data[text_cols] = _to_floats(data, text_cols)
     return data
 
 
-def reformat_project_csv(fp: str = "h2020"):
+def to_typed_table(
+    data: pd.DataFrame,
+    categorical_cols: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Prepares reformatted CORDIS data to be stored in a typed columnar file.
+
+    List and date columns are kept as they are, the columns in
+    `categorical_cols` are encoded as categoricals and any other columns of
+    mixed Python objects are converted to strings.
+
+    Args:
+        data: Reformatted project or organization data.
+        categorical_cols: Columns to encode as categoricals, if present.
+            Defaults to `typed_table_categorical_cols` in the CORDIS config.
+
+    Returns:
+        data: Data with consistent column types.
+    """
+    if categorical_cols is None:
+        categorical_cols = CONFIG["typed_table_categorical_cols"]
+    data = data.copy()
+    for col in data.columns:
+        if col in categorical_cols:
+            data[col] = data[col].astype("string").astype("category")
+        elif data[col].dtype == "O":
+            if data[col].map(lambda v: isinstance(v, list)).any():
+                data[col] = data[col].map(lambda v: v if isinstance(v, list) else None)
+            else:
+                data[col] = data[col].astype("string")
+    return data
+
+
+def _read_csv_chunks(
+    path: pathlib.Path, read_opts: Dict[str, Any], chunksize: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """Reads a csv in chunks of `chunksize` rows, or all at once if None."""
+    if chunksize is None:
+        yield pd.read_csv(path, **read_opts)
+        return
+    with pd.read_csv(path, chunksize=chunksize, **read_opts) as reader:
+        yield from reader
+
+
+def _combined_schema(
+    schemas: Sequence[pa.Schema], null_cols: Sequence[Set[str]]
+) -> pa.Schema:
+    """Schema that the typed tables of all of the chunks of a csv can be cast
+    to.
+
+    Types are promoted across chunks, e.g. integers to floats, ignoring chunks
+    where a column is empty. Columns whose types can't be promoted to a common
+    type are stored as strings.
+    """
+    fields = []
+    for name in schemas[0].names:
+        types = [
+            pa.schema([schema.field(name)])
+            for schema, nulls in zip(schemas, null_cols)
+            if name not in nulls
+        ]
+        if not types:
+            fields.append(schemas[0].field(name))
+            continue
+        try:
+            unified = pa.unify_schemas(types, promote_options="permissive")
+            fields.append(unified.field(name))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields, metadata=schemas[0].metadata)
+
+
+def _cast_column(column: pa.ChunkedArray, to_type: pa.DataType) -> pa.ChunkedArray:
+    """Casts a column of a chunk to its type in the combined schema. Values of
+    columns that are stored as strings are formatted as pandas would.
+    """
+    if column.null_count == len(column):
+        return pa.chunked_array([pa.nulls(len(column), to_type)])
+    if pa.types.is_string(to_type) and not pa.types.is_string(column.type):
+        return pa.chunked_array(
+            [pa.array(column.to_pandas().astype("string"), type=to_type)]
+        )
+    return column.cast(to_type)
+
+
+def _spill_typed_chunk(
+    data: pd.DataFrame, spill_path: pathlib.Path
+) -> Tuple[pa.Schema, Set[str]]:
+    """Writes the typed table of a chunk to an Arrow file. Returns its schema
+    and the names of its empty columns.
+    """
+    table = pa.Table.from_pandas(to_typed_table(data), preserve_index=False)
+    with pa.ipc.new_file(str(spill_path), table.schema) as writer:
+        writer.write_table(table)
+    null_cols = {
+        name
+        for name, column in zip(table.column_names, table.columns)
+        if column.null_count == len(column)
+    }
+    return table.schema, null_cols
+
+
+def _write_reformatted(path: pathlib.Path, chunks: Iterable[pd.DataFrame]):
+    """Writes reformatted chunks of a csv over the original csv and to a typed
+    copy (see `to_typed_table`) with the suffix `.parquet`.
+
+    Only one chunk is held in memory at a time. Each chunk is appended to a
+    temporary csv and its typed table is spilled to a temporary Arrow file.
+    The typed tables are then cast to a common schema and written to a
+    temporary parquet file, one row group per chunk. Both temporary files
+    are renamed over the outputs once they are complete, so that a failed
+    run leaves the original csv in place.
+    """
+    parquet_path = path.with_suffix(".parquet")
+    tmp_csv_path = path.with_name(f".{path.name}.tmp")
+    tmp_parquet_path = path.with_name(f".{parquet_path.name}.tmp")
+    try:
+        with tempfile.TemporaryDirectory(dir=path.parent) as spill_dir:
+            spill_paths = []
+            schemas = []
+            null_cols = []
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(
+                    tmp_csv_path, mode="a" if i else "w", header=not i, index=False
+                )
+                spill_paths.append(pathlib.Path(spill_dir) / f"{i}.arrow")
+                schema, nulls = _spill_typed_chunk(chunk, spill_paths[-1])
+                schemas.append(schema)
+                null_cols.append(nulls)
+
+            schema = _combined_schema(schemas, null_cols)
+            with pq.ParquetWriter(tmp_parquet_path, schema) as writer:
+                for spill_path in spill_paths:
+                    with pa.memory_map(str(spill_path)) as source:
+                        table = pa.ipc.open_file(source).read_all()
+                        columns = [
+                            _cast_column(table.column(field.name), field.type)
+                            for field in schema
+                        ]
+                        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        os.replace(tmp_parquet_path, parquet_path)
+        os.replace(tmp_csv_path, path)
+    finally:
+        for tmp_path in (tmp_csv_path, tmp_parquet_path):
+            if tmp_path.exists():
+                os.remove(tmp_path)
+
+
+def _reformat_projects(
+    data: pd.DataFrame, fp: str, parse_opts: Dict[str, Any]
+) -> pd.DataFrame:
+    """Reformats a chunk of a project csv."""
+    data = parse_cordis_projects(data, **parse_opts)
+    if fp == "fp6":
+        data = _parse_fp6_projects(data)
+    return data
+
+
+def reformat_project_csv(fp: str = "h2020", chunksize: Optional[int] = None):
     """Reformats project csv files such that:
         - List columns are transformed into Python lists
         - Column names are put into snake_case
         - Empty columns are dropped
         - Formatting errors are fixed (for FP6)
 
-    This overwrites the original csv.
+    This overwrites the original csv. A typed copy, with list, date and
+    categorical columns, is also saved as `project.parquet`.
+
+    Args:
+        fp: Framework programme abbreviation.
+        chunksize: If given, the csv is streamed this many rows at a time so
+            that memory use does not grow with the size of the file.
     """
     if fp in ["fp1", "fp2", "fp3", "fp4", "fp5", "fp6"]:
         read_opts = CONFIG["csv_project_read_opts"]["fp1_to_fp6"]
@@ -129,13 +737,38 @@ def reformat_project_csv(fp: str = "h2020"):
         parse_opts = {}
 
     path = cordis_input_path(fp) / "project.csv"
-    data = pd.read_csv(path, **read_opts)
-    data = parse_cordis_projects(data, **parse_opts)
+    chunks = _read_csv_chunks(path, read_opts, chunksize)
+    _write_reformatted(
+        path, (_reformat_projects(chunk, fp, parse_opts) for chunk in chunks)
+    )
+
+
+def _to_arrow_strings(values: pd.Series) -> pa.Array:
+    """Converts a column to an Arrow string array, with nulls for missing
+    values.
+    """
+    return pa.array(values.astype("string[pyarrow]")).cast(pa.string())
 
-    if fp == "fp6":
-        data = _parse_fp6_projects(data)
 
-    data.to_csv(path, index=False)
+def _parse_floats(values: pa.Array) -> np.array:
+    """Parses an Arrow string array of numbers as floats. Values that are not
+    numbers are NaN.
+    """
+    values = pc.utf8_trim_whitespace(values)
+    is_number = pc.match_substring_regex(values, _NUMBER_PATTERN)
+    values = pc.if_else(is_number, values, pa.scalar(None, pa.string()))
+    return pc.cast(values, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def _to_floats(data: pd.DataFrame, cols: Sequence[str]) -> np.array:
+    """Converts text columns to a 2D float array in a single pass, fixing
+    decimal commas and spaces used as thousands separators. Values that are
+    not numbers (some of the funding data has e.g. xxxxx for missing values)
+    are converted to NaN.
+    """
+    values = pa.concat_arrays([_to_arrow_strings(data[col]) for col in cols])
+    values = pc.replace_substring(pc.replace_substring(values, " ", ""), ",", ".")
+    return _parse_floats(values).reshape(len(cols), len(data)).T
 
 
 def parse_cordis_organizations(
@@ -146,28 +779,41 @@ def parse_cordis_organizations(
         - Empty columns are dropped
         - Formatting errors are fixed for float columns
 
-    This overwrites the original csv.
+    Returns the reformatted organizations.
     """
-    for col in float_cols:
-        if data[col].dtype == "O":
-            data[col] = pd.to_numeric(
-                data[col].str.replace(",", ".").str.replace(" ", ""),
-                errors="coerce",  # unbelievably some of the funding data has xxxxx for missing vals
-            )
+    text_cols = [col for col in float_cols if not is_numeric_dtype(data[col])]
+    if text_cols:
+        data[text_cols] = _to_floats(data, text_cols)
     data = data.drop(drop_cols, axis=1)
     data.columns = [camel_to_snake(col) for col in data.columns]
 
     return data
 
 
-def reformat_organization_csv(fp: str = "h2020"):
-    """Reformats project csv files such that:
-        - List columns are transformed into Python lists
+def _reformat_organizations(
+    data: pd.DataFrame, fp: str, parse_opts: Dict[str, Any]
+) -> pd.DataFrame:
+    """Reformats a chunk of an organization csv."""
+    data = parse_cordis_organizations(data, **parse_opts)
+    if fp in ["fp7", "h2020"]:
+        data["lat"], data["lon"] = _expand_geolocation(data["geolocation"])
+    return data
+
+
+def reformat_organization_csv(fp: str = "h2020", chunksize: Optional[int] = None):
+    """Reformats organization csv files such that:
         - Column names are put into snake_case
         - Empty (all NaN) columns are dropped
-        - Formatting errors are fixed (for FP6)
+        - Formatting errors are fixed for float columns
+        - Geolocations are expanded into `lat` and `lon` (for FP7 and H2020)
+
+    This overwrites the original csv. A typed copy, with date and categorical
+    columns, is also saved as `organization.parquet`.
 
-    This overwrites the original csv.
+    Args:
+        fp: Framework programme abbreviation.
+        chunksize: If given, the csv is streamed this many rows at a time so
+            that memory use does not grow with the size of the file.
     """
     if fp in ["fp1", "fp2", "fp3", "fp4", "fp5", "fp6"]:
         read_opts = CONFIG["csv_organization_read_opts"]["fp1_to_fp6"]
@@ -177,28 +823,18 @@ def reformat_organization_csv(fp: str = "h2020"):
         parse_opts = CONFIG["csv_organization_parse_opts"]["fp7_to_h2020"]
 
     path = cordis_input_path(fp) / "organization.csv"
-    data = pd.read_csv(path, **read_opts)
-    data = parse_cordis_organizations(data, **parse_opts)
-
-    if fp in ["fp7", "h2020"]:
-        data["lat"], data["lon"] = _expand_geolocation(data["geolocation"])
-
-    data.to_csv(path, index=False)
+    chunks = _read_csv_chunks(path, read_opts, chunksize)
+    _write_reformatted(
+        path, (_reformat_organizations(chunk, fp, parse_opts) for chunk in chunks)
+    )
 
 
-def _coord_to_float(coord: str) -> float:
-    """Turn lat coordinate into float, taking care of formatting error."""
-    return pipe(coord, lambda s: s.replace("(", ""), float)
-
-
-def _expand_geolocation(geolocation: pd.Series) -> Tuple[List, List]:
-    """Expands geolocation column into separate lat lon columns."""
-    geolocation_split = geolocation.str.split(",")
-    lat = [
-        _coord_to_float(g[0]) if type(g) == list else np.nan for g in geolocation_split
-    ]
-    lon = [
-        _coord_to_float(g[0]) if type(g) == list else np.nan for g in geolocation_split
-    ]
-
+def _expand_geolocation(geolocation: pd.Series) -> Tuple[np.array, np.array]:
+    """Expands geolocation column of `lat,lon` pairs, which may be wrapped in
+    brackets, into separate lat lon arrays. Missing or malformed
+    geolocations are NaN.
+    """
+    coords = pc.extract_regex(_to_arrow_strings(geolocation), _GEOLOCATION_PATTERN)
+    lat = _parse_floats(pc.struct_field(coords, [0]))
+    lon = _parse_floats(pc.struct_field(coords, [1]))
     return lat, lon
@@ -0,0 +1,393 @@
+import hashlib
+import json
+import numpy as np
+import os
+import pathlib
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from acronym.utils.io import make_path_if_not_exist
+
+
+STORAGE_DTYPES = ["float32", "float16", "int8"]
+
+
+def scales_path(path: Union[pathlib.Path, str]) -> pathlib.Path:
+    """Path of the per-vector scale factors for int8 embeddings at `path`."""
+    path = pathlib.Path(path)
+    return path.with_name(f"{path.stem}_scales.npy")
+
+
+def quantize(
+    embeddings: np.array,
+    dtype: str = "int8",
+) -> Tuple[np.array, Optional[np.array]]:
+    """Converts embeddings to a smaller storage type.
+
+    For int8, each vector is scaled so that its largest absolute value is 127.
+
+    Args:
+        embeddings: Float embeddings.
+        dtype: One of `float32`, `float16` or `int8`.
+
+    Returns:
+        quantized: Embeddings as `dtype`.
+        scales: Per-vector scale factors for int8, otherwise None.
+    """
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(f"dtype must be one of {STORAGE_DTYPES}, not {dtype}.")
+    if dtype != "int8":
+        return embeddings.astype(dtype), None
+
+    scales = np.abs(embeddings).max(axis=1).astype(np.float32) / 127
+    safe_scales = np.where(scales > 0, scales, 1)
+    quantized = np.rint(embeddings / safe_scales[:, None]).astype(np.int8)
+    return quantized, scales
+
+
+def dequantize(quantized: np.array, scales: Optional[np.array] = None) -> np.array:
+    """Converts quantized embeddings back to float32."""
+    embeddings = quantized.astype(np.float32)
+    if scales is not None:
+        embeddings *= scales[:, None]
+    return embeddings
+
+
+def save_embeddings(
+    path: Union[pathlib.Path, str],
+    embeddings: np.array,
+    dtype: str = "float32",
+    chunk_size: int = 10000,
+):
+    """Saves embeddings as a `.npy` file, quantizing them to `dtype`.
+
+    The embeddings are converted and written in chunks so that `embeddings`
+    can be a memory-mapped array larger than memory. For int8, the scale
+    factors are saved to a `_scales.npy` file next to `path`.
+
+    Args:
+        path: Path to the `.npy` file.
+        embeddings: Float embeddings.
+        dtype: One of `float32`, `float16` or `int8`.
+        chunk_size: Number of rows converted at a time.
+
+    Returns:
+        Memory-mapped array of the saved embeddings.
+    """
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(f"dtype must be one of {STORAGE_DTYPES}, not {dtype}.")
+    out = np.lib.format.open_memmap(
+        path, mode="w+", dtype=dtype, shape=embeddings.shape
+    )
+    scales = np.empty(len(embeddings), dtype=np.float32)
+    for i in range(0, len(embeddings), chunk_size):
+        out[i : i + chunk_size], chunk_scales = quantize(
+            np.asarray(embeddings[i : i + chunk_size]), dtype
+        )
+        if chunk_scales is not None:
+            scales[i : i + chunk_size] = chunk_scales
+    out.flush()
+
+    if dtype == "int8":
+        np.save(scales_path(path), scales)
+    elif scales_path(path).exists():
+        os.remove(scales_path(path))
+    return out
+
+
+class EmbeddingCache:
+    """On-disk store of text embeddings keyed by a hash of the model name,
+    preprocessing version and text.
+
+    Embeddings are stored as float32 in a SQLite database. When the total size
+    of the stored embeddings exceeds `max_bytes`, the least recently used
+    embeddings are evicted.
+
+    Args:
+        path: Path to the SQLite database. Created if it does not exist.
+        max_bytes: Maximum total size of the stored embeddings.
+        version: Version of the text preprocessing applied before embedding.
+            Changing this invalidates previously cached embeddings.
+    """
+
+    def __init__(
+        self,
+        path: Union[pathlib.Path, str],
+        max_bytes: int = 2 ** 32,
+        version: Union[int, str] = 1,
+    ):
+        path = pathlib.Path(path)
+        make_path_if_not_exist(path.parent)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key BLOB PRIMARY KEY, vector BLOB, last_used INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS last_used_idx ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._n_bytes = self.size()
+
+    def keys(self, model_name: str, texts: Iterable[str]) -> List[bytes]:
+        """Creates the cache keys for texts embedded with a model."""
+        prefix = f"{model_name}\0{self.version}\0".encode()
+        return [hashlib.sha256(prefix + text.encode()).digest() for text in texts]
+
+    def _select(self, columns: str, keys: Sequence[bytes]) -> Iterator[tuple]:
+        """Selects `columns` of the rows that exist for `keys`."""
+        unique_keys = list(set(keys))
+        for i in range(0, len(unique_keys), 500):
+            batch = unique_keys[i : i + 500]
+            yield from self._conn.execute(
+                f"SELECT {columns} FROM embeddings "
+                f"WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.array]:
+        """Fetches the embeddings that exist for `keys` and marks them as
+        recently used.
+        """
+        found = {
+            key: np.frombuffer(vector, dtype=np.float32)
+            for key, vector in self._select("key, vector", keys)
+        }
+        now = time.time_ns()
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE key = ?",
+            [(now, key) for key in found],
+        )
+        self._conn.commit()
+        return found
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.array):
+        """Stores embeddings and evicts old ones if the cache is too large."""
+        rows = {
+            key: np.asarray(vector, dtype=np.float32).tobytes()
+            for key, vector in zip(keys, vectors)
+        }
+        replaced = sum(n for _, n in self._select("key, LENGTH(vector)", rows))
+        now = time.time_ns()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+            [(key, vector, now) for key, vector in rows.items()],
+        )
+        self._conn.commit()
+        self._n_bytes += sum(len(vector) for vector in rows.values()) - replaced
+        self.evict()
+
+    def size(self) -> int:
+        """Total size in bytes of the stored embeddings."""
+        total = self._conn.execute(
+            "SELECT SUM(LENGTH(vector)) FROM embeddings"
+        ).fetchone()[0]
+        return total or 0
+
+    def evict(self):
+        """Removes the least recently used embeddings until the cache is no
+        larger than `max_bytes`.
+
+        The size of the cache is tracked as embeddings are stored and evicted,
+        so that the whole table is not scanned on every insert.
+        """
+        excess = self._n_bytes - self.max_bytes
+        if excess <= 0:
+            return
+
+        evict_keys = []
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        )
+        for key, n_bytes in rows:
+            evict_keys.append((key,))
+            excess -= n_bytes
+            self._n_bytes -= n_bytes
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", evict_keys)
+        self._conn.commit()
+
+    def close(self):
+        """Closes the connection to the database."""
+        self._conn.close()
+
+
+class NpyChunkWriter:
+    """Writes an array to a memory-mapped `.npy` file one chunk at a time.
+
+    The file is preallocated with the final shape of the array. After each
+    chunk is written, its id is recorded in a progress file next to the
+    array so that an interrupted run can resume without rewriting completed
+    chunks. The progress file is removed when the writer is closed after all
+    chunks have been written.
+
+    Args:
+        path: Path to the `.npy` file.
+        shape: Shape of the final array.
+        n_chunks: Number of chunks that will be written.
+        dtype: Data type of the array.
+        fingerprint: Identifier for the inputs used to create the array and
+            the rows in each chunk. A partially written file is only resumed
+            if the fingerprints and numbers of chunks match.
+    """
+
+    def __init__(
+        self,
+        path: Union[pathlib.Path, str],
+        shape: Tuple[int, ...],
+        n_chunks: int,
+        dtype: np.dtype = np.float32,
+        fingerprint: str = "",
+    ):
+        path = pathlib.Path(path)
+        make_path_if_not_exist(path.parent)
+        self.path = path
+        self.progress_path = path.with_name(path.name + ".progress.json")
+        self.n_chunks = n_chunks
+
+        progress = {
+            "shape": list(shape),
+            "dtype": np.dtype(dtype).str,
+            "n_chunks": n_chunks,
+            "fingerprint": fingerprint,
+            "completed": [],
+        }
+        if self.progress_path.exists() and path.exists():
+            with open(self.progress_path, "r") as f:
+                previous = json.load(f)
+            keys = ["shape", "dtype", "n_chunks", "fingerprint"]
+            if all(previous.get(k) == progress[k] for k in keys):
+                progress = previous
+
+        self._progress = progress
+        self.completed = set(progress["completed"])
+        if self.completed:
+            self.array = np.lib.format.open_memmap(path, mode="r+")
+        else:
+            self.array = np.lib.format.open_memmap(
+                path, mode="w+", dtype=dtype, shape=tuple(shape)
+            )
+            self._save_progress()
+
+    def is_done(self, chunk_id: int) -> bool:
+        """Whether a chunk was written by this or a previous run."""
+        return chunk_id in self.completed
+
+    def write(self, chunk_id: int, rows: Union[slice, np.array], values: np.array):
+        """Writes `values` to `rows` of the array and records the chunk as
+        complete.
+        """
+        self.array[rows] = values
+        self.array.flush()
+        self.completed.add(chunk_id)
+        self._save_progress()
+
+    def _save_progress(self):
+        """Atomically writes the ids of the completed chunks to disk."""
+        self._progress["completed"] = sorted(self.completed)
+        tmp_path = self.progress_path.with_name(self.progress_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def close(self):
+        """Flushes the array and, if every chunk has been written, removes the
+        progress file.
+        """
+        self.array.flush()
+        if len(self.completed) >= self.n_chunks:
+            os.remove(self.progress_path)
+
+
+class StackedEmbeddings:
+    """Row-indexable view over several embedding arrays, as if they had been
+    concatenated.
+
+    The arrays are not copied, so when they are memory-mapped only the rows
+    that are selected are read from disk.
+
+    Args:
+        arrays: Embedding arrays with the same number of columns.
+        ids: Identifiers for the rows of each array, e.g. project `rcn`s.
+        scales: Per-vector scale factors for each array that is stored as
+            int8, or None for arrays that are not.
+        dequantize: If True, selected rows are returned as float32.
+    """
+
+    def __init__(
+        self,
+        arrays: Sequence[np.array],
+        ids: Sequence[Sequence] = None,
+        scales: Optional[Sequence[Optional[np.array]]] = None,
+        dequantize: bool = True,
+    ):
+        self.arrays = list(arrays)
+        self.scales = [None] * len(self.arrays) if scales is None else list(scales)
+        self.dequantize = dequantize
+        self.offsets = np.cumsum([0] + [len(a) for a in self.arrays])
+        self.ids = None if ids is None else np.concatenate(ids)
+        if (self.ids is not None) and (len(self.ids) != self.offsets[-1]):
+            raise ValueError("Number of ids does not match number of rows.")
+        self._id_index = None
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def shape(self):
+        return (len(self), self.arrays[0].shape[1])
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32) if self.dequantize else self.arrays[0].dtype
+
+    def _rows(self, i: int, rows: Union[int, np.array]) -> np.array:
+        """Selects rows from the `i`th array, dequantizing them if needed."""
+        selected = self.arrays[i][rows]
+        if not self.dequantize:
+            return selected
+        scales = None if self.scales[i] is None else np.atleast_1d(self.scales[i][rows])
+        embeddings = dequantize(np.atleast_2d(selected), scales)
+        return embeddings if np.ndim(selected) == 2 else embeddings[0]
+
+    def __getitem__(self, idx) -> np.array:
+        if isinstance(idx, (int, np.integer)):
+            if idx < 0:
+                idx += len(self)
+            if not 0 <= idx < len(self):
+                raise IndexError(f"Index {idx} out of range.")
+            i = np.searchsorted(self.offsets, idx, side="right") - 1
+            return self._rows(i, idx - self.offsets[i])
+        elif isinstance(idx, slice):
+            idx = np.arange(len(self))[idx]
+        else:
+            idx = np.asarray(idx)
+            if idx.dtype == bool:
+                idx = np.flatnonzero(idx)
+            idx = np.where(idx < 0, idx + len(self), idx)
+            if ((idx < 0) | (idx >= len(self))).any():
+                raise IndexError("Index out of range.")
+
+        array_ids = np.searchsorted(self.offsets, idx, side="right") - 1
+        out = np.empty((len(idx), self.shape[1]), dtype=self.dtype)
+        for i in np.unique(array_ids):
+            mask = array_ids == i
+            out[mask] = self._rows(i, idx[mask] - self.offsets[i])
+        return out
+
+    def get_by_id(self, ids: Sequence) -> np.array:
+        """Selects rows by their identifiers, e.g. project `rcn`s."""
+        if self.ids is None:
+            raise ValueError("No ids were provided for these embeddings.")
+        if self._id_index is None:
+            self._id_index = {id_: i for i, id_ in enumerate(self.ids)}
+        try:
+            idx = [self._id_index[id_] for id_ in ids]
+        except KeyError as e:
+            raise KeyError(f"Id {e} not found in embeddings.") from None
+        return self[np.asarray(idx, dtype=int)]
@@ -0,0 +1,218 @@
+import numpy as np
+import pathlib
+from typing import Optional, Sequence, Tuple, Union
+
+from acronym.utils.io import make_path_if_not_exist
+from acronym.utils.similarity import normalize
+
+
+class IVFIndex:
+    """Approximate nearest neighbour index for cosine similarity search.
+
+    Embeddings are normalised and assigned to the closest of `n_lists`
+    centroids, found with spherical k-means. A query is only compared to the
+    embeddings assigned to its `n_probe` closest centroids, rather than to
+    every embedding.
+
+    Args:
+        n_lists: Number of centroids (inverted lists) to partition the
+            embeddings into.
+        n_probe: Default number of lists searched for each query.
+    """
+
+    def __init__(self, n_lists: int = 256, n_probe: int = 8):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.centroids = None
+        self.vectors = None
+        self.ids = None
+        self.assignments = None
+        self._offsets = None
+
+    def __len__(self) -> int:
+        return 0 if self.ids is None else len(self.ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(
+        self,
+        embeddings: np.array,
+        sample_size: int = 100000,
+        n_iter: int = 20,
+        seed: int = 0,
+    ):
+        """Finds the centroids with spherical k-means on a sample of
+        `embeddings`.
+        """
+        rng = np.random.default_rng(seed)
+        sample_ids = np.sort(
+            rng.choice(
+                len(embeddings), min(sample_size, len(embeddings)), replace=False
+            )
+        )
+        sample = normalize(embeddings[sample_ids])
+        n_lists = min(self.n_lists, len(sample))
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(n_iter):
+            assignments = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = ~sums.any(axis=1)
+            # reseed empty lists with random sample points
+            sums[empty] = sample[rng.choice(len(sample), empty.sum())]
+            centroids = normalize(sums)
+
+        self.n_lists = n_lists
+        self.centroids = centroids
+
+    @staticmethod
+    def _assign(
+        embeddings: np.array,
+        centroids: np.array,
+        block_size: int = 10000,
+    ) -> np.array:
+        """Finds the closest centroid to each normalised embedding."""
+        assignments = np.empty(len(embeddings), dtype=np.int64)
+        for i in range(0, len(embeddings), block_size):
+            scores = embeddings[i : i + block_size] @ centroids.T
+            assignments[i : i + block_size] = scores.argmax(axis=1)
+        return assignments
+
+    def add(self, embeddings: np.array, ids: Sequence, block_size: int = 10000):
+        """Adds embeddings to the index. The index is trained on them first if
+        it has not been trained yet.
+
+        Args:
+            embeddings: Embeddings to add. Can be memory-mapped or any
+                array-like object that supports row slicing.
+            ids: Identifier for each embedding, e.g. project `rcn`s.
+            block_size: Number of embeddings normalised at a time.
+        """
+        ids = np.asarray(ids)
+        if len(ids) != len(embeddings):
+            raise ValueError("Number of ids does not match number of embeddings.")
+        if len(ids) == 0:
+            return
+        if not self.is_trained:
+            self.train(embeddings)
+
+        vectors = np.concatenate(
+            [
+                normalize(embeddings[i : i + block_size])
+                for i in range(0, len(embeddings), block_size)
+            ]
+        )
+        assignments = self._assign(vectors, self.centroids)
+
+        if self.ids is None:
+            self.vectors, self.ids, self.assignments = vectors, ids, assignments
+        else:
+            self.vectors = np.concatenate([self.vectors, vectors])
+            self.ids = np.concatenate([self.ids, ids])
+            self.assignments = np.concatenate([self.assignments, assignments])
+        self._offsets = None
+
+    def remove(self, ids: Sequence) -> int:
+        """Removes the embeddings with some identifiers from the index.
+
+        Args:
+            ids: Identifiers of the embeddings to remove.
+
+        Returns:
+            Number of embeddings removed.
+        """
+        if len(self) == 0:
+            return 0
+        keep = ~np.isin(self.ids, ids)
+        n_removed = int((~keep).sum())
+        if n_removed:
+            self.vectors = self.vectors[keep]
+            self.ids = self.ids[keep]
+            self.assignments = self.assignments[keep]
+            self._offsets = None
+        return n_removed
+
+    def _sort_lists(self):
+        """Orders the stored embeddings by list so each list is contiguous."""
+        order = np.argsort(self.assignments, kind="stable")
+        self.vectors = self.vectors[order]
+        self.ids = self.ids[order]
+        self.assignments = self.assignments[order]
+        self._offsets = np.searchsorted(self.assignments, np.arange(self.n_lists + 1))
+
+    def search(
+        self,
+        queries: np.array,
+        k: int = 10,
+        n_probe: Optional[int] = None,
+    ) -> Tuple[np.array, np.array]:
+        """Finds the approximate `k` most similar embeddings to each query.
+
+        Args:
+            queries: Query embeddings, or a single query vector.
+            k: Number of results for each query.
+            n_probe: Number of lists to search. Defaults to `self.n_probe`.
+                Higher values are slower but more accurate.
+
+        Returns:
+            ids: Identifiers of the results for each query, in descending order
+                of similarity. Padded with -1 if fewer than `k` are found.
+            scores: Cosine similarities for `ids`. Padded with -inf.
+        """
+        if len(self) == 0:
+            raise ValueError("The index is empty.")
+        if self._offsets is None:
+            self._sort_lists()
+
+        queries = normalize(np.atleast_2d(queries))
+        n_probe = min(self.n_probe if n_probe is None else n_probe, self.n_lists)
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :n_probe]
+
+        result_ids = np.full((len(queries), k), -1, dtype=self.ids.dtype)
+        result_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for i, (query, lists) in enumerate(zip(queries, probes)):
+            rows = np.concatenate(
+                [
+                    np.arange(self._offsets[list_id], self._offsets[list_id + 1])
+                    for list_id in lists
+                ]
+            )
+            scores = self.vectors[rows] @ query
+            n = min(k, len(rows))
+            top = np.argpartition(-scores, n - 1)[:n] if n else rows[:0]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            result_ids[i, :n] = self.ids[rows[top]]
+            result_scores[i, :n] = scores[top]
+        return result_ids, result_scores
+
+    def save(self, path: Union[pathlib.Path, str]):
+        """Saves the index to a `.npz` file."""
+        if len(self) == 0:
+            raise ValueError("Cannot save an empty index.")
+        path = pathlib.Path(path)
+        make_path_if_not_exist(path.parent)
+        if self._offsets is None:
+            self._sort_lists()
+        np.savez(
+            path,
+            n_lists=self.n_lists,
+            n_probe=self.n_probe,
+            centroids=self.centroids,
+            vectors=self.vectors,
+            ids=self.ids,
+            assignments=self.assignments,
+        )
+
+    @classmethod
+    def load(cls, path: Union[pathlib.Path, str]) -> "IVFIndex":
+        """Loads an index saved with `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(n_lists=int(data["n_lists"]), n_probe=int(data["n_probe"]))
+            index.centroids = data["centroids"]
+            index.vectors = data["vectors"]
+            index.ids = data["ids"]
+            index.assignments = data["assignments"]
+        return index
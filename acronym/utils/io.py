@@ -1,12 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+import json
 import logging
+import os
 import pathlib
 import requests
+from requests.adapters import HTTPAdapter
 import tqdm
-from urllib.request import urlretrieve
+from urllib3.util.retry import Retry
 import zipfile
 
-from typing import Any, Union
+from typing import Any, List, Optional, Tuple, Union
 
 
 logger = logging.getLogger(__name__)
@@ -21,7 +25,7 @@ def make_path_if_not_exist(path: Union[pathlib.Path, str]):
     """If the path does not exist, make it"""
     path = convert_str_to_pathlib_path(path)
     if not path.exists():
-        path.mkdir(parents=True)
+        path.mkdir(parents=True, exist_ok=True)
 
 
 def fetch(
@@ -37,7 +41,7 @@ def fetch(
             bytes object.
 
     Returns:
-        bio: BytesIO of retrieved object if `fout` is not None.
+        bio: BytesIO of retrieved object if `fout` is None.
     """
     logger.info(f"Downloading {url}")
 
@@ -51,20 +55,31 @@ def fetch(
         bio = BytesIO()
         for chunk in stream(url, timeout=timeout):
             bio.write(chunk)
+        bio.seek(0)
         return bio
 
 
 def stream(
     url: str,
     timeout: int = None,
+    session: Optional[requests.Session] = None,
 ):
     """Streams a file from a url in 1MB chunks."""
+    session = requests if session is None else session
+    resp = session.get(url, stream=True, timeout=timeout)
+    yield from _iter_response(resp, url)
+
+
+def _iter_response(resp: requests.Response, desc: str, initial: int = 0):
+    """Yields the content of a streamed response in 1MB chunks with a
+    progress bar.
+    """
     chunk_size = 1024 * 1024
-    resp = requests.get(url, stream=True, timeout=timeout)
-    total = int(resp.headers.get("content-length", 0))
+    total = int(resp.headers.get("content-length", 0)) + initial
     with tqdm.tqdm(
-        desc=url,
+        desc=desc,
         total=total,
+        initial=initial,
         unit="b",
         unit_scale=True,
         unit_divisor=1024,
@@ -74,8 +89,199 @@ def stream(
             yield chunk
 
 
-def extractall(bytes: BytesIO, path: Union[pathlib.Path, str]):
-    """Extracts a bytes type zip file to a specified path."""
+def make_session(pool_size: int = 10, retries: int = 3) -> requests.Session:
+    """Creates a session that reuses connections and retries failed requests.
+
+    Args:
+        pool_size: Maximum number of connections kept open per host.
+        retries: Number of times to retry connection errors and server errors.
+
+    Returns:
+        session: Session to share between downloads.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=1,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _meta_path(fout: pathlib.Path) -> pathlib.Path:
+    """Path of the file recording the validators of a download."""
+    return fout.with_name(fout.name + ".meta.json")
+
+
+def _read_meta(fout: pathlib.Path) -> dict:
+    """Reads the validators recorded for a download, if there are any."""
+    path = _meta_path(fout)
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _write_meta(fout: pathlib.Path, meta: dict):
+    """Records the validators of a download."""
+    with open(_meta_path(fout), "w") as f:
+        json.dump(meta, f)
+
+
+def download(
+    url: str,
+    fout: Union[pathlib.Path, str],
+    session: Optional[requests.Session] = None,
+    timeout: int = 10,
+    resume: bool = True,
+    conditional: bool = True,
+) -> str:
+    """Downloads a file from a url, resuming partial downloads and skipping
+    files that have not changed.
+
+    Data is written to a `.part` file which is renamed to `fout` when the
+    download is complete. The response's ETag and Last-Modified headers are
+    saved next to `fout` and used to make conditional requests in later runs
+    and to check that a partial download is resumed from the same file. A
+    partial download is restarted if the server can't resume it from where it
+    stopped.
+
+    Args:
+        url: Url of object to retrieve.
+        fout: Path to save object.
+        session: Session to make requests with. A new one is created if None.
+        timeout: Seconds to wait for the server to respond.
+        resume: If True, continue a previous partial download with an HTTP
+            Range request.
+        conditional: If True and `fout` was previously downloaded from `url`,
+            only download it again if it has changed on the server.
+
+    Returns:
+        status: One of `downloaded`, `resumed` or `not_modified`.
+    """
+    fout = convert_str_to_pathlib_path(fout)
+    make_path_if_not_exist(fout.parent)
+    part = fout.with_name(fout.name + ".part")
+    session = make_session() if session is None else session
+
+    meta = _read_meta(fout)
+    same_url = meta.get("url") == url
+    validator = meta.get("etag") or meta.get("last_modified")
+    headers = {}
+    offset = 0
+    if conditional and same_url and meta.get("complete") and fout.exists():
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    elif resume and same_url and validator and part.exists():
+        offset = part.stat().st_size
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as resp:
+        if resp.status_code == 304:
+            logger.info(f"Not modified, skipping {url}")
+            return "not_modified"
+        restart = ("Range" in headers) and not _resumes_at(resp, offset)
+        if not restart:
+            resp.raise_for_status()
+            status = _save_response(resp, url, fout, part, offset)
+
+    if restart:
+        logger.warning(f"Could not resume {url} from {offset} bytes, restarting")
+        os.remove(part)
+        return download(url, fout, session, timeout, resume=False, conditional=False)
+    return status
+
+
+def _resumes_at(resp: requests.Response, offset: int) -> bool:
+    """Whether the response to a Range request can be appended to a partial
+    download of `offset` bytes. Full responses replace the partial download,
+    while partial responses must start at `offset`.
+    """
+    if resp.status_code == 416:
+        return False
+    if resp.status_code != 206:
+        return True
+    content_range = resp.headers.get("Content-Range", "")
+    try:
+        unit, byte_range = content_range.split(" ", 1)
+        start = int(byte_range.split("-", 1)[0])
+    except ValueError:
+        return False
+    return (unit == "bytes") and (start == offset)
+
+
+def _save_response(
+    resp: requests.Response,
+    url: str,
+    fout: pathlib.Path,
+    part: pathlib.Path,
+    offset: int,
+) -> str:
+    """Writes a response to the `.part` file of a download, appending to it
+    if the response is partial, and renames it to `fout` when complete.
+    """
+    if resp.status_code == 206:
+        logger.info(f"Resuming {url} from {offset} bytes")
+        mode, status = "ab", "resumed"
+    else:
+        logger.info(f"Downloading {url}")
+        mode, status, offset = "wb", "downloaded", 0
+
+    meta = {
+        "url": url,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "complete": False,
+    }
+    _write_meta(fout, meta)
+    with open(part, mode) as f:
+        for chunk in _iter_response(resp, url, initial=offset):
+            f.write(chunk)
+
+    os.replace(part, fout)
+    meta["complete"] = True
+    _write_meta(fout, meta)
+    return status
+
+
+def download_many(
+    jobs: List[Tuple[str, Union[pathlib.Path, str]]],
+    n_workers: int = 4,
+    **kwargs,
+) -> List[str]:
+    """Downloads several files concurrently with a shared session.
+
+    Args:
+        jobs: Pairs of url and output path.
+        n_workers: Number of concurrent downloads.
+        kwargs: Passed to `download`.
+
+    Returns:
+        Status of each download. See `download`.
+    """
+    session = make_session(pool_size=n_workers)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(download, url, fout, session=session, **kwargs)
+            for url, fout in jobs
+        ]
+        return [future.result() for future in futures]
+
+
+def extractall(
+    bytes: Union[BytesIO, pathlib.Path, str],
+    path: Union[pathlib.Path, str],
+):
+    """Extracts a zip file, as bytes or a path, to a specified path."""
     logger.info(f"Extracting to {path}")
 
     make_path_if_not_exist(path)
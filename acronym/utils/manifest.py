@@ -0,0 +1,206 @@
+import hashlib
+import json
+import numpy as np
+import os
+import pandas as pd
+import pathlib
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+from acronym.utils.cordis import cordis_output_path
+from acronym.utils.io import make_path_if_not_exist
+
+
+def refresh_manifest_path(fp: str) -> pathlib.Path:
+    """Path of the refresh manifest for a framework programme's outputs."""
+    return cordis_output_path(fp) / "refresh_manifest.json"
+
+
+def content_hashes(
+    data: pd.DataFrame,
+    columns: Sequence[str],
+    key: str = "rcn",
+) -> pd.Series:
+    """Hashes the contents of some of the columns of each row.
+
+    Values are converted to strings before they are hashed so that the hashes
+    don't depend on whether a table was read from a csv or a parquet file.
+
+    Args:
+        data: Table of projects.
+        columns: Columns whose values a stage's outputs depend on.
+        key: Column that identifies each row.
+
+    Returns:
+        Series of unsigned 64-bit hashes indexed by `key`, in the same order
+        as `data`.
+    """
+    hashes = pd.util.hash_pandas_object(
+        data[list(columns)].astype(str), index=False
+    ).to_numpy()
+    return pd.Series(hashes, index=pd.Index(data[key].to_numpy(), name=key))
+
+
+def params_hash(params: Dict[str, Any]) -> str:
+    """Hashes the parameters of a stage, e.g. its config, so that changing
+    them triggers a full refresh.
+    """
+    return hashlib.sha256(
+        json.dumps(params, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class RefreshManifest:
+    """Record of the projects that each stage of the pipeline has processed
+    for a framework programme.
+
+    For each stage, the manifest stores a hash of the stage's parameters, the
+    output files it produced and the `rcn` and content hash of every project,
+    in the same order as the rows of the outputs. On the next run, only
+    projects that are new or whose hash has changed need to be processed and
+    their results can be merged with the rows of the existing outputs.
+
+    Args:
+        path: Path of the manifest's JSON file.
+    """
+
+    def __init__(self, path: Union[pathlib.Path, str]):
+        self.path = pathlib.Path(path)
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self._stages = json.load(f)
+        else:
+            self._stages = {}
+
+    def changed(
+        self,
+        stage: str,
+        hashes: pd.Series,
+        params: Dict[str, Any],
+        outputs: Sequence[Union[pathlib.Path, str]],
+    ) -> np.array:
+        """Finds the projects that a stage needs to process.
+
+        Every project is returned as changed if the stage has not been run
+        before, its parameters have changed, any of its outputs are missing
+        or the project `rcn`s are not unique.
+
+        Args:
+            stage: Name of the pipeline stage.
+            hashes: Current content hashes, from `content_hashes`.
+            params: Parameters of the stage.
+            outputs: Files produced by the stage.
+
+        Returns:
+            Boolean array that is True for each project in `hashes` that is
+            new or has changed.
+        """
+        previous = self._stages.get(stage)
+        if (
+            (previous is None)
+            or (previous["params"] != params_hash(params))
+            or (not all(pathlib.Path(path).exists() for path in outputs))
+            or (not hashes.index.is_unique)
+        ):
+            return np.ones(len(hashes), dtype=bool)
+
+        previous_hashes = pd.Series(
+            np.asarray(previous["hash"], dtype=np.uint64),
+            index=pd.Index(previous["rcn"]),
+        )
+        matched = previous_hashes.reindex(hashes.index)
+        return (matched.isna() | (matched != hashes)).to_numpy()
+
+    def recorded(self, stage: str) -> Tuple[Optional[str], Optional[pd.Series]]:
+        """Parameters hash and content hashes, indexed by `rcn`, recorded for
+        the last run of a stage, or None for both if it has not been run.
+        """
+        previous = self._stages.get(stage)
+        if previous is None:
+            return None, None
+        hashes = pd.Series(
+            np.asarray(previous["hash"], dtype=np.uint64),
+            index=pd.Index(previous["rcn"], name="rcn"),
+        )
+        return previous["params"], hashes
+
+    def is_unchanged(self, stage: str, hashes: pd.Series) -> bool:
+        """Whether a stage has already processed exactly these projects, in
+        this order, i.e. whether there is nothing to merge.
+        """
+        previous = self._stages.get(stage)
+        return (
+            (previous is not None)
+            and (previous["rcn"] == hashes.index.tolist())
+            and (previous["hash"] == [int(h) for h in hashes])
+        )
+
+    def previous_positions(self, stage: str, rcns: Sequence) -> np.array:
+        """Row positions of projects in the outputs of the previous run of a
+        stage. Projects that were not in the previous run are given -1.
+        """
+        return pd.Index(self._stages[stage]["rcn"]).get_indexer(rcns)
+
+    def update(
+        self,
+        stage: str,
+        hashes: pd.Series,
+        params: Dict[str, Any],
+        outputs: Sequence[Union[pathlib.Path, str]],
+    ):
+        """Records that a stage has processed all of the projects in `hashes`
+        and saves the manifest.
+        """
+        self._stages[stage] = {
+            "params": params_hash(params),
+            "outputs": [str(path) for path in outputs],
+            "rcn": hashes.index.tolist(),
+            "hash": [int(h) for h in hashes],
+        }
+        self.save()
+
+    def save(self):
+        """Atomically writes the manifest to disk."""
+        make_path_if_not_exist(self.path.parent)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._stages, f)
+        os.replace(tmp_path, self.path)
+
+
+def merge_rows(
+    previous: Union[np.array, pd.DataFrame],
+    previous_positions: np.array,
+    updates: Union[np.array, pd.DataFrame],
+    changed: np.array,
+) -> Union[np.array, pd.DataFrame]:
+    """Combines the rows of a stage's previous output for unchanged projects
+    with new rows for changed projects, in the current order of the projects.
+
+    Args:
+        previous: Output of the previous run of the stage.
+        previous_positions: Position of each current project in `previous`,
+            from `RefreshManifest.previous_positions`.
+        updates: New rows for the changed projects, in their current order.
+        changed: Boolean array that is True for each changed project.
+
+    Returns:
+        Rows for all of the current projects.
+    """
+    changed = np.asarray(changed, dtype=bool)
+    if isinstance(previous, pd.DataFrame):
+        parts = pd.concat(
+            [
+                previous.iloc[previous_positions[~changed]].reset_index(drop=True),
+                updates.reset_index(drop=True),
+            ],
+            ignore_index=True,
+        )
+        order = np.empty(len(changed), dtype=int)
+        order[~changed] = np.arange((~changed).sum())
+        order[changed] = np.arange((~changed).sum(), len(changed))
+        return parts.iloc[order].reset_index(drop=True)
+
+    merged = np.empty((len(changed),) + updates.shape[1:], dtype=updates.dtype)
+    merged[~changed] = previous[previous_positions[~changed]]
+    merged[changed] = updates
+    return merged
@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from typing import Tuple
+
+
+def normalize(embeddings: np.array) -> np.array:
+    """L2 normalises the rows of an array as float32. Rows of zeros are left
+    as zeros.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms > 0, norms, 1)
+
+
+def paired_cosine_similarity(
+    a: np.array,
+    b: np.array,
+    block_size: int = 10000,
+) -> np.array:
+    """Cosine similarity between each row of `a` and the same row of `b`.
+
+    Args:
+        a: Embeddings. Can be memory-mapped or any array-like object that
+            supports row slicing.
+        b: Embeddings with the same shape as `a`.
+        block_size: Number of rows loaded and normalised at a time.
+
+    Returns:
+        Array of similarities, one for each row.
+    """
+    if len(a) != len(b):
+        raise ValueError("Both sets of embeddings must have the same number of rows.")
+
+    similarities = np.empty(len(a), dtype=np.float32)
+    for i in range(0, len(a), block_size):
+        a_block = normalize(a[i : i + block_size])
+        b_block = normalize(b[i : i + block_size])
+        similarities[i : i + block_size] = np.einsum("ij,ij->i", a_block, b_block)
+    return similarities
+
+
+def _merge_top_k(
+    top_ids: np.array,
+    top_scores: np.array,
+    ids: np.array,
+    scores: np.array,
+    k: int,
+) -> Tuple[np.array, np.array]:
+    """Merges a block of candidate scores into the running top `k`."""
+    ids = np.concatenate([top_ids, ids], axis=1)
+    scores = np.concatenate([top_scores, scores], axis=1)
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ids = np.take_along_axis(ids, keep, axis=1)
+        scores = np.take_along_axis(scores, keep, axis=1)
+    return ids, scores
+
+
+def _top_k_block(
+    queries: np.array,
+    corpus: np.array,
+    k: int,
+    block_size: int,
+) -> Tuple[np.array, np.array]:
+    """Finds the top `k` most similar rows of `corpus` for a block of
+    normalised queries.
+    """
+    top_ids = np.empty((len(queries), 0), dtype=np.int64)
+    top_scores = np.empty((len(queries), 0), dtype=np.float32)
+    for j in range(0, len(corpus), block_size):
+        corpus_block = normalize(corpus[j : j + block_size])
+        scores = queries @ corpus_block.T
+        ids = np.broadcast_to(np.arange(j, j + len(corpus_block)), scores.shape)
+        top_ids, top_scores = _merge_top_k(top_ids, top_scores, ids, scores, k)
+
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(top_ids, order, axis=1),
+        np.take_along_axis(top_scores, order, axis=1),
+    )
+
+
+def top_k_cosine_similarity(
+    queries: np.array,
+    corpus: np.array,
+    k: int = 10,
+    block_size: int = 4096,
+    n_threads: int = 1,
+) -> Tuple[np.array, np.array]:
+    """Finds the `k` rows of `corpus` with the highest cosine similarity to
+    each row of `queries`.
+
+    Similarities are calculated between blocks of `block_size` queries and
+    blocks of `block_size` corpus rows, so at most `block_size` x `block_size`
+    scores are held in memory per thread.
+
+    Args:
+        queries: Query embeddings. Can be memory-mapped or any array-like
+            object that supports row slicing.
+        corpus: Embeddings to search. Can be memory-mapped or any array-like
+            object that supports row slicing.
+        k: Number of most similar rows to return for each query.
+        block_size: Number of rows in each block of queries and corpus.
+        n_threads: Number of query blocks processed concurrently.
+
+    Returns:
+        ids: Row indices of the most similar rows of `corpus` for each query,
+            in descending order of similarity.
+        scores: Cosine similarities for `ids`.
+    """
+    k = min(k, len(corpus))
+
+    def search(start: int) -> Tuple[np.array, np.array]:
+        query_block = normalize(queries[start : start + block_size])
+        return _top_k_block(query_block, corpus, k, block_size)
+
+    starts = range(0, len(queries), block_size)
+    if n_threads > 1:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            results = list(executor.map(search, starts))
+    else:
+        results = [search(start) for start in starts]
+
+    if not results:
+        return np.empty((0, k), dtype=np.int64), np.empty((0, k), dtype=np.float32)
+    ids, scores = zip(*results)
+    return np.concatenate(ids), np.concatenate(scores)
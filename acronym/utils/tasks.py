@@ -0,0 +1,208 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import importlib
+import logging
+import os
+import pathlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+TaskKey = Tuple[str, Optional[str]]
+FAILED = ("failed", "upstream_failed", "not_run")
+
+
+def _call(target: str, kwargs: Dict[str, Any]):
+    """Imports and calls a function given as `module:function`.
+
+    Functions are imported when the task runs, so that a worker process only
+    imports the dependencies of the stages it runs.
+    """
+    module, name = target.split(":")
+    return getattr(importlib.import_module(module), name)(**kwargs)
+
+
+class Task:
+    """A stage of the pipeline for a single framework programme.
+
+    Args:
+        stage: Name of the stage.
+        fp: Framework programme abbreviation, or None for a task that covers
+            all framework programmes.
+        target: Function that runs the task, as `module:function`.
+        kwargs: Keyword arguments for the function.
+        inputs: Files that the task reads.
+        outputs: Files that the task writes.
+        deps: Keys, as (stage, fp), of tasks that must finish first. Keys of
+            tasks that are not being run are ignored.
+        always_run: If True, the task is run even if its outputs are up to
+            date, e.g. because its inputs are remote.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        fp: Optional[str],
+        target: str,
+        kwargs: Optional[Dict[str, Any]] = None,
+        inputs: Sequence[Union[pathlib.Path, str]] = (),
+        outputs: Sequence[Union[pathlib.Path, str]] = (),
+        deps: Sequence[TaskKey] = (),
+        always_run: bool = False,
+    ):
+        self.stage = stage
+        self.fp = fp
+        self.target = target
+        self.kwargs = {} if kwargs is None else kwargs
+        self.inputs = [pathlib.Path(path) for path in inputs]
+        self.outputs = [pathlib.Path(path) for path in outputs]
+        self.deps = list(deps)
+        self.always_run = always_run
+
+    @property
+    def key(self) -> TaskKey:
+        return self.stage, self.fp
+
+    def __repr__(self) -> str:
+        return f"Task({self.stage}, {self.fp or 'all'})"
+
+    def is_up_to_date(self) -> bool:
+        """Whether all of the task's outputs exist and are newer than all of
+        its inputs.
+        """
+        if self.always_run or not self.outputs:
+            return False
+        try:
+            oldest_output = min(os.path.getmtime(path) for path in self.outputs)
+        except FileNotFoundError:
+            return False
+        inputs = [path for path in self.inputs if path.exists()]
+        return all(os.path.getmtime(path) <= oldest_output for path in inputs)
+
+
+def _check_tasks(tasks: Dict[TaskKey, Task]):
+    """Raises a ValueError if the task dependencies contain a cycle."""
+    visited = {}
+
+    def visit(key: TaskKey):
+        if visited.get(key) == "visiting":
+            raise ValueError(f"Dependency cycle at {tasks[key]}.")
+        if key in visited:
+            return
+        visited[key] = "visiting"
+        for dep in tasks[key].deps:
+            if dep in tasks:
+                visit(dep)
+        visited[key] = "done"
+
+    for key in tasks:
+        visit(key)
+
+
+def run_tasks(
+    tasks: Sequence[Task],
+    n_workers: int = 1,
+    force: bool = False,
+    stage_limits: Optional[Dict[str, int]] = None,
+) -> Dict[TaskKey, str]:
+    """Runs tasks in dependency order, in parallel across processes.
+
+    A task is started once all of its dependencies have finished. It is
+    skipped if its outputs are newer than its inputs, which is checked when
+    it is ready to run so that outputs written by its dependencies are taken
+    into account. If a task fails, the tasks that depend on it are not run.
+
+    Args:
+        tasks: Tasks to run.
+        n_workers: Number of processes. If 1, tasks are run one at a time in
+            the current process.
+        force: If True, run tasks even if their outputs are up to date.
+        stage_limits: Maximum number of tasks from a stage that can run at
+            once, e.g. to stop several processes loading the same large model.
+
+    Returns:
+        Status of each task: `done`, `skipped`, `failed`, `upstream_failed` or
+            `not_run` if it could never be started, e.g. because its stage's
+            limit is 0.
+    """
+    pending = {task.key: task for task in tasks}
+    if len(pending) != len(tasks):
+        raise ValueError("Task keys must be unique.")
+    _check_tasks(pending)
+    keys = set(pending)
+    stage_limits = {} if stage_limits is None else stage_limits
+
+    statuses = {}
+    running = {}
+    executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+
+    def finish(task: Task, status: str):
+        statuses[task.key] = status
+        logger.info(f"{task} {status}")
+
+    def start_ready_tasks():
+        started = True
+        while started:
+            started = False
+            for key, task in list(pending.items()):
+                dep_statuses = [statuses.get(dep) for dep in task.deps if dep in keys]
+                if any(status in FAILED for status in dep_statuses):
+                    del pending[key]
+                    finish(task, "upstream_failed")
+                    started = True
+                    continue
+                if not all(status in ("done", "skipped") for status in dep_statuses):
+                    continue
+                if not force and task.is_up_to_date():
+                    del pending[key]
+                    finish(task, "skipped")
+                    started = True
+                    continue
+
+                n_running = sum(t.stage == task.stage for t in running.values())
+                if n_running >= stage_limits.get(task.stage, n_workers):
+                    continue
+                if executor is not None and len(running) >= n_workers:
+                    return
+
+                del pending[key]
+                logger.info(f"Running {task}")
+                if executor is None:
+                    try:
+                        _call(task.target, task.kwargs)
+                    except Exception:
+                        logger.exception(f"{task} failed")
+                        finish(task, "failed")
+                    else:
+                        finish(task, "done")
+                else:
+                    future = executor.submit(_call, task.target, task.kwargs)
+                    running[future] = task
+                started = True
+
+    try:
+        start_ready_tasks()
+        while running:
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                task = running.pop(future)
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception(f"{task} failed")
+                    finish(task, "failed")
+                else:
+                    finish(task, "done")
+            start_ready_tasks()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for task in pending.values():
+        finish(task, "not_run")
+    return statuses
+
+
+def failed_tasks(statuses: Dict[TaskKey, str]) -> List[TaskKey]:
+    """Keys of tasks that failed or were not run."""
+    return [key for key, status in statuses.items() if status in FAILED]
@@ -1,6 +1,17 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from polyleven import levenshtein
 import re
 
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Pattern, Sequence, Set, Tuple
+
+# text that starts and ends with a word character
+_WORD_EDGES_RE = re.compile(r"\w(?:.*\w)?", re.DOTALL)
+# words (keeping hyphenated or decimal numbers together) and single punctuation
+# characters with an optional trailing space, or runs of other whitespace
+_TOKEN_RE = re.compile(r"(\w+(?:[-.,]\d+)*|[^\w\s])( ?)|(\s+)")
+# tokens that spaCy flags with `is_bracket`
+BRACKETS = frozenset("()[]{}<>")
 
 
 def camel_to_snake(text: str) -> str:
@@ -63,3 +74,349 @@ def char_jaccard(str_1: str, str_2: str) -> float:
     u = chars_1.union(chars_2)
     i = chars_1.intersection(chars_2)
     return len(i) / len(u)
+
+
+def _overlaps(str_1: str, str_2: str) -> bool:
+    """Whether one string contains the other or the end of one is the start
+    of the other.
+    """
+    if (str_1 in str_2) or (str_2 in str_1):
+        return True
+    return any(
+        (str_1[-k:] == str_2[:k]) or (str_2[-k:] == str_1[:k])
+        for k in range(1, min(len(str_1), len(str_2)))
+    )
+
+
+@lru_cache(maxsize=100000)
+def mention_patterns(*acronyms: str) -> Tuple[Pattern, ...]:
+    """Compiled patterns that match whole word, case insensitive mentions of
+    some acronyms.
+
+    Removing every match of each pattern in turn gives the same result as
+    removing every match of each acronym in turn. Where possible the acronyms
+    are combined into a single alternation so that a text only needs to be
+    scanned once. This is the case when they are ASCII, start and end with
+    word characters and can't overlap, as then removing mentions of one can't
+    create or break mentions of another.
+
+    Args:
+        acronyms: Acronyms in the order that their mentions are removed.
+
+    Returns:
+        Patterns to apply in order.
+    """
+    lowered = [acronym.lower() for acronym in acronyms]
+    combinable = all(
+        acronym.isascii() and _WORD_EDGES_RE.fullmatch(acronym) for acronym in acronyms
+    ) and not any(
+        _overlaps(lowered[i], lowered[j])
+        for i in range(len(lowered))
+        for j in range(i + 1, len(lowered))
+        if lowered[i] != lowered[j]
+    )
+    if combinable:
+        unique = list(dict.fromkeys(lowered))
+        alternation = "|".join(re.escape(acronym) for acronym in unique)
+        return (re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE),)
+    return tuple(
+        re.compile(rf"\b{re.escape(acronym)}\b", re.IGNORECASE) for acronym in acronyms
+    )
+
+
+def remove_mentions_batch(
+    acronyms_original: Sequence[str],
+    acronyms_modified: Sequence[str],
+    fields: Dict[str, Sequence[str]],
+) -> Dict[str, List[str]]:
+    """Replaces whole word, case insensitive mentions of each project's
+    original and modified acronym with a space in several of its text fields.
+
+    The patterns for each pair of acronyms are compiled once (see
+    `mention_patterns`) and applied to all of the fields for that project.
+
+    Args:
+        acronyms_original: Project acronyms.
+        acronyms_modified: Modified project acronyms.
+        fields: Mapping of field names, e.g. `abstract` and `title`, to texts
+            in the same order as the acronyms.
+
+    Returns:
+        Mapping of field names to texts with the mentions removed.
+    """
+    names = list(fields)
+    texts_mod = {name: [] for name in names}
+    for acronym, acronym_mod, *texts in zip(
+        acronyms_original, acronyms_modified, *fields.values()
+    ):
+        patterns = mention_patterns(acronym, acronym_mod)
+        for name, text in zip(names, texts):
+            for pattern in patterns:
+                text = pattern.sub(" ", text)
+            texts_mod[name].append(text)
+    return texts_mod
+
+
+def _remove_mentions_chunk(
+    chunk: Tuple[Sequence[str], Sequence[str], Dict[str, Sequence[str]]]
+) -> Dict[str, List[str]]:
+    """Unpacks a chunk of acronyms and texts for `remove_mentions_batch`."""
+    return remove_mentions_batch(*chunk)
+
+
+def remove_mentions_parallel(
+    acronyms_original: Sequence[str],
+    acronyms_modified: Sequence[str],
+    fields: Dict[str, Sequence[str]],
+    n_workers: int = 1,
+    chunk_size: int = 10000,
+) -> Dict[str, List[str]]:
+    """Removes acronym mentions from the text fields of many projects across
+    a pool of processes.
+
+    The projects are split into chunks of `chunk_size` which are processed
+    with `remove_mentions_batch` in separate worker processes. Results are
+    returned in the same order as the inputs.
+
+    Args:
+        acronyms_original: Project acronyms.
+        acronyms_modified: Modified project acronyms.
+        fields: Mapping of field names to texts in the same order as the
+            acronyms.
+        n_workers: Number of worker processes. If 1, the projects are
+            processed in the current process.
+        chunk_size: Number of projects sent to a worker at a time.
+
+    Returns:
+        Mapping of field names to texts with the mentions removed.
+    """
+    if (n_workers <= 1) or (len(acronyms_original) <= chunk_size):
+        return remove_mentions_batch(acronyms_original, acronyms_modified, fields)
+
+    chunks = [
+        (
+            acronyms_original[i : i + chunk_size],
+            acronyms_modified[i : i + chunk_size],
+            {name: texts[i : i + chunk_size] for name, texts in fields.items()},
+        )
+        for i in range(0, len(acronyms_original), chunk_size)
+    ]
+    texts_mod = {name: [] for name in fields}
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        for result in executor.map(_remove_mentions_chunk, chunks):
+            for name, texts in result.items():
+                texts_mod[name].extend(texts)
+    return texts_mod
+
+
+def tokenize_with_whitespace(text: str) -> List[Tuple[str, str]]:
+    """Splits a text into tokens, keeping the whitespace after each one.
+
+    Follows the conventions of spaCy's tokenizer: a single space after a
+    token is kept as its trailing whitespace and any other whitespace becomes
+    a token of its own, so that joining each token and its whitespace gives
+    back the original text. Words are split from punctuation, but hyphenated
+    and decimal numbers (e.g. `COVID-19` and `2.5`) are kept together.
+
+    This approximates spaCy's English tokenizer rather than reproducing it.
+    Abbreviations, contractions and words with infixed punctuation, e.g.
+    `e.g.`, `don't` and `(re)use`, are split into different tokens.
+
+    Args:
+        text: A text.
+
+    Returns:
+        Pairs of token text and trailing whitespace.
+    """
+    return [
+        (token, whitespace) if token else (space, "")
+        for token, whitespace, space in _TOKEN_RE.findall(text)
+    ]
+
+
+def _close_matches(
+    acronym: str,
+    tokens: Set[str],
+    max_distance: int = 2,
+    min_jaccard: float = 0.8,
+) -> Tuple[Set[str], Set[str]]:
+    """Finds lowercase tokens whose characters overlap with an acronym's by
+    more than `min_jaccard` (see `char_jaccard`), split into those within a
+    Levenshtein distance of `max_distance` of the acronym and the rest.
+
+    Tokens are first filtered by their length and by how many of their
+    characters are not in the acronym, as each of those needs an edit of its
+    own. This rules out most tokens before either measure is calculated and
+    the Levenshtein distance is only calculated up to `max_distance`.
+    """
+    n_chars = len(acronym)
+    without_acronym_chars = dict.fromkeys(map(ord, acronym))
+    candidates = {
+        token
+        for token in tokens
+        if (n_chars - max_distance <= len(token) <= n_chars + max_distance)
+        and (len(token.translate(without_acronym_chars)) <= max_distance)
+    }
+    # brackets are kept if they are similar to the acronym but too distant,
+    # so their similarity has to be checked whatever their length
+    candidates = candidates | BRACKETS.intersection(tokens)
+
+    acronym_chars = set(acronym)
+    matches = set()
+    others = set()
+    for token in candidates:
+        token_chars = set(token)
+        union = len(token_chars | acronym_chars)
+        if len(token_chars & acronym_chars) / union <= min_jaccard:
+            continue
+        if levenshtein(token, acronym, max_distance) <= max_distance:
+            matches.add(token)
+        else:
+            others.add(token)
+    return matches, others
+
+
+def _join_kept(
+    tokens: Sequence[Tuple[str, str]],
+    lowered: Sequence[str],
+    matches: Set[str],
+    others: Set[str],
+) -> str:
+    """Joins tokens that are neither close matches nor brackets to remove."""
+    return "".join(
+        text + whitespace
+        for (text, whitespace), lower in zip(tokens, lowered)
+        if not ((lower in matches) or ((text in BRACKETS) and (lower not in others)))
+    )
+
+
+def remove_close_mentions_from_tokens(
+    acronym: str,
+    tokens: Sequence[Tuple[str, str]],
+    max_distance: int = 2,
+    min_jaccard: float = 0.8,
+) -> str:
+    """Removes tokens that closely match an acronym and brackets from a
+    tokenized text.
+
+    A token is removed if, ignoring case, the Jaccard index of its characters
+    and the acronym's is greater than `min_jaccard` and its Levenshtein
+    distance to the acronym is at most `max_distance`. Brackets are also
+    removed, unless they passed the first test but not the second.
+
+    Args:
+        acronym: Project acronym.
+        tokens: Pairs of token text and trailing whitespace, e.g. from
+            `tokenize_with_whitespace`.
+        max_distance: Maximum Levenshtein distance of a close match.
+        min_jaccard: Jaccard index of the characters that a close match must
+            exceed.
+
+    Returns:
+        The text with the tokens removed.
+    """
+    lowered = [text.lower() for text, _ in tokens]
+    matches, others = _close_matches(
+        acronym.lower(), set(lowered), max_distance, min_jaccard
+    )
+    return _join_kept(tokens, lowered, matches, others)
+
+
+def remove_close_mentions_from_text(
+    acronym: str,
+    text: str,
+    max_distance: int = 2,
+    min_jaccard: float = 0.8,
+) -> str:
+    """Tokenizes a text with `tokenize_with_whitespace` and removes tokens
+    that closely match an acronym, and brackets, with
+    `remove_close_mentions_from_tokens`. Texts without any tokens to remove
+    are returned as they are.
+    """
+    found = _TOKEN_RE.findall(text)
+    unique = {token or space for token, _, space in found}
+    lowered = {token.lower() for token in unique}
+    matches, others = _close_matches(
+        acronym.lower(), lowered, max_distance, min_jaccard
+    )
+    if not matches and BRACKETS.isdisjoint(unique):
+        return text
+    tokens = [(token or space, whitespace) for token, whitespace, space in found]
+    return _join_kept(tokens, [token.lower() for token, _ in tokens], matches, others)
+
+
+def remove_close_mentions_batch(
+    acronyms: Sequence[str],
+    texts: Sequence[str],
+    max_distance: int = 2,
+    min_jaccard: float = 0.8,
+) -> List[str]:
+    """Removes tokens that closely match each project's acronym, and
+    brackets, from its text. See `remove_close_mentions_from_tokens`.
+
+    Args:
+        acronyms: Project acronyms.
+        texts: Project texts, e.g. abstracts, in the same order as `acronyms`.
+        max_distance: Maximum Levenshtein distance of a close match.
+        min_jaccard: Jaccard index of the characters that a close match must
+            exceed.
+
+    Returns:
+        Texts with the close matches removed.
+    """
+    return [
+        remove_close_mentions_from_text(acronym, text, max_distance, min_jaccard)
+        for acronym, text in zip(acronyms, texts)
+    ]
+
+
+def _remove_close_mentions_chunk(
+    chunk: Tuple[Sequence[str], Sequence[str]],
+    **kwargs,
+) -> List[str]:
+    """Unpacks a chunk of acronyms and texts for `remove_close_mentions_batch`."""
+    return remove_close_mentions_batch(*chunk, **kwargs)
+
+
+def remove_close_mentions_parallel(
+    acronyms: Sequence[str],
+    texts: Sequence[str],
+    max_distance: int = 2,
+    min_jaccard: float = 0.8,
+    n_workers: int = 1,
+    chunk_size: int = 10000,
+) -> List[str]:
+    """Removes close matches of each project's acronym from its text across a
+    pool of processes.
+
+    The projects are split into chunks of `chunk_size` which are processed
+    with `remove_close_mentions_batch` in separate worker processes. Results
+    are returned in the same order as the inputs.
+
+    Args:
+        acronyms: Project acronyms.
+        texts: Project texts, in the same order as `acronyms`.
+        max_distance: Maximum Levenshtein distance of a close match.
+        min_jaccard: Jaccard index of the characters that a close match must
+            exceed.
+        n_workers: Number of worker processes. If 1, the projects are
+            processed in the current process.
+        chunk_size: Number of projects sent to a worker at a time.
+
+    Returns:
+        Texts with the close matches removed.
+    """
+    remove = partial(
+        _remove_close_mentions_chunk,
+        max_distance=max_distance,
+        min_jaccard=min_jaccard,
+    )
+    if (n_workers <= 1) or (len(acronyms) <= chunk_size):
+        return remove((acronyms, texts))
+
+    chunks = [
+        (acronyms[i : i + chunk_size], texts[i : i + chunk_size])
+        for i in range(0, len(acronyms), chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return [text for result in executor.map(remove, chunks) for text in result]
@@ -0,0 +1,18 @@
+import pytest
+
+from acronym.utils import cordis
+from acronym.utils.cache import clear_cache
+
+
+@pytest.fixture
+def cordis_dirs(tmp_path, monkeypatch):
+    """Points the CORDIS input and output directories at a temporary directory.
+    Yields the input and output directories.
+    """
+    input_dir = tmp_path / "inputs"
+    output_dir = tmp_path / "outputs"
+    monkeypatch.setattr(cordis, "CORDIS_INPUT_DATA_DIR", input_dir)
+    monkeypatch.setattr(cordis, "CORDIS_OUTPUT_DATA_DIR", output_dir)
+    clear_cache()
+    yield input_dir, output_dir
+    clear_cache()
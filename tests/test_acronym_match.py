@@ -0,0 +1,55 @@
+"""Tests for incrementally refreshing acronym matches."""
+import importlib
+
+import pandas as pd
+
+acronym_match = importlib.import_module("acronym.pipeline.cordis.acronym_match")
+
+
+PROJECTS = pd.DataFrame(
+    {
+        "rcn": [1, 2, 3, 4, 5],
+        "acronym": ["NA", "NULL", "ABC", "DEF", "NaN"],
+        "title": [
+            "Novel approaches",
+            "New unified lattice learning",
+            "Alpha beta charlie",
+            "Different energy futures",
+            "Nano air networks",
+        ],
+    }
+)
+
+
+def _write_projects(input_dir, data):
+    """Writes a project table as `fetch_cordis.py` does, so that acronyms such
+    as "NA" are read as strings.
+    """
+    path = input_dir / "h2020" / "project.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data.to_csv(path, index=False)
+    data.to_parquet(path.with_suffix(".parquet"), index=False)
+
+
+def _match(output_dir, full):
+    acronym_match.match_acronyms(["h2020"], full=full)
+    return (output_dir / "h2020" / "acronyms.csv").read_text()
+
+
+def test_incremental_refresh_matches_full_refresh(cordis_dirs):
+    input_dir, output_dir = cordis_dirs
+    _write_projects(input_dir, PROJECTS)
+    first = _match(output_dir, full=False)
+    assert first == _match(output_dir, full=True)
+    assert "\nnull,null," in first
+
+    changed = PROJECTS.drop(index=3)
+    changed.loc[2, "title"] = "Another big change"
+    changed = pd.concat(
+        [changed, pd.DataFrame({"rcn": [6], "acronym": ["GHI"], "title": ["G h i"]})]
+    )
+    _write_projects(input_dir, changed)
+    incremental = _match(output_dir, full=False)
+    assert incremental == _match(output_dir, full=True)
+    saved = pd.read_csv(output_dir / "h2020" / "acronyms.csv", keep_default_na=False)
+    assert saved["acronym"].tolist() == ["na", "null", "abc", "nan", "ghi"]
@@ -0,0 +1,91 @@
+"""Tests that the batched acronym matching gives the same results as the
+single project functions.
+"""
+import random
+
+import pandas as pd
+import pytest
+
+from acronym.utils.acronyms import (
+    TitleTerms,
+    acronymity,
+    acronymity_batch,
+    acronymity_parallel,
+    match_title_acronym,
+    match_title_acronyms,
+)
+
+
+PROJECTS = [
+    ("GRAPHENE", "Graphene-based revolutions in ICT and beyond"),
+    ("SMART-MAP", "SMART-MAP: smart maps for the analysis of poverty"),
+    ("H2020-ABC", "A better climate for 2020"),
+    ("ÉCOLE", "Études comparées sur l'éducation"),
+    ("NA", "Novel approaches"),
+    ("B.I.G. DATA", "Big infrastructures for genomic data analysis"),
+    ("X", ""),
+    ("", "A title without an acronym"),
+    ("Q", "The quick brown fox of the queen"),
+    ("aaa", "a aa aaa"),
+]
+STOPS = {"the", " of ", "And", ""}
+
+
+def _random_projects(n, seed=0):
+    """Projects with short acronyms and titles from a small alphabet, so that
+    there are many partial matches.
+    """
+    rng = random.Random(seed)
+    letters = "abcde"
+    projects = []
+    for _ in range(n):
+        acronym = "".join(rng.choice(letters) for _ in range(rng.randint(1, 6)))
+        terms = [
+            "".join(rng.choice(letters) for _ in range(rng.randint(1, 7)))
+            for _ in range(rng.randint(0, 8))
+        ]
+        if rng.random() < 0.2:
+            terms[:1] = [acronym + "".join(terms[:1])]
+        projects.append((acronym.upper(), " ".join(terms)))
+    return projects
+
+
+@pytest.mark.parametrize("projects", [PROJECTS, _random_projects(500)])
+def test_acronymity_batch_matches_acronymity(projects):
+    acronyms, titles = map(list, zip(*projects))
+    kwargs = dict(min_term_len=2, min_order=1, max_order=3, stops=STOPS)
+    expected = pd.DataFrame(
+        [acronymity(a, t, **kwargs) for a, t in zip(acronyms, titles)]
+    )
+
+    batch = acronymity_batch(acronyms, titles, **kwargs)
+    pd.testing.assert_frame_equal(batch, expected, check_dtype=False)
+
+    from_terms = acronymity_batch(acronyms, TitleTerms.from_titles(titles), **kwargs)
+    pd.testing.assert_frame_equal(from_terms, expected, check_dtype=False)
+
+    parallel = acronymity_parallel(
+        acronyms,
+        TitleTerms.from_titles(titles),
+        n_workers=2,
+        chunk_size=len(projects) // 3,
+        **kwargs,
+    )
+    pd.testing.assert_frame_equal(parallel, expected, check_dtype=False)
+
+
+def test_match_title_acronyms_matches_match_title_acronym():
+    acronyms, titles = zip(*_random_projects(500, seed=1))
+    acronyms = [acronym.lower() for acronym in acronyms]
+    title_terms = TitleTerms.from_titles(titles).acronym_terms(acronyms, 1, set())
+    orders = [1, 2, 4]
+
+    matches = match_title_acronyms(acronyms, title_terms, orders)
+    for order in orders:
+        title_acronyms, matched_terms = matches[order]
+        for i, acronym in enumerate(acronyms):
+            terms = [term[:order] for term in title_terms.terms(i)]
+            title_acronym, term_mask = match_title_acronym(acronym, terms)
+            assert title_acronyms[i] == title_acronym
+            positions = sorted(set(matched_terms[i][matched_terms[i] >= 0]))
+            assert sum(1 << int(p) for p in positions) == term_mask
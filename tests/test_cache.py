@@ -0,0 +1,47 @@
+"""Tests for the in-memory getter cache."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from acronym.utils.acronyms import TitleTerms
+from acronym.utils.cache import GetterCache, cached_getter, clear_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def test_getter_cache_counts_title_terms():
+    store = TitleTerms.from_titles(["alpha beta", "gamma alpha"])
+    cache = GetterCache(max_bytes=store.nbytes)
+    cache.put("a", store)
+    assert cache.n_bytes == store.nbytes > store.term_ids.nbytes
+
+    cache.put("b", TitleTerms.from_titles(["delta"]))
+    assert cache.get("a") == (False, None)
+
+
+def test_cached_getter_returns_read_only_values(tmp_path):
+    path = tmp_path / "titles.csv"
+    pd.DataFrame({"title": ["alpha beta", "gamma alpha"]}).to_csv(path, index=False)
+    calls = []
+
+    @cached_getter(lambda args: [path])
+    def title_terms():
+        calls.append(1)
+        return TitleTerms.from_titles(pd.read_csv(path)["title"])
+
+    store = title_terms()
+    with pytest.raises(ValueError):
+        store.term_ids[0] = 1
+    with pytest.raises(AttributeError):
+        store.vocab.append("delta")
+
+    again = title_terms()
+    assert len(calls) == 1
+    assert list(again.vocab) == ["alpha", "beta", "gamma"]
+    np.testing.assert_array_equal(again.term_ids, [0, 1, 2, 0])
+    assert again.terms(1) == ["gamma", "alpha"]
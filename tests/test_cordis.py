@@ -0,0 +1,102 @@
+"""Tests for reformatting CORDIS csv files and parsing CORDIS project XML."""
+import pathlib
+
+import pandas as pd
+import pytest
+import xmltodict
+
+from acronym.utils import cordis
+
+
+PROJECT_XML = pathlib.Path(__file__).parent / "fixtures/project-rcn-1_en.xml"
+
+
+RAW_PROJECTS = """rcn;acronym;title;startDate;endDate;totalCost;participants;participantCountries;subjects
+1;AB;Alpha beta;1990-01-01;1992-01-01;1,5;A;UK;X
+2;CD;Charlie delta;1990-02-01;1992-02-01;2,5;A;UK;X
+3;EF;Echo foxtrot;1990-03-01;1992-03-01;3,5;;;X
+4;GH;Golf hotel;1990-04-01;1992-04-01;4,5;;;X
+5;IJ;India juliet;1990-05-01;1992-05-01;5,5;B;FR;X
+"""
+
+
+@pytest.fixture
+def raw_projects(tmp_path, monkeypatch):
+    """Writes a raw FP1 project csv to a temporary input directory and
+    returns a function that reformats it and reads the outputs.
+    """
+    monkeypatch.setattr(cordis, "cordis_input_path", lambda fp: tmp_path / fp)
+
+    def reformat(chunksize):
+        path = tmp_path / "fp1" / "project.csv"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(RAW_PROJECTS)
+        cordis.reformat_project_csv("fp1", chunksize=chunksize)
+        return path.read_text(), pd.read_parquet(path.with_suffix(".parquet"))
+
+    return reformat
+
+
+def test_reformat_project_csv_chunk_with_empty_list_column(raw_projects):
+    # The second chunk of two rows has no participants or countries.
+    _, table = raw_projects(chunksize=2)
+    assert "subjects" not in table.columns
+    assert table["participants"].map(
+        lambda v: None if v is None else list(v)
+    ).tolist() == [["A"], ["A"], None, None, ["B"]]
+    assert table["total_cost"].tolist() == [1.5, 2.5, 3.5, 4.5, 5.5]
+
+
+def test_reformat_project_csv_chunked_matches_whole_file(raw_projects):
+    csv, table = raw_projects(chunksize=None)
+    chunked_csv, chunked_table = raw_projects(chunksize=2)
+    assert chunked_csv == csv
+    pd.testing.assert_frame_equal(chunked_table, table)
+
+
+def _xmltodict_nodes(node, parts):
+    """Nodes at a path of a document parsed by xmltodict."""
+    if isinstance(node, list):
+        return [found for item in node for found in _xmltodict_nodes(item, parts)]
+    if not parts:
+        return [node]
+    if not isinstance(node, dict) or parts[0] not in node:
+        return []
+    return _xmltodict_nodes(node[parts[0]], parts[1:])
+
+
+def _xmltodict_record(node, fields):
+    """Flat record of the fields of a document parsed by xmltodict, in the
+    form returned by `parse_project_xml`.
+    """
+    record = {}
+    for field in fields:
+        values = [
+            found.get("#text") if isinstance(found, dict) else found
+            for found in _xmltodict_nodes(node, field.split("/"))
+        ]
+        record[field] = values[0] if len(values) == 1 else (values or None)
+    return record
+
+
+def test_parse_project_organizations_xml_matches_xmltodict():
+    fields = cordis.CONFIG["xml_project_fields"] + [
+        "@xml:lang",
+        "relations/associations/organization/@type",
+    ]
+    organization_fields = cordis.CONFIG["xml_organization_fields"] + ["@xsi:type"]
+    record, organizations = cordis.parse_project_organizations_xml(
+        PROJECT_XML, fields, organization_fields
+    )
+
+    project = xmltodict.parse(PROJECT_XML.read_bytes())["project"]
+    assert record == _xmltodict_record(project, fields)
+    expected_organizations = [
+        _xmltodict_record(organization, organization_fields)
+        for organization in _xmltodict_nodes(
+            project, cordis.CONFIG["xml_organization_path"].split("/")
+        )
+    ]
+    assert organizations == expected_organizations
+    assert organizations[0]["@type"] == "coordinator"
+    assert organizations[0]["@xsi:type"] == "x"
@@ -0,0 +1,146 @@
+"""Tests for storing, caching and resuming the writing of embeddings."""
+import numpy as np
+import pytest
+
+from acronym.utils.embeddings import (
+    EmbeddingCache,
+    NpyChunkWriter,
+    StackedEmbeddings,
+    dequantize,
+    quantize,
+    save_embeddings,
+    scales_path,
+)
+
+
+@pytest.fixture
+def embeddings():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 8)).astype(np.float32)
+    vectors[3] = 0
+    return vectors
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    # Each vector is 16 bytes, so the cache holds three of them.
+    cache = EmbeddingCache(tmp_path / "cache.sqlite", max_bytes=48)
+    keys = cache.keys("model", ["a", "b", "c", "d"])
+    vectors = np.arange(16, dtype=np.float32).reshape(4, 4)
+
+    cache.put_many(keys[:3], vectors[:3])
+    cache.get_many(keys[:1])
+    cache.put_many(keys[3:], vectors[3:])
+
+    found = cache.get_many(keys)
+    assert set(found) == {keys[0], keys[2], keys[3]}
+    np.testing.assert_array_equal(found[keys[3]], vectors[3])
+    assert cache._n_bytes == cache.size() == 48
+
+
+def test_embedding_cache_tracks_size_of_replaced_embeddings(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = EmbeddingCache(path, max_bytes=1000)
+    keys = cache.keys("model", ["a", "b"])
+    vectors = np.ones((2, 4), dtype=np.float32)
+
+    cache.put_many(keys, vectors)
+    cache.put_many(keys + keys[:1], np.ones((3, 4)))
+    assert cache._n_bytes == cache.size() == 32
+    cache.close()
+
+    assert EmbeddingCache(path)._n_bytes == 32
+
+
+def test_quantize_int8_round_trip(embeddings):
+    quantized, scales = quantize(embeddings, "int8")
+    assert quantized.dtype == np.int8
+    assert (np.abs(quantized).max(axis=1)[scales > 0] == 127).all()
+    error = np.abs(dequantize(quantized, scales) - embeddings)
+    assert (error <= scales[:, None] / 2 + 1e-6).all()
+    assert (dequantize(quantized, scales)[3] == 0).all()
+
+    quantized, scales = quantize(embeddings, "float16")
+    assert scales is None
+    np.testing.assert_allclose(dequantize(quantized), embeddings, atol=1e-2)
+
+    with pytest.raises(ValueError):
+        quantize(embeddings, "int4")
+
+
+def test_save_embeddings_in_chunks(embeddings, tmp_path):
+    path = tmp_path / "abstract_embeddings.npy"
+    save_embeddings(path, embeddings, dtype="int8", chunk_size=7)
+    quantized, scales = quantize(embeddings, "int8")
+    np.testing.assert_array_equal(np.load(path), quantized)
+    np.testing.assert_array_equal(np.load(scales_path(path)), scales)
+
+    save_embeddings(path, embeddings, dtype="float32")
+    np.testing.assert_array_equal(np.load(path), embeddings)
+    assert not scales_path(path).exists()
+
+
+def test_stacked_embeddings_dequantize_selected_rows(embeddings, tmp_path):
+    paths = [tmp_path / "fp1.npy", tmp_path / "fp2.npy"]
+    save_embeddings(paths[0], embeddings[:20], dtype="int8")
+    save_embeddings(paths[1], embeddings[20:], dtype="float16")
+    stacked = StackedEmbeddings(
+        [np.load(path, mmap_mode="r") for path in paths],
+        [np.arange(20), np.arange(100, 130)],
+        scales=[np.load(scales_path(paths[0])), None],
+    )
+    expected = np.concatenate(
+        [
+            dequantize(*quantize(embeddings[:20], "int8")),
+            dequantize(*quantize(embeddings[20:], "float16")),
+        ]
+    )
+
+    assert stacked.shape == (50, 8)
+    assert stacked.dtype == np.float32
+    np.testing.assert_array_equal(stacked[:], expected)
+    np.testing.assert_array_equal(stacked[[49, 0, 25]], expected[[49, 0, 25]])
+    np.testing.assert_array_equal(stacked[-1], expected[-1])
+    np.testing.assert_array_equal(stacked.get_by_id([105, 2]), expected[[25, 2]])
+
+
+def test_chunk_writer_resumes_matching_run(tmp_path):
+    path = tmp_path / "stream.npy"
+    writer = NpyChunkWriter(path, (6, 2), n_chunks=3, fingerprint="a")
+    writer.write(0, slice(0, 2), np.ones((2, 2)))
+    writer.write(2, [4, 5], np.full((2, 2), 3))
+    del writer  # interrupted before the last chunk
+
+    writer = NpyChunkWriter(path, (6, 2), n_chunks=3, fingerprint="a")
+    assert writer.is_done(0) and writer.is_done(2) and not writer.is_done(1)
+    writer.write(1, slice(2, 4), np.full((2, 2), 2))
+    writer.close()
+    np.testing.assert_array_equal(np.load(path)[:, 0], [1, 1, 2, 2, 3, 3])
+    assert not writer.progress_path.exists()
+
+
+@pytest.mark.parametrize(
+    "n_chunks, fingerprint", [(3, "b"), (2, "a")], ids=["inputs", "chunks"]
+)
+def test_chunk_writer_restarts_changed_run(tmp_path, n_chunks, fingerprint):
+    path = tmp_path / "stream.npy"
+    writer = NpyChunkWriter(path, (6, 2), n_chunks=3, fingerprint="a")
+    writer.write(0, slice(0, 2), np.ones((2, 2)))
+    del writer
+
+    writer = NpyChunkWriter(path, (6, 2), n_chunks=n_chunks, fingerprint=fingerprint)
+    assert not writer.completed
+    assert (writer.array == 0).all()
+
+
+def test_fingerprint_depends_on_batches():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("spacy")
+    from acronym.pipeline.cordis.embed_text import _fingerprint
+
+    texts = ["a", "bb", "ccc"]
+    batches = [np.array([0, 1]), np.array([2])]
+    assert _fingerprint("m", texts, batches) == _fingerprint("m", texts, batches)
+    assert _fingerprint("m", texts, batches) != _fingerprint(
+        "m", texts, [np.array([0]), np.array([1, 2])]
+    )
+    assert _fingerprint("m", texts, batches) != _fingerprint("n", texts, batches)
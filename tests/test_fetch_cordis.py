@@ -0,0 +1,68 @@
+"""Tests for skipping the install of unchanged CORDIS downloads."""
+import importlib
+
+import pytest
+
+fetch_cordis = importlib.import_module("acronym.pipeline.cordis.fetch_cordis")
+
+
+@pytest.fixture
+def install_steps(cordis_dirs, monkeypatch):
+    """Replaces the download and install steps with stubs that record their
+    calls. Yields the list of calls and the downloaded file.
+    """
+    input_dir, _ = cordis_dirs
+    download = input_dir / "fp7" / "downloads" / "fp7xml.zip"
+    download.parent.mkdir(parents=True)
+    download.write_bytes(b"v1")
+    monkeypatch.setattr(
+        fetch_cordis, "cordis_downloads", lambda fp, xml: [("url", download)]
+    )
+
+    calls = []
+    steps = [
+        "install_projects",
+        "install_organizations",
+        "reformat_project_csv",
+        "reformat_organization_csv",
+        "install_xml_projects",
+    ]
+    for step in steps:
+        monkeypatch.setattr(
+            fetch_cordis, step, lambda fp, *a, step=step, **kw: calls.append(step)
+        )
+    yield calls, download
+
+
+def test_fetch_fp_skips_installed_downloads(install_steps):
+    calls, download = install_steps
+    fetch_cordis.fetch_fp("fp7", downloaded=True)
+    assert calls[-1] == "install_xml_projects"
+
+    calls.clear()
+    fetch_cordis.fetch_fp("fp7", downloaded=True)
+    assert calls == []
+
+    download.write_bytes(b"v2 changed")
+    fetch_cordis.fetch_fp("fp7", downloaded=True)
+    assert calls[-1] == "install_xml_projects"
+
+
+def test_fetch_fp_reinstalls_after_failed_install(install_steps, monkeypatch):
+    calls, _ = install_steps
+
+    def fail(fp):
+        raise RuntimeError("interrupted")
+
+    monkeypatch.setattr(fetch_cordis, "install_xml_projects", fail)
+    with pytest.raises(RuntimeError):
+        fetch_cordis.fetch_fp("fp7", downloaded=True)
+    assert "reformat_project_csv" in calls
+
+    calls.clear()
+    monkeypatch.setattr(
+        fetch_cordis, "install_xml_projects", lambda fp: calls.append("xml")
+    )
+    fetch_cordis.fetch_fp("fp7", downloaded=True)
+    assert calls[0] == "install_projects"
+    assert calls[-1] == "xml"
@@ -0,0 +1,37 @@
+"""Tests for loading CORDIS tables."""
+import os
+
+import pandas as pd
+import pytest
+
+from acronym.getters.cordis import projects
+
+
+@pytest.fixture
+def project_table(cordis_dirs):
+    """Writes a project csv and its parquet copy. Returns the csv path."""
+    input_dir, _ = cordis_dirs
+    path = input_dir / "h2020" / "project.csv"
+    path.parent.mkdir(parents=True)
+    data = pd.DataFrame({"rcn": [1, 2], "acronym": ["NA", "ABC"]})
+    data.to_csv(path, index=False)
+    data.to_parquet(path.with_suffix(".parquet"), index=False)
+    return path
+
+
+def test_projects_reads_parquet(project_table):
+    assert projects("h2020")["acronym"].tolist() == ["NA", "ABC"]
+    filtered = projects("h2020", filters=[("rcn", "==", 2)])
+    assert filtered["acronym"].tolist() == ["ABC"]
+
+
+def test_projects_reads_csv_newer_than_parquet(project_table):
+    pd.DataFrame({"rcn": [1, 2, 3], "acronym": ["X", "Y", "Z"]}).to_csv(
+        project_table, index=False
+    )
+    parquet_mtime = os.path.getmtime(project_table.with_suffix(".parquet"))
+    os.utime(project_table, (parquet_mtime + 10, parquet_mtime + 10))
+
+    assert projects("h2020")["acronym"].tolist() == ["X", "Y", "Z"]
+    with pytest.raises(ValueError):
+        projects("h2020", filters=[("rcn", "==", 2)])
@@ -0,0 +1,61 @@
+"""Tests for the approximate nearest neighbour index."""
+import numpy as np
+import pytest
+
+from acronym.utils.index import IVFIndex
+from acronym.utils.similarity import normalize
+
+
+@pytest.fixture
+def embeddings():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(500, 16)).astype(np.float32)
+
+
+def _exact_top_k(embeddings, queries, k):
+    scores = normalize(queries) @ normalize(embeddings).T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def test_search_all_lists_is_exact(embeddings):
+    index = IVFIndex(n_lists=8, n_probe=2)
+    ids = np.arange(len(embeddings)) + 1000
+    index.add(embeddings, ids)
+    queries = embeddings[:20] + 0.1
+
+    result_ids, scores = index.search(queries, k=5, n_probe=8)
+    np.testing.assert_array_equal(result_ids, ids[_exact_top_k(embeddings, queries, 5)])
+    assert (np.diff(scores, axis=1) <= 0).all()
+
+    approx_ids, _ = index.search(queries, k=5)
+    assert (approx_ids[:, 0] == result_ids[:, 0]).mean() > 0.8
+
+
+def test_remove_and_readd_replaces_vectors(embeddings, tmp_path):
+    index = IVFIndex(n_lists=8)
+    ids = np.arange(len(embeddings))
+    index.add(embeddings, ids)
+
+    assert index.remove([3, 4, 10000]) == 2
+    assert len(index) == len(embeddings) - 2
+    index.add(-embeddings[[3]], [3])
+    result_ids, _ = index.search(embeddings[4], k=3, n_probe=8)
+    assert 4 not in result_ids
+    result_ids, scores = index.search(-embeddings[3], k=1, n_probe=8)
+    assert result_ids[0, 0] == 3
+    assert scores[0, 0] == pytest.approx(1)
+
+    index.save(tmp_path / "index.npz")
+    loaded = IVFIndex.load(tmp_path / "index.npz")
+    queries = embeddings[:10]
+    for a, b in zip(index.search(queries, k=4), loaded.search(queries, k=4)):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_search_pads_missing_results():
+    index = IVFIndex(n_lists=2)
+    index.add(np.eye(3, dtype=np.float32), [1, 2, 3])
+    result_ids, scores = index.search(np.ones(3), k=5, n_probe=2)
+    assert sorted(result_ids[0, :3]) == [1, 2, 3]
+    assert (result_ids[0, 3:] == -1).all()
+    assert np.isneginf(scores[0, 3:]).all()
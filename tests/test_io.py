@@ -0,0 +1,171 @@
+"""Tests for resumable and conditional downloads against a local HTTP server."""
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+import pytest
+
+from acronym.utils.io import _read_meta, download, download_many
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """Serves files from memory with an ETag, and supports `Range`,
+    `If-Range` and `If-None-Match` requests.
+
+    Args:
+        files: Dict of path to `(content, etag)`, or to `(content, etag,
+            start)` to serve Range requests from `start` whatever the
+            requested start.
+        requests: List that the status and headers of each request are
+            appended to.
+    """
+
+    def __init__(self, *args, files, requests, **kwargs):
+        self.files = files
+        self.requests = requests
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, status, body=b"", headers=None):
+        self.requests.append((self.path, status, dict(self.headers)))
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path not in self.files:
+            return self._respond(404)
+        content, etag, *served_start = self.files[self.path]
+
+        if self.headers.get("If-None-Match") == etag:
+            return self._respond(304, headers={"ETag": etag})
+
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (if_range is None or if_range == etag):
+            start = int(range_header.split("=")[1].split("-")[0])
+            if served_start:
+                start = served_start[0]
+            if start >= len(content):
+                return self._respond(416)
+            headers = {
+                "ETag": etag,
+                "Content-Range": f"bytes {start}-{len(content) - 1}/{len(content)}",
+            }
+            return self._respond(206, content[start:], headers)
+        return self._respond(200, content, {"ETag": etag})
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server. Yields its base url, files and request log."""
+    files = {}
+    requests = []
+    handler = partial(FileHandler, files=files, requests=requests)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", files, requests
+    httpd.shutdown()
+    httpd.server_close()
+
+
+CONTENT = bytes(range(256)) * 400
+
+
+def _interrupted_download(url, fout, offset):
+    """Downloads a file and then truncates it to a partial `.part` file, as if
+    the download had been interrupted after `offset` bytes.
+    """
+    download(url, fout)
+    part = fout.with_name(fout.name + ".part")
+    fout.rename(part)
+    with open(part, "r+b") as f:
+        f.truncate(offset)
+    meta_path = fout.with_name(fout.name + ".meta.json")
+    meta_path.write_text(
+        meta_path.read_text().replace('"complete": true', '"complete": false')
+    )
+    return part
+
+
+def test_download_resumes_partial_file(server, tmp_path):
+    base, files, requests = server
+    files["/data.zip"] = (CONTENT, '"v1"')
+    fout = tmp_path / "data.zip"
+    part = _interrupted_download(base + "/data.zip", fout, offset=10000)
+    requests.clear()
+
+    assert download(base + "/data.zip", fout) == "resumed"
+    assert fout.read_bytes() == CONTENT
+    assert not part.exists()
+    ((_, status, headers),) = requests
+    assert status == 206
+    assert headers["Range"] == "bytes=10000-"
+    assert headers["If-Range"] == '"v1"'
+    assert _read_meta(fout)["complete"]
+
+
+def test_download_skips_unchanged_file(server, tmp_path):
+    base, files, requests = server
+    files["/data.zip"] = (CONTENT, '"v1"')
+    fout = tmp_path / "data.zip"
+    assert download(base + "/data.zip", fout) == "downloaded"
+    mtime = fout.stat().st_mtime_ns
+    requests.clear()
+
+    assert download(base + "/data.zip", fout) == "not_modified"
+    ((_, status, headers),) = requests
+    assert status == 304
+    assert headers["If-None-Match"] == '"v1"'
+    assert fout.stat().st_mtime_ns == mtime
+    assert fout.read_bytes() == CONTENT
+
+
+def test_download_restarts_when_file_changed(server, tmp_path):
+    base, files, requests = server
+    files["/data.zip"] = (CONTENT, '"v1"')
+    fout = tmp_path / "data.zip"
+    _interrupted_download(base + "/data.zip", fout, offset=10000)
+    new_content = CONTENT[::-1]
+    files["/data.zip"] = (new_content, '"v2"')
+    requests.clear()
+
+    assert download(base + "/data.zip", fout) == "downloaded"
+    assert fout.read_bytes() == new_content
+    ((_, status, headers),) = requests
+    assert status == 200
+    assert headers["If-Range"] == '"v1"'
+    assert _read_meta(fout)["etag"] == '"v2"'
+
+
+def test_download_restarts_when_range_misaligned(server, tmp_path):
+    base, files, requests = server
+    files["/data.zip"] = (CONTENT, '"v1"')
+    fout = tmp_path / "data.zip"
+    _interrupted_download(base + "/data.zip", fout, offset=10000)
+    files["/data.zip"] = (CONTENT, '"v1"', 5000)
+    requests.clear()
+
+    assert download(base + "/data.zip", fout) == "downloaded"
+    assert fout.read_bytes() == CONTENT
+    assert [status for _, status, _ in requests] == [206, 200]
+    assert "Range" not in requests[1][2]
+
+
+def test_download_many(server, tmp_path):
+    base, files, _ = server
+    jobs = []
+    for i in range(5):
+        files[f"/{i}.csv"] = (CONTENT[i:], f'"{i}"')
+        jobs.append((f"{base}/{i}.csv", tmp_path / f"{i}.csv"))
+
+    assert download_many(jobs, n_workers=3) == ["downloaded"] * 5
+    assert download_many(jobs, n_workers=3) == ["not_modified"] * 5
+    for i, (_, fout) in enumerate(jobs):
+        assert fout.read_bytes() == CONTENT[i:]
@@ -0,0 +1,52 @@
+"""Tests for finding changed projects and merging their results into the
+previous outputs of a stage.
+"""
+import numpy as np
+import pandas as pd
+
+from acronym.utils.manifest import RefreshManifest, content_hashes, merge_rows
+
+
+def _projects(rcns, titles):
+    return pd.DataFrame({"rcn": rcns, "title": titles})
+
+
+def test_refresh_manifest_finds_changed_projects(tmp_path):
+    path = tmp_path / "refresh_manifest.json"
+    output = tmp_path / "out.csv"
+    output.touch()
+    params = {"model": "a"}
+
+    before = content_hashes(_projects([1, 2, 3], ["a", "b", "c"]), ["title"])
+    manifest = RefreshManifest(path)
+    assert manifest.changed("stage", before, params, [output]).all()
+    manifest.update("stage", before, params, [output])
+
+    manifest = RefreshManifest(path)
+    assert manifest.is_unchanged("stage", before)
+    after = content_hashes(_projects([3, 4, 2], ["c", "d", "B"]), ["title"])
+    changed = manifest.changed("stage", after, params, [output])
+    assert changed.tolist() == [False, True, True]
+    assert manifest.previous_positions("stage", after.index).tolist() == [2, -1, 1]
+
+    assert manifest.changed("stage", after, {"model": "b"}, [output]).all()
+    output.unlink()
+    assert manifest.changed("stage", after, params, [output]).all()
+
+
+def test_merge_rows_matches_full_refresh():
+    previous_rcns = [1, 2, 3, 4]
+    current_rcns = [4, 5, 2, 1]
+    changed = np.array([False, True, True, False])
+    positions = pd.Index(previous_rcns).get_indexer(current_rcns)
+
+    previous = pd.DataFrame({"value": ["a", "b", "c", "d"], "rcn": previous_rcns})
+    updates = pd.DataFrame({"value": ["e", "B"], "rcn": [5, 2]})
+    merged = merge_rows(previous, positions, updates, changed)
+    expected = pd.DataFrame({"value": ["d", "e", "B", "a"], "rcn": current_rcns})
+    pd.testing.assert_frame_equal(merged, expected)
+
+    previous = np.arange(8, dtype=np.float32).reshape(4, 2)
+    updates = np.full((2, 2), -1, dtype=np.float32)
+    merged = merge_rows(previous, positions, updates, changed)
+    np.testing.assert_array_equal(merged, [[6, 7], [-1, -1], [-1, -1], [0, 1]])
@@ -0,0 +1,90 @@
+"""Tests for removing acronym mentions from texts."""
+import pytest
+
+from acronym.utils.text import (
+    remove_close_mentions_from_text,
+    remove_close_mentions_from_tokens,
+    remove_close_mentions_parallel,
+    remove_mentions_batch,
+    tokenize_with_whitespace,
+)
+
+
+ABSTRACTS = [
+    (
+        "GRAPHENE",
+        "The GRAPHENE project (Graphene-based Revolutions in ICT And Beyond) "
+        "will take graphene, and related layered materials, from academic "
+        "laboratories to society. GRAFENE and grapheme are close variants.",
+    ),
+    (
+        "SMART-MAP",
+        "SMART-MAP develops smart maps for 2.5 million users; the SMARTMAP "
+        "platform [beta] is open.",
+    ),
+    (
+        "COVID",
+        "COVID-19 has affected 120 countries. The covid response (CoVid) will "
+        "be studied in 3 work packages.",
+    ),
+    (
+        "AQUA",
+        "Water quality {AQUA} monitoring: aqua, aquas and acqua sensors are "
+        "deployed across Europe.",
+    ),
+]
+
+
+def test_tokenize_with_whitespace_round_trips():
+    for _, abstract in ABSTRACTS:
+        tokens = tokenize_with_whitespace(abstract + "\n\n  end")
+        assert "".join(t + w for t, w in tokens) == abstract + "\n\n  end"
+
+
+def test_remove_close_mentions_from_text():
+    acronym, abstract = ABSTRACTS[3]
+    assert remove_close_mentions_from_text(acronym, abstract) == (
+        "Water quality monitoring: , aquas and acqua sensors are deployed across "
+        "Europe."
+    )
+    assert remove_close_mentions_from_text("XYZ", "No mentions here.") == (
+        "No mentions here."
+    )
+
+
+def test_remove_close_mentions_paths_agree():
+    acronyms, abstracts = zip(*ABSTRACTS)
+    from_tokens = [
+        remove_close_mentions_from_tokens(a, tokenize_with_whitespace(t))
+        for a, t in ABSTRACTS
+    ]
+    assert [remove_close_mentions_from_text(a, t) for a, t in ABSTRACTS] == from_tokens
+    assert (
+        remove_close_mentions_parallel(acronyms, abstracts, n_workers=2, chunk_size=1)
+        == from_tokens
+    )
+
+
+def test_regex_tokenizer_matches_spacy_on_abstracts():
+    spacy = pytest.importorskip("spacy")
+    nlp = spacy.blank("en")
+    for acronym, abstract in ABSTRACTS:
+        spacy_tokens = [(t.text, t.whitespace_) for t in nlp(abstract)]
+        assert tokenize_with_whitespace(abstract) == spacy_tokens
+        assert remove_close_mentions_from_tokens(
+            acronym, spacy_tokens
+        ) == remove_close_mentions_from_text(acronym, abstract)
+
+    # known differences, for which the spaCy tokenizer is the default
+    for text in ["We don't know.", "e.g. this", "(re)use"]:
+        spacy_tokens = [(t.text, t.whitespace_) for t in nlp(text)]
+        assert tokenize_with_whitespace(text) != spacy_tokens
+
+
+def test_remove_mentions_batch():
+    removed = remove_mentions_batch(
+        ["ABC", "D-E"],
+        ["abc", "de"],
+        {"title": ["ABC: abc tools", "The D-E and de study"]},
+    )
+    assert removed == {"title": [" :   tools", "The   and   study"]}